@@ -0,0 +1,40 @@
+"""Setup cost per styling call: fresh LLM client + Agent versus a pooled checkout.
+
+No network traffic: only client/agent construction is timed.
+
+    python benchmarks/bench_agent_pool.py [iterations]
+"""
+from __future__ import annotations
+import sys
+import time
+from qna_stylist.agents import AgentPool, create_stylist_agent
+from qna_stylist.prompts import build_system_prompt
+from qna_stylist.settings import Settings
+from qna_stylist.types import StylistTone
+
+
+def main(iterations: int = 50) -> None:
+    cfg = Settings(provider="openai", openai_api_key="bench-key")
+    prompt = build_system_prompt(StylistTone.WITTY, cfg.max_emojis, cfg.max_length_chars, serious=False)
+
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        create_stylist_agent(prompt, cfg)
+    fresh_ms = (time.perf_counter() - t0) * 1000 / iterations
+
+    pool = AgentPool()
+    with pool.agent(prompt, cfg, StylistTone.WITTY, False):
+        pass  # warm the pool, as the first real request would
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        with pool.agent(prompt, cfg, StylistTone.WITTY, False):
+            pass
+    pooled_ms = (time.perf_counter() - t0) * 1000 / iterations
+
+    print(f"fresh  setup: {fresh_ms:8.3f} ms/call")
+    print(f"pooled setup: {pooled_ms:8.3f} ms/call")
+    print(f"saved:        {fresh_ms - pooled_ms:8.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
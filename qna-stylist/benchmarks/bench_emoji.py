@@ -0,0 +1,49 @@
+"""strip_excess_emojis: previous per-character loop vs the precompiled cluster regex.
+
+    python benchmarks/bench_emoji.py
+"""
+from __future__ import annotations
+import time
+from typing import List
+from qna_stylist.safety import is_emoji, strip_excess_emojis
+
+
+def legacy_strip_excess_emojis(text: str, max_emoji: int) -> str:
+    count = 0
+    out: List[str] = []
+    for ch in text:
+        if is_emoji(ch):
+            if count < max_emoji:
+                out.append(ch)
+            count += 1
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _answer(size: int, with_emoji: bool) -> str:
+    sentence = "Submit the original receipt within 30 days through our claims portal. "
+    if with_emoji:
+        sentence += "🎉 👍🏽 "
+    return (sentence * (size // len(sentence) + 1))[:size]
+
+
+def _time(fn, repeat: int = 200) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1e6 / repeat
+
+
+def main() -> None:
+    print(f"{'size':>6} {'emoji':>6} {'legacy us':>10} {'compiled us':>12} {'speedup':>8}")
+    for size in (1024, 4096, 10240):
+        for with_emoji in (False, True):
+            text = _answer(size, with_emoji)
+            legacy = _time(lambda: legacy_strip_excess_emojis(text, 3))
+            compiled = _time(lambda: strip_excess_emojis(text, 3))
+            print(f"{size:>6} {str(with_emoji):>6} {legacy:>10.1f} {compiled:>12.1f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
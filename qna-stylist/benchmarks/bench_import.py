@@ -0,0 +1,77 @@
+"""Cold-start cost of a worker: import time, peak RSS and heavy modules loaded.
+
+Each scenario runs in a fresh interpreter:
+  import     - ``import qna_stylist``
+  cache_hit  - import, build an enhancer and serve one request from the cache
+  warmup     - import, build an enhancer and call ``warmup()`` (CrewAI + SDKs loaded)
+
+    python benchmarks/bench_import.py [--importtime N]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY = ("crewai", "litellm", "openai")
+
+_PROBE = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import qna_stylist
+from qna_stylist.settings import Settings
+scenario = sys.argv[1]
+if scenario != "import":
+    enhancer = qna_stylist.ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="bench-key"))
+    if scenario == "cache_hit":
+        key = enhancer._prepare("How do I reset?", "Click reset.", qna_stylist.StylistTone.WITTY).cache_key
+        enhancer.cache.set(key, "Styled!", 60)
+        assert enhancer.enhance(question="How do I reset?", plain_answer="Click reset.")["cache_hit"]
+    else:
+        enhancer.warmup()
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "seconds": round(elapsed, 3),
+    "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "heavy_loaded": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (HEAVY,)
+
+
+def probe(scenario: str) -> dict:
+    env = dict(os.environ, CREWAI_DISABLE_TELEMETRY="true", OTEL_SDK_DISABLED="true")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, scenario], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def importtime(top: int) -> None:
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import qna_stylist"], capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        rows.append((int(cumulative_us), int(self_us), name))
+    print(f"\ntop {top} imports by cumulative time (import qna_stylist):")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports")
+    args = parser.parse_args()
+    for scenario in ("import", "cache_hit", "warmup"):
+        result = probe(scenario)
+        print(f"{scenario:<10} {result['seconds']:7.3f} s  {result['max_rss_mib']:7.1f} MiB  heavy={result['heavy_loaded']}")
+    if args.importtime:
+        importtime(args.importtime)
+
+
+if __name__ == "__main__":
+    main()
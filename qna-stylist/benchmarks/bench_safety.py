@@ -0,0 +1,46 @@
+"""analyze_topic: per-keyword lowercase scan (previous implementation) vs the compiled matcher.
+
+    python benchmarks/bench_safety.py
+"""
+from __future__ import annotations
+import random
+import string
+import time
+from qna_stylist.safety import _SENSITIVE_RE, analyze_topic, topic_matcher
+from qna_stylist.settings import Settings
+
+
+def legacy_analyze_topic(question: str, answer: str, cfg: Settings) -> bool:
+    text = f"{question}\n{answer}"
+    return bool(cfg.enable_safety_filters and (_SENSITIVE_RE.search(text) or any(k.lower() in text.lower() for k in cfg.reduce_humor_keywords)))
+
+
+def _keywords(n: int, rng: random.Random) -> list[str]:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(n * 2)]
+    return [" ".join(rng.sample(words, rng.randint(1, 2))) for _ in range(n)]
+
+
+def _time(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1e6 / repeat
+
+
+def main() -> None:
+    rng = random.Random(7)
+    question = "Can I get reimbursed if my airport lounge guest pass doesn't work?"
+    answer = " ".join(["Submit the original receipt within 30 days through our claims portal."] * 8)
+    print(f"{'keywords':>9} {'legacy us':>10} {'compiled us':>12} {'speedup':>8}")
+    for n in (10, 100, 1000, 5000):
+        cfg = Settings(reduce_humor_keywords=_keywords(n, rng))
+        topic_matcher(cfg)  # compile once, as the first request would
+        assert legacy_analyze_topic(question, answer, cfg) == analyze_topic(question, answer, cfg)[0]
+        repeat = max(20, 20000 // n)
+        legacy = _time(lambda: legacy_analyze_topic(question, answer, cfg), repeat)
+        compiled = _time(lambda: analyze_topic(question, answer, cfg), repeat)
+        print(f"{n:>9} {legacy:>10.1f} {compiled:>12.1f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Load test for the HTTP service (``qna-stylist serve``) against a local fake LLM.
+
+Starts FakeLLMServer instances for OpenAI and Ollama, runs ``StylistService`` under
+uvicorn in-process, and fires requests from client threads over keep-alive HTTP.
+Reports throughput, latency percentiles and the status-code mix (200/429/503).
+
+    python benchmarks/bench_service.py --requests 2000 --clients 64 --max-concurrency 16 --max-queue 32
+    python benchmarks/bench_service.py --batch-window-ms 10 --mode crew
+    python benchmarks/bench_service.py --pack-max-items 8 --pack-max-wait-ms 10
+"""
+from __future__ import annotations
+import os
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import argparse
+import http.client
+import json
+import logging
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import structlog
+import uvicorn
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_llm import FakeLLMServer, LatencyModel  # noqa: E402
+
+from qna_stylist import ResponseStyleEnhancer  # noqa: E402
+from qna_stylist.server import StylistService  # noqa: E402
+from qna_stylist.settings import Settings  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--unique", type=int, default=200, help="distinct questions (Zipf-distributed)")
+    parser.add_argument("--mode", choices=["crew", "direct"], default="direct")
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--deadline-ms", type=int, default=5000)
+    parser.add_argument("--batch-window-ms", type=int, default=0)
+    parser.add_argument("--batch-max-size", type=int, default=16)
+    parser.add_argument("--pack-max-items", type=int, default=1, help="packed mode, 1 = one call per item")
+    parser.add_argument("--pack-max-wait-ms", type=int, default=20)
+    parser.add_argument("--median-ms", type=float, default=150.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    logging.disable(logging.CRITICAL)
+    latency = LatencyModel("lognormal", args.median_ms, 0.4)
+    with FakeLLMServer(latency=latency, error_rate=args.error_rate, seed=args.seed) as openai, \
+            FakeLLMServer(latency=latency, seed=args.seed + 1) as ollama:
+        cfg = Settings(
+            provider="openai",
+            openai_api_key="bench-key",
+            openai_base_url=f"{openai.url}/v1",
+            ollama_base_url=f"{ollama.url}/v1",
+            execution_mode=args.mode,
+            retry_min_wait_s=0.01,
+            retry_max_wait_s=0.05,
+            pack_max_items=args.pack_max_items,
+            pack_max_wait_ms=args.pack_max_wait_ms,
+        )
+        enhancer = ResponseStyleEnhancer(cfg=cfg)
+        app = StylistService(
+            enhancer,
+            max_concurrency=args.max_concurrency,
+            max_queue=args.max_queue,
+            deadline_ms=args.deadline_ms,
+            batch_window_ms=args.batch_window_ms,
+            batch_max_size=args.batch_max_size,
+            warmup=True,
+        )
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        rng = random.Random(args.seed)
+        weights = [1 / (rank + 1) for rank in range(args.unique)]
+        picks = rng.choices(range(args.unique), weights=weights, k=args.requests)
+        local = threading.local()
+
+        def one(i: int) -> Tuple[int, float]:
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            body = json.dumps({"question": f"How do I reset, variant {i}?", "plain_answer": f"Open settings #{i}."})
+            t0 = time.perf_counter()
+            conn.request("POST", "/v1/enhance", body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            return resp.status, (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            outcomes = list(pool.map(one, picks))
+        wall = time.perf_counter() - t0
+        server.should_exit = True
+        thread.join(timeout=5)
+
+        statuses = Counter(status for status, _ in outcomes)
+        ok = [ms for status, ms in outcomes if status == 200]
+        print(f"requests={len(outcomes)} clients={args.clients} wall={wall:.2f}s rps={len(outcomes) / wall:.1f}")
+        print(f"status={dict(sorted(statuses.items()))}")
+        if ok:
+            print(f"200 latency ms: p50={_percentile(ok, 50):.1f} p95={_percentile(ok, 95):.1f} p99={_percentile(ok, 99):.1f}")
+        upstream = openai.stats.as_dict()
+        print(f"upstream openai={upstream['requests']} ollama={ollama.stats.as_dict()['requests']} "
+              f"prompt_tokens={upstream['prompt_tokens']} completion_tokens={upstream['completion_tokens']}")
+        if args.pack_max_items > 1:
+            print(f"packing={enhancer.packing_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Cache snapshot: write/open cost and lookup latency, compared with decoding everything into a dict.
+
+    python benchmarks/bench_snapshot.py --entries 100000
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from qna_stylist.cache import make_cache_key
+from qna_stylist.snapshot import Snapshot, write_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text = "Open Settings → Billing → Cancel plan. Refunds land within 5 business days! 🎉 "
+    entries = {make_cache_key(f"q{i}", "a", "witty", "openai:gpt-4o-mini"): f"{text}#{i}" for i in range(args.entries)}
+    keys = list(entries)
+    rng = random.Random(7)
+    probes = [rng.choice(keys) for _ in range(args.lookups)]
+    version = {"provider": "openai", "model": "gpt-4o-mini", "prompt_hash": "bench"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.snap")
+        t0 = time.perf_counter()
+        write_snapshot(path, entries, version)
+        print(f"write: {time.perf_counter() - t0:.2f}s size={os.path.getsize(path) / 2**20:.1f} MiB")
+
+        t0 = time.perf_counter()
+        snap = Snapshot(path)
+        opened = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for key in probes:
+            snap.get(key)
+        per_get = (time.perf_counter() - t0) / len(probes)
+        # Heap numbers are taken separately; tracemalloc slows every allocation it sees.
+        tracemalloc.start()
+        Snapshot(path)
+        mapped_peak = tracemalloc.get_traced_memory()[1]
+        print(f"mmap:  open={opened * 1000:.2f}ms python_heap={mapped_peak / 2**20:.2f} MiB get={per_get * 1e6:.2f}us")
+
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        decoded = dict(Snapshot(path).items())
+        loaded = time.perf_counter() - t0
+        eager_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"eager: load={loaded * 1000:.2f}ms python_heap={eager_peak / 2**20:.2f} MiB entries={len(decoded)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Run the fake OpenAI/Ollama server from ``tests/fake_llm_server.py`` standalone.
+
+    python benchmarks/fake_llm.py --port 8099 --median-ms 250 --sigma 0.5 --error-rate 0.02
+
+Benchmarks import ``FakeLLMServer`` and ``LatencyModel`` from here.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+from fake_llm_server import FakeLLMServer, FakeLLMStats, LatencyModel, styled_reply  # noqa: E402,F401
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", choices=["lognormal", "uniform", "fixed"], default="lognormal")
+    parser.add_argument("--median-ms", type=float, default=200.0)
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--spread-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stream-chunks", type=int, default=16)
+    args = parser.parse_args()
+    server = FakeLLMServer(
+        args.host,
+        args.port,
+        LatencyModel(args.latency, args.median_ms, args.sigma, args.spread_ms),
+        args.error_rate,
+        args.stream_chunks,
+    )
+    print(f"fake LLM listening on {server.url} (OpenAI: {server.url}/v1, Ollama: {server.url})")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Load/latency benchmark for ResponseStyleEnhancer against local fake LLM servers.
+
+Starts two FakeLLMServer instances (one posing as OpenAI, one as Ollama), points
+Settings at them, and drives ``enhance`` (or ``enhance_stream``) from a thread
+pool at several concurrency levels and cache sizes. The workload draws questions
+from a Zipf-like distribution so popular questions repeat, as in production.
+Results go to a JSON file that ``--compare`` can diff against another run.
+
+    python benchmarks/run_load.py --requests 300 --concurrency 1,8,32 --cache-sizes 0,1024
+    python benchmarks/run_load.py --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+from __future__ import annotations
+import os
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_llm import FakeLLMServer, LatencyModel  # noqa: E402
+
+from qna_stylist import ResponseStyleEnhancer, StylistTone  # noqa: E402
+from qna_stylist.agents import AGENT_POOL  # noqa: E402
+from qna_stylist.cache import MemoryCache, cache_clear  # noqa: E402
+from qna_stylist.health import HEALTH  # noqa: E402
+from qna_stylist.safety import analyze_topic, strip_excess_emojis, topic_matcher  # noqa: E402
+from qna_stylist.settings import Settings  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+TONES = [StylistTone.WITTY, StylistTone.FRIENDLY, StylistTone.FUNNY]
+
+
+def _quiet() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    logging.disable(logging.CRITICAL)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def build_workload(requests: int, unique: int, seed: int) -> List[Tuple[str, str, StylistTone]]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(unique)]
+    picks = rng.choices(range(unique), weights=weights, k=requests)
+    return [
+        (
+            f"How do I reset my password, variant {i}?",
+            f"Open settings, choose 'Forgot password' and follow the code sent to phone #{i}. It expires in {5 + i % 10} minutes.",
+            TONES[i % len(TONES)],
+        )
+        for i in picks
+    ]
+
+
+def _settings(args: argparse.Namespace, openai_url: str, ollama_url: str, cache_size: int) -> Settings:
+    return Settings(
+        provider="openai",
+        openai_api_key="bench-key",
+        openai_base_url=f"{openai_url}/v1",
+        ollama_base_url=f"{ollama_url}/v1",
+        execution_mode=args.mode,
+        cache_max_items=cache_size,
+        retry_min_wait_s=0.01,
+        retry_max_wait_s=0.05,
+    )
+
+
+def _call(enhancer: ResponseStyleEnhancer, item: Tuple[str, str, StylistTone], stream: bool) -> Tuple[float, bool, bool]:
+    question, answer, tone = item
+    t0 = time.perf_counter()
+    if stream:
+        first_chunk_at = None
+        chunks = []
+        for chunk in enhancer.enhance_stream(question=question, plain_answer=answer, tone=tone):
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+            chunks.append(chunk)
+        # Streaming reports time to first chunk, which is what the UX waits on.
+        return ((first_chunk_at or time.perf_counter()) - t0), False, "".join(chunks) == answer
+    result = enhancer.enhance(question=question, plain_answer=answer, tone=tone)
+    fallback = "Fallback" in (result["safety_notes"] or "")
+    return time.perf_counter() - t0, result["cache_hit"], fallback
+
+
+def _reset() -> None:
+    cache_clear()
+    HEALTH.clear()
+
+
+def run_scenario(args: argparse.Namespace, openai: FakeLLMServer, ollama: FakeLLMServer, cache_size: int, concurrency: int) -> Dict[str, Any]:
+    _reset()
+    enhancer = ResponseStyleEnhancer(cfg=_settings(args, openai.url, ollama.url, cache_size))
+    workload = build_workload(args.requests, args.unique, args.seed)
+    # Build pooled clients/agents outside the timed window.
+    _call(enhancer, ("warm-up?", "Warm the pools.", StylistTone.WITTY), args.stream)
+    before = {"openai": openai.stats.as_dict(), "ollama": ollama.stats.as_dict()}
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda item: _call(enhancer, item, args.stream), workload))
+    wall = time.perf_counter() - t0
+
+    latencies = [o[0] * 1000 for o in outcomes]
+    upstream = {
+        name: {k: v - before[name][k] for k, v in server.stats.as_dict().items()}
+        for name, server in (("openai", openai), ("ollama", ollama))
+    }
+    return {
+        "cache_size": cache_size,
+        "concurrency": concurrency,
+        "requests": len(outcomes),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(outcomes) / wall, 2),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "cache_hit_ratio": round(sum(1 for o in outcomes if o[1]) / len(outcomes), 3),
+        "fallback_ratio": round(sum(1 for o in outcomes if o[2]) / len(outcomes), 3),
+        "coalescing": enhancer.coalescing_stats(),
+        "cache": enhancer.cache.stats(),
+        "upstream": upstream,
+        "mem": measure_memory(args, openai, ollama, cache_size),
+    }
+
+
+def measure_memory(args: argparse.Namespace, openai: FakeLLMServer, ollama: FakeLLMServer, cache_size: int, samples: int = 10) -> Dict[str, float]:
+    """Peak traced allocation of a single call, for cache misses and cache hits, run sequentially."""
+    _reset()
+    enhancer = ResponseStyleEnhancer(cfg=_settings(args, openai.url, ollama.url, cache_size))
+    workload = build_workload(samples, samples, args.seed + 1)
+    _call(enhancer, ("warm-up?", "Warm the pools.", StylistTone.WITTY), args.stream)
+    peaks: Dict[str, List[int]] = {"miss": [], "hit": []}
+    tracemalloc.start()
+    try:
+        for phase in ("miss", "hit"):
+            for item in workload:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                _call(enhancer, item, args.stream)
+                peaks[phase].append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return {f"{phase}_peak_kib": round(statistics.median(values) / 1024, 1) for phase, values in peaks.items()}
+
+
+def micro_timings(repeat: int = 2000) -> Dict[str, float]:
+    """Hot-path costs that run on every request, cached or not (microseconds per call)."""
+    cfg = Settings()
+    question = "Can I get reimbursed if my guest pass doesn't work?"
+    answer = "Yes, submit the receipt within 30 days 🎉 and refunds arrive in 5–7 business days. " * 4
+    cache = MemoryCache(max_items=1024)
+    keys = [f"k{i}" for i in range(1024)]
+    for key in keys:
+        cache.set(key, answer, ttl_s=600)
+
+    matcher = topic_matcher(cfg)  # the enhancer resolves it once, at construction
+
+    def timed(fn) -> float:
+        t0 = time.perf_counter()
+        for i in range(repeat):
+            fn(i)
+        return round((time.perf_counter() - t0) * 1e6 / repeat, 3)
+
+    return {
+        "analyze_topic_us": timed(lambda i: analyze_topic(question, answer, cfg, matcher)),
+        "strip_excess_emojis_us": timed(lambda i: strip_excess_emojis(answer, 3)),
+        "cache_get_us": timed(lambda i: cache.get(keys[i % 1024])),
+        "cache_set_us": timed(lambda i: cache.set(keys[i % 1024], answer, 600)),
+    }
+
+
+def _git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Path:
+    _quiet()
+    latency = LatencyModel(args.latency, args.median_ms, args.sigma)
+    ollama_latency = LatencyModel(args.latency, args.ollama_median_ms, args.sigma)
+    results = []
+    with FakeLLMServer(latency=latency, error_rate=args.error_rate, seed=args.seed) as openai, \
+            FakeLLMServer(latency=ollama_latency, error_rate=args.error_rate, seed=args.seed + 1) as ollama:
+        AGENT_POOL.clear()
+        for cache_size in args.cache_sizes:
+            for concurrency in args.concurrency:
+                row = run_scenario(args, openai, ollama, cache_size, concurrency)
+                results.append(row)
+                print(
+                    f"cache={cache_size:<6} conc={concurrency:<4} rps={row['throughput_rps']:<8} "
+                    f"p50={row['p50_ms']:<8} p95={row['p95_ms']:<8} p99={row['p99_ms']:<8} "
+                    f"hit={row['cache_hit_ratio']:<6} upstream={row['upstream']['openai']['requests']}"
+                )
+    report = {
+        "meta": {
+            "git_sha": _git_sha(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+        },
+        "micro": micro_timings(),
+        "results": results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['git_sha'] or 'nogit'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"micro: {report['micro']}")
+    print(f"wrote {out}")
+    return out
+
+
+def compare(base_path: str, head_path: str) -> None:
+    base, head = (json.loads(Path(p).read_text()) for p in (base_path, head_path))
+    print(f"base {base['meta'].get('git_sha')} -> head {head['meta'].get('git_sha')}")
+    index = {(r["cache_size"], r["concurrency"]): r for r in base["results"]}
+    metrics = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "cache_hit_ratio")
+    for row in head["results"]:
+        old = index.get((row["cache_size"], row["concurrency"]))
+        if not old:
+            continue
+        deltas = "  ".join(
+            f"{m}={row[m]} ({(row[m] - old[m]) / old[m] * 100:+.1f}%)" if old[m] else f"{m}={row[m]}"
+            for m in metrics
+        )
+        print(f"cache={row['cache_size']:<6} conc={row['concurrency']:<4} {deltas}")
+    for name, value in head.get("micro", {}).items():
+        old = base.get("micro", {}).get(name)
+        change = f" ({(value - old) / old * 100:+.1f}%)" if old else ""
+        print(f"micro {name}={value}{change}")
+
+
+def _ints(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--unique", type=int, default=100, help="distinct questions in the workload")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 8, 32])
+    parser.add_argument("--cache-sizes", type=_ints, default=[0, 1024])
+    parser.add_argument("--mode", choices=["crew", "direct"], default="direct")
+    parser.add_argument("--stream", action="store_true", help="drive enhance_stream and report time to first chunk")
+    parser.add_argument("--latency", choices=["lognormal", "uniform", "fixed"], default="lognormal")
+    parser.add_argument("--median-ms", type=float, default=120.0)
+    parser.add_argument("--ollama-median-ms", type=float, default=60.0)
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", default=None, help="result file (default: benchmarks/results/<time>-<sha>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="diff two result files and exit")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
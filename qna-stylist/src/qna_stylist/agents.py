@@ -1,14 +1,60 @@
 from __future__ import annotations
+import importlib
 import os
+import time
 import structlog
-from typing import Any, Optional
-from crewai import Agent, Task, Crew, LLM
-from crewai.crews.crew_output import CrewOutput
-from crewai.llms.providers.openai.completion import OpenAICompletion as OpenAIChat
+from contextlib import contextmanager
+from threading import Lock
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from .metrics import get_metrics_sink
 from .settings import Settings
+from .types import StylistTone
+
+if TYPE_CHECKING:
+    from crewai import Agent, Task
 
 log = structlog.get_logger(__name__)
 
+# CrewAI (and litellm behind it) and the OpenAI SDK take seconds to import, so they are
+# loaded on first use: cache hits never pay for them. Module attribute access still
+# works (``agents.OpenAIChat``), and assigning one, e.g. in tests, replaces it.
+_LAZY = {
+    "Agent": ("crewai", "Agent"),
+    "Task": ("crewai", "Task"),
+    "Crew": ("crewai", "Crew"),
+    "LLM": ("crewai", "LLM"),
+    "CrewOutput": ("crewai.crews.crew_output", "CrewOutput"),
+    "OpenAIChat": ("crewai.llms.providers.openai.completion", "OpenAICompletion"),
+    "OpenAI": ("openai", "OpenAI"),
+    "AsyncOpenAI": ("openai", "AsyncOpenAI"),
+}
+_IMPORT_LOCK = Lock()
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _IMPORT_LOCK:
+        if name not in globals():
+            module, attr = target
+            globals()[name] = getattr(importlib.import_module(module), attr)
+        return globals()[name]
+
+def _dep(name: str) -> Any:
+    value = globals().get(name)
+    return value if value is not None else __getattr__(name)
+
+def warmup(cfg: Settings, providers: Iterable[str] = ()) -> None:
+    """Import CrewAI and the provider SDKs and prebuild pooled LLM clients before the first request."""
+    for name in _LAZY:
+        _dep(name)
+    # The SDK resolves its resource and type modules (~1s) on first `client.chat` access; for async
+    # callers that would stall the event loop, so touch it here. anyio's asyncio backend likewise.
+    _dep("OpenAI")(api_key="warmup", base_url="http://127.0.0.1/v1").chat.completions
+    importlib.import_module("anyio._backends._asyncio")
+    for provider in providers or (cfg.provider,):
+        AGENT_POOL.llm(cfg, provider)
+
 def build_llm(cfg: Settings, provider_override: Optional[str] = None):
     provider = (provider_override or cfg.provider).lower()
 
@@ -22,9 +68,10 @@ def build_llm(cfg: Settings, provider_override: Optional[str] = None):
             temperature=cfg.temperature,
             max_tokens=cfg.max_tokens,
         )
-        return OpenAIChat(
+        return _dep("OpenAIChat")(
             model=cfg.openai_model,
             api_key=api_key,
+            base_url=cfg.openai_base_url,
             temperature=cfg.temperature,
             top_p=1.0,
             presence_penalty=0.0,
@@ -45,9 +92,11 @@ def build_llm(cfg: Settings, provider_override: Optional[str] = None):
             temperature=cfg.temperature,
             max_tokens=cfg.max_tokens,
         )
-        return LLM(
+        return _dep("LLM")(
             model=f"ollama/{cfg.ollama_model}",
             api_base=base_url,
+            # Newer CrewAI routes Ollama through its OpenAI-compatible adapter, which reads base_url.
+            base_url=f"{base_url}/v1",
             api_key=api_key,
             temperature=cfg.temperature,
             top_p=1.0,
@@ -62,10 +111,32 @@ def build_llm(cfg: Settings, provider_override: Optional[str] = None):
 
     raise ValueError(f"Unsupported provider '{provider}'")
 
+def build_stream_client(cfg: Settings, provider_override: Optional[str] = None, asynchronous: bool = False):
+    """OpenAI-SDK client for token streaming; Ollama is reached through its OpenAI-compatible /v1 API."""
+    provider = (provider_override or cfg.provider).lower()
+    client_cls = _dep("AsyncOpenAI" if asynchronous else "OpenAI")
+
+    if provider == "openai":
+        api_key = cfg.get_openai_api_key()
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is required for OpenAI provider usage.")
+        return client_cls(api_key=api_key, base_url=cfg.openai_base_url)
+
+    if provider == "ollama":
+        raw_base_url = cfg.ollama_base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+        base_url = raw_base_url.rstrip("/")
+        if not base_url.endswith("/v1"):
+            base_url += "/v1"
+        return client_cls(api_key=os.getenv("OLLAMA_API_KEY", "ollama"), base_url=base_url)
+
+    raise ValueError(f"Unsupported provider '{provider}'")
+
 def create_stylist_agent(system_prompt: str, cfg: Settings, provider_override: Optional[str] = None) -> Agent:
-    llm = build_llm(cfg, provider_override)
+    return _new_agent(system_prompt, build_llm(cfg, provider_override))
+
 
-    return Agent(
+def _new_agent(system_prompt: str, llm: Any) -> Agent:
+    return _dep("Agent")(
         role="Response Humor Stylist",
         goal="Rewrite plain responses to be lively and witty while preserving accuracy.",
         backstory=system_prompt,
@@ -75,20 +146,191 @@ def create_stylist_agent(system_prompt: str, cfg: Settings, provider_override: O
     )
 
 
-def create_stylist_task(agent: Agent, user_prompt: str) -> Task:
-    return Task(
-        description="Rewrite the provided answer per the stylist rules.",
-        expected_output="One rewritten answer only.",
+def _llm_fingerprint(cfg: Settings, provider: str) -> Tuple[Any, ...]:
+    # Every Settings field that build_llm() reads; a change here yields a fresh client.
+    if provider == "openai":
+        return (provider, cfg.openai_model, cfg.get_openai_api_key(), cfg.openai_base_url, cfg.temperature, cfg.max_tokens)
+    return (provider, cfg.ollama_model, cfg.ollama_base_url, os.getenv("OLLAMA_API_KEY"), cfg.temperature, cfg.max_tokens)
+
+
+class AgentPool:
+    """Thread-safe registry of prebuilt LLM clients and stylist agents.
+
+    LLM clients are built once per provider configuration and shared, so their
+    HTTP connection pools stay warm across calls. Agents are checked out
+    exclusively (CrewAI mutates them during a kickoff) and returned afterwards,
+    keyed by (provider, model, tone, serious) plus the prompt they were built with.
+    Entries keyed on stale Settings simply stop being requested.
+    """
+
+    def __init__(self, max_idle_per_key: int = 16) -> None:
+        self.max_idle_per_key = max_idle_per_key
+        self._lock = Lock()
+        self._llms: Dict[Tuple[Any, ...], Any] = {}
+        self._idle: Dict[Tuple[Any, ...], List[Agent]] = {}
+        self._built = 0
+        self._reused = 0
+
+    def llm(self, cfg: Settings, provider_override: Optional[str] = None):
+        provider = (provider_override or cfg.provider).lower()
+        key = _llm_fingerprint(cfg, provider)
+        with self._lock:
+            llm = self._llms.get(key)
+        if llm is not None:
+            return llm
+        t0 = time.perf_counter()
+        llm = build_llm(cfg, provider_override)
+        _report_build("llm", provider, t0)
+        with self._lock:
+            # Another thread may have raced us; keep whichever landed first.
+            return self._llms.setdefault(key, llm)
+
+    def stream_client(self, cfg: Settings, provider_override: Optional[str] = None, asynchronous: bool = False):
+        provider = (provider_override or cfg.provider).lower()
+        key = ("stream", asynchronous) + _llm_fingerprint(cfg, provider)
+        with self._lock:
+            client = self._llms.get(key)
+        if client is not None:
+            return client
+        t0 = time.perf_counter()
+        client = build_stream_client(cfg, provider_override, asynchronous)
+        _report_build("stream_client", provider, t0)
+        with self._lock:
+            return self._llms.setdefault(key, client)
+
+    @contextmanager
+    def agent(
+        self,
+        system_prompt: str,
+        cfg: Settings,
+        tone: StylistTone,
+        serious: bool,
+        provider_override: Optional[str] = None,
+    ) -> Iterator[Agent]:
+        provider = (provider_override or cfg.provider).lower()
+        key = (provider, cfg.active_model(provider), tone, serious, system_prompt, _llm_fingerprint(cfg, provider))
+        with self._lock:
+            idle = self._idle.get(key)
+            agent = idle.pop() if idle else None
+            if agent is not None:
+                self._reused += 1
+        if agent is None:
+            t0 = time.perf_counter()
+            agent = _new_agent(system_prompt, self.llm(cfg, provider_override))
+            _report_build("agent", provider, t0)
+            with self._lock:
+                self._built += 1
+        else:
+            get_metrics_sink().increment("agent_pool_reuses_total", provider=provider)
+        try:
+            yield agent
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_key:
+                    idle.append(agent)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._llms.clear()
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "llm_clients": len(self._llms),
+                "idle_agents": sum(len(v) for v in self._idle.values()),
+                "agents_built": self._built,
+                "agents_reused": self._reused,
+            }
+
+
+def _report_build(kind: str, provider: str, started: float) -> None:
+    sink = get_metrics_sink()
+    if sink.enabled:
+        sink.increment("agent_pool_builds_total", kind=kind, provider=provider)
+        sink.observe("agent_pool_build_seconds", time.perf_counter() - started, kind=kind, provider=provider)
+
+
+AGENT_POOL = AgentPool()
+
+
+def create_stylist_task(agent: Agent, user_prompt: str, expected_output: str = "One rewritten answer only.") -> Task:
+    # Task has no input field; the prompt has to travel in the description to reach the LLM.
+    return _dep("Task")(
+        description=f"Rewrite the provided answer per the stylist rules.\n\n{user_prompt}",
+        expected_output=expected_output,
         agent=agent,
-        input=user_prompt,
     )
 
 
 def run_crew(agent: Agent, task: Task) -> str:
-    crew = Crew(agents=[agent], tasks=[task], verbose=False)
+    crew = _dep("Crew")(agents=[agent], tasks=[task], verbose=False)
     result: Any = crew.kickoff()
+    return _crew_output_text(result)
+
+
+async def arun_crew(agent: Agent, task: Task) -> str:
+    crew = _dep("Crew")(agents=[agent], tasks=[task], verbose=False)
+    # Prefer the native async kickoff; older CrewAI releases only ship the thread-backed variant.
+    kickoff = getattr(crew, "akickoff", None) or crew.kickoff_async
+    result: Any = await kickoff()
+    return _crew_output_text(result)
+
+
+def _messages(system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def run_direct(llm: Any, system_prompt: str, user_prompt: str) -> str:
+    # Single chat completion: no agent scaffolding, no crew orchestration.
+    return llm.call(_messages(system_prompt, user_prompt))
+
+
+async def arun_direct(llm: Any, system_prompt: str, user_prompt: str) -> str:
+    return await llm.acall(_messages(system_prompt, user_prompt))
+
+
+def _stream_params(cfg: Settings, provider: str, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    params: Dict[str, Any] = dict(
+        model=cfg.active_model(provider),
+        messages=_messages(system_prompt, user_prompt),
+        temperature=cfg.temperature,
+        top_p=1.0,
+        max_tokens=cfg.max_tokens,
+        stream=True,
+    )
+    if provider == "ollama":
+        params["extra_body"] = {"num_predict": cfg.max_tokens}
+    return params
+
+
+def stream_completion(client: Any, cfg: Settings, provider: str, system_prompt: str, user_prompt: str) -> Iterator[str]:
+    stream = client.chat.completions.create(**_stream_params(cfg, provider, system_prompt, user_prompt))
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        # Closing the response aborts generation when the consumer stops early.
+        stream.close()
+
+
+async def astream_completion(client: Any, cfg: Settings, provider: str, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+    stream = await client.chat.completions.create(**_stream_params(cfg, provider, system_prompt, user_prompt))
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await stream.close()
+
 
-    if isinstance(result, CrewOutput):
+def _crew_output_text(result: Any) -> str:
+    if isinstance(result, _dep("CrewOutput")):
         if result.raw:
             return result.raw
         if result.tasks_output:
@@ -1,46 +1,449 @@
 from __future__ import annotations
 import hashlib
+import heapq
+import http.client
+import json
+import os
+import sqlite3
+import threading
 import time
+import zlib
+from abc import ABC, abstractmethod
 from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from threading import RLock
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional
+from urllib.parse import quote, unquote, urlsplit
+from .metrics import get_metrics_sink
 
-_STORE: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
-_LOCK = RLock()
+if TYPE_CHECKING:
+    from .settings import Settings
 
 def make_cache_key(*parts: str) -> str:
     payload = "||".join(parts)
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-def cache_get(key: str) -> Optional[str]:
-    with _LOCK:
-        entry = _STORE.get(key)
-        if not entry:
-            return None
-        expires_at, value = entry
-        if expires_at <= time.time():
-            _STORE.pop(key, None)
+
+def _report(backend: str, event: str, count: int = 1) -> None:
+    sink = get_metrics_sink()
+    if sink.enabled and count:
+        sink.increment("cache_events_total", count, backend=backend, event=event)
+
+
+class CacheBackend(ABC):
+    """Key/value store for styled answers. Values expire ``ttl_s`` seconds after they are set."""
+
+    # Whether calls may wait on disk or network I/O; async callers then run them on a worker thread.
+    blocking = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_s: int) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Mapping[str, str], ttl_s: int) -> None:
+        for key, value in items.items():
+            self.set(key, value, ttl_s)
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class MemoryCache(CacheBackend):
+    """Process-local LRU bounded by item count and stored bytes; the default backend.
+
+    Expiry is tracked in a min-heap next to the LRU order, so each write only pops
+    the entries that are actually due instead of scanning the whole store. Heap
+    records left behind by overwrites are skipped lazily and compacted once they
+    outnumber live entries.
+    """
+
+    blocking = False
+
+    def __init__(self, max_items: int = 1024, max_bytes: int = 0, compress_min_bytes: int = 0) -> None:
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.compress_min_bytes = compress_min_bytes
+        # key -> (expires_at, payload, stored_bytes); payload is zlib bytes when compressed
+        self._store: "OrderedDict[str, tuple[float, str | bytes, int]]" = OrderedDict()
+        self._expiry: List[tuple[float, str]] = []
+        self._bytes = 0
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._store.get(key)
+            if entry and entry[0] <= time.time():
+                self._drop_locked(key)
+                self._expirations += 1
+                _report("memory", "expiration")
+                entry = None
+            if not entry:
+                self._misses += 1
+                _report("memory", "miss")
+                return None
+            _, payload, _ = entry
+            self._store.move_to_end(key)
+            self._hits += 1
+        _report("memory", "hit")
+        return zlib.decompress(payload).decode("utf-8") if isinstance(payload, bytes) else payload
+
+    def set(self, key: str, value: str, ttl_s: int) -> None:
+        if ttl_s <= 0 or self.max_items <= 0:
+            return
+        payload, size = self._encode(key, value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires_at = time.time() + ttl_s
+        with self._lock:
+            if key in self._store:
+                self._drop_locked(key)
+            self._store[key] = (expires_at, payload, size)
+            self._bytes += size
+            heapq.heappush(self._expiry, (expires_at, key))
+            self._prune_locked()
+
+    def _encode(self, key: str, value: str) -> tuple[str | bytes, int]:
+        raw = value.encode("utf-8")
+        overhead = len(key)
+        if self.compress_min_bytes and len(raw) >= self.compress_min_bytes:
+            packed = zlib.compress(raw, 6)
+            if len(packed) < len(raw):
+                return packed, len(packed) + overhead
+        return value, len(raw) + overhead
+
+    def _drop_locked(self, key: str) -> None:
+        _, _, size = self._store.pop(key)
+        self._bytes -= size
+
+    def _prune_locked(self) -> None:
+        now = time.time()
+        expired = evicted = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, cache_key = heapq.heappop(self._expiry)
+            entry = self._store.get(cache_key)
+            # Only drop if this heap record still describes the live entry.
+            if entry and entry[0] == expires_at:
+                self._drop_locked(cache_key)
+                expired += 1
+        while len(self._store) > self.max_items or (self.max_bytes and self._bytes > self.max_bytes):
+            _, (_, _, size) = self._store.popitem(last=False)
+            self._bytes -= size
+            evicted += 1
+        self._expirations += expired
+        self._evictions += evicted
+        _report("memory", "expiration", expired)
+        _report("memory", "eviction", evicted)
+        if len(self._expiry) > 2 * len(self._store) + 64:
+            self._expiry = [(expires, k) for k, (expires, _, _) in self._store.items()]
+            heapq.heapify(self._expiry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self._expiry.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "items": len(self._store),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+class SQLiteCache(CacheBackend):
+    """Persistent cache shared by every process on the host that points at the same file.
+
+    WAL mode lets readers proceed while one writer commits, and ``busy_timeout``
+    makes concurrent writers from other workers wait instead of failing.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(self, path: str, max_items: int = 1024, busy_timeout_ms: int = 5000) -> None:
+        self.path = path
+        self.max_items = max_items
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stylist_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS stylist_cache_stored ON stylist_cache (stored_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        now = time.time()
+        found: Dict[str, str] = {}
+        # Stay well under SQLite's bound-parameter limit for large batches.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn().execute(
+                f"SELECT key, value FROM stylist_cache WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*chunk, now),
+            ).fetchall()
+            found.update(rows)
+        _report("sqlite", "hit", len(found))
+        _report("sqlite", "miss", len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: str, ttl_s: int) -> None:
+        self.set_many({key: value}, ttl_s)
+
+    def set_many(self, items: Mapping[str, str], ttl_s: int) -> None:
+        if ttl_s <= 0 or self.max_items <= 0 or not items:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO stylist_cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now + ttl_s, now) for key, value in items.items()],
+            )
+        self._writes += len(items)
+        if self._writes >= self._PRUNE_EVERY:
+            self._writes = 0
+            self.prune()
+
+    def prune(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM stylist_cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM stylist_cache WHERE key IN ("
+                " SELECT key FROM stylist_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_items,),
+            )
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM stylist_cache")
+
+
+class RemoteKVCache(CacheBackend):
+    """HTTP client for a network key/value service speaking the ``KVServer`` protocol.
+
+    ``GET /kv/<key>`` reads one entry, ``POST /mget`` and ``POST /mset`` batch
+    reads and writes, ``DELETE /kv`` clears. Connections are kept alive per thread.
+    """
+
+    def __init__(self, url: str, timeout_s: float = 2.0) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+
+    def _send(self, method: str, path: str, payload: Optional[bytes]) -> tuple[int, bytes]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout_s)
+            self._local.conn = conn
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        conn.request(method, self.prefix + path, body=payload, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+
+    def _request(self, method: str, path: str, body: Optional[object] = None) -> tuple[int, bytes]:
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        try:
+            return self._send(method, path, payload)
+        except (http.client.HTTPException, OSError):
+            # Stale keep-alive connection or timeout: reconnect once before giving up.
+            self._reset()
+            try:
+                return self._send(method, path, payload)
+            except (http.client.HTTPException, OSError):
+                self._reset()
+                raise
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def get(self, key: str) -> Optional[str]:
+        status, data = self._request("GET", f"/kv/{quote(key, safe='')}")
+        if status == 404:
+            _report("remote", "miss")
             return None
-        _STORE.move_to_end(key)
-        return value
+        if status != 200:
+            raise RuntimeError(f"KV get failed with HTTP {status}")
+        _report("remote", "hit")
+        return data.decode("utf-8")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        status, data = self._request("POST", "/mget", {"keys": keys})
+        if status != 200:
+            raise RuntimeError(f"KV mget failed with HTTP {status}")
+        found = json.loads(data)
+        _report("remote", "hit", len(found))
+        _report("remote", "miss", len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: str, ttl_s: int) -> None:
+        self.set_many({key: value}, ttl_s)
+
+    def set_many(self, items: Mapping[str, str], ttl_s: int) -> None:
+        if ttl_s <= 0 or not items:
+            return
+        status, _ = self._request("POST", "/mset", {"items": dict(items), "ttl_s": ttl_s})
+        if status != 204:
+            raise RuntimeError(f"KV mset failed with HTTP {status}")
+
+    def clear(self) -> None:
+        self._request("DELETE", "/kv")
+
+
+class KVServer:
+    """Local stand-in for a network KV service, backed by a ``MemoryCache``.
+
+    Used to exercise ``RemoteKVCache`` in tests and benchmarks without external infra.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, max_items: int = 100_000) -> None:
+        store = MemoryCache(max_items=max_items)
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, status: int, body: bytes = b"") -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self) -> dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self) -> None:
+                value = store.get(unquote(self.path[len("/kv/"):])) if self.path.startswith("/kv/") else None
+                if value is None:
+                    self._reply(404)
+                else:
+                    self._reply(200, value.encode("utf-8"))
+
+            def do_POST(self) -> None:
+                body = self._json()
+                if self.path == "/mget":
+                    self._reply(200, json.dumps(store.get_many(body.get("keys", []))).encode("utf-8"))
+                elif self.path == "/mset":
+                    store.set_many(body.get("items", {}), int(body.get("ttl_s", 0)))
+                    self._reply(204)
+                else:
+                    self._reply(404)
+
+            def do_DELETE(self) -> None:
+                store.clear()
+                self._reply(204)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "KVServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="kv-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "KVServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# The module-level store, sized like the Settings defaults.
+_DEFAULT = MemoryCache(max_items=1024, max_bytes=32 * 1024 * 1024)
+_SHARED: Dict[tuple, MemoryCache] = {(_DEFAULT.max_items, _DEFAULT.max_bytes, _DEFAULT.compress_min_bytes): _DEFAULT}
+_SHARED_LOCK = threading.Lock()
+
+def build_cache_backend(cfg: "Settings") -> CacheBackend:
+    if cfg.cache_backend == "memory":
+        # In-memory enhancers with the same limits share one store, as the module-level cache
+        # always has; other limits get a store of their own rather than resizing everyone's.
+        limits = (cfg.cache_max_items, cfg.cache_max_bytes, cfg.cache_compress_min_bytes)
+        with _SHARED_LOCK:
+            cache = _SHARED.get(limits)
+            if cache is None:
+                cache = _SHARED[limits] = MemoryCache(*limits)
+            return cache
+    if cfg.cache_backend == "sqlite":
+        return SQLiteCache(cfg.cache_sqlite_path, max_items=cfg.cache_max_items)
+    if cfg.cache_backend == "remote":
+        return RemoteKVCache(cfg.cache_remote_url)
+    raise ValueError(f"Unsupported cache backend '{cfg.cache_backend}'")
+
+def cache_get(key: str) -> Optional[str]:
+    return _DEFAULT.get(key)
 
 def cache_set(key: str, value: str, ttl_s: int, max_items: int) -> None:
-    if ttl_s <= 0 or max_items <= 0:
-        return
-    expires_at = time.time() + ttl_s
-    with _LOCK:
-        _STORE[key] = (expires_at, value)
-        _STORE.move_to_end(key)
-        _prune_locked(max_items)
-
-def _prune_locked(max_items: int) -> None:
-    now = time.time()
-    expired = [cache_key for cache_key, (expires, _) in _STORE.items() if expires <= now]
-    for cache_key in expired:
-        _STORE.pop(cache_key, None)
-    while len(_STORE) > max_items:
-        _STORE.popitem(last=False)
+    # ``max_items`` is kept for compatibility only: the module-level store is shared
+    # with every default-configured enhancer, so one caller must not resize it.
+    _DEFAULT.set(key, value, ttl_s)
 
 def cache_clear() -> None:
-    with _LOCK:
-        _STORE.clear()
+    with _SHARED_LOCK:
+        caches = list(_SHARED.values())
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def _serve(args: argparse.Namespace) -> int:
+    try:
+        import uvicorn
+    except ImportError:
+        print("qna-stylist serve requires uvicorn: pip install 'qna-stylist[serve]'", file=sys.stderr)
+        return 2
+    from .server import StylistService
+
+    app = StylistService(
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        deadline_ms=args.deadline_ms,
+        batch_window_ms=args.batch_window_ms,
+        batch_max_size=args.batch_max_size,
+        warmup=not args.no_warmup,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level, lifespan="on")
+    return 0
+
+
+def _prestyle(args: argparse.Namespace) -> int:
+    from .prestyle import prestyle, read_corpus
+    from .types import StylistTone
+
+    tones = [StylistTone(t.strip()) for t in args.tones.split(",") if t.strip()]
+    with (sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")) as fh:
+        records = list(read_corpus(fh, tones))
+    stats = prestyle(records, args.output, workers=args.workers, rate=args.rate, resume=not args.fresh)
+    print(json.dumps(stats))
+    return 1 if stats["failed"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="qna-stylist", description="QnA response stylist.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the HTTP service. Settings come from STYLIST_* variables; flags override them.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--max-concurrency", type=int, default=None, help="requests (or micro-batches) styled at once")
+    serve.add_argument("--max-queue", type=int, default=None, help="requests allowed to wait before answering 429")
+    serve.add_argument("--deadline-ms", type=int, default=None, help="default per-request deadline")
+    serve.add_argument("--batch-window-ms", type=int, default=None, help="micro-batching window, 0 disables")
+    serve.add_argument("--batch-max-size", type=int, default=None)
+    serve.add_argument("--no-warmup", action="store_true", help="skip loading CrewAI/provider SDKs before accepting requests")
+    serve.add_argument("--log-level", default="info")
+    serve.set_defaults(func=_serve)
+
+    pre = commands.add_parser(
+        "prestyle", help="Style a JSONL corpus ahead of time into a snapshot for STYLIST_CACHE_SNAPSHOT_PATH."
+    )
+    pre.add_argument("input", help="JSONL rows with question, answer and optional tones ('-' for stdin)")
+    pre.add_argument("-o", "--output", required=True, help="snapshot file to write")
+    pre.add_argument("--tones", default="witty", help="comma-separated tones for rows without their own")
+    pre.add_argument("--workers", type=int, default=8)
+    pre.add_argument("--rate", type=float, default=0.0, help="max LLM calls per second, 0 = unlimited")
+    pre.add_argument("--fresh", action="store_true", help="ignore the existing snapshot and journal")
+    pre.set_defaults(func=_prestyle)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+from __future__ import annotations
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, Optional, Tuple
+from .settings import Settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ProviderHealth:
+    """Rolling latency/error window plus a circuit breaker for one provider.
+
+    The breaker opens once the error rate over the window crosses the threshold.
+    After ``cooldown_s`` a single probe request is let through (half-open): success
+    closes the breaker, failure re-opens it. A probe that never reports back is
+    abandoned after another cooldown so the provider cannot stay stuck.
+    """
+
+    def __init__(self, window: int = 50, error_threshold: float = 0.5, min_calls: int = 5, cooldown_s: float = 30.0) -> None:
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.cooldown_s = cooldown_s
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._lock = Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to this provider now; claims the probe slot when half-open."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if now - self._opened_at < self.cooldown_s:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_started = None
+            if self._probe_started is not None and now - self._probe_started < self.cooldown_s:
+                return False
+            self._probe_started = now
+            return True
+
+    def is_open(self) -> bool:
+        """Whether ``allow_request()`` would refuse now: open and still cooling down, or
+        half-open with its probe in flight. Read-only, so it never claims the probe slot."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN:
+                return now - self._opened_at < self.cooldown_s
+            if self._state == HALF_OPEN:
+                return self._probe_started is not None and now - self._probe_started < self.cooldown_s
+            return False
+
+    def record_success(self, latency_s: float) -> None:
+        with self._lock:
+            self._latencies.append(latency_s)
+            self._outcomes.append(True)
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_started = None
+                self._outcomes.clear()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            if self._state == HALF_OPEN:
+                self._trip_locked()
+                return
+            if len(self._outcomes) >= self.min_calls and self._error_rate_locked() >= self.error_threshold:
+                self._trip_locked()
+
+    def _trip_locked(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+
+    def _error_rate_locked(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[idx]
+
+    def hedge_delay_s(self, default_s: float, min_samples: int = 10) -> float:
+        with self._lock:
+            enough = len(self._latencies) >= min_samples
+        p95 = self.latency_percentile(95) if enough else None
+        return p95 if p95 is not None else default_s
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state, error_rate, calls = self._state, self._error_rate_locked(), len(self._outcomes)
+        return {
+            "state": state,
+            "error_rate": round(error_rate, 3),
+            "calls": calls,
+            "p50_ms": _ms(self.latency_percentile(50)),
+            "p95_ms": _ms(self.latency_percentile(95)),
+            "p99_ms": _ms(self.latency_percentile(99)),
+        }
+
+
+def _ms(value: Optional[float]) -> Optional[int]:
+    return None if value is None else int(value * 1000)
+
+
+def _breaker_config(cfg: Settings) -> Tuple[int, float, int, float]:
+    return cfg.breaker_window, cfg.breaker_error_threshold, cfg.breaker_min_calls, cfg.breaker_cooldown_s
+
+
+class HealthRegistry:
+    """Process-wide ``ProviderHealth`` per provider and breaker configuration.
+
+    Enhancers configured alike share one window and breaker; one with other
+    breaker settings gets its own instead of inheriting the first caller's.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._providers: Dict[Tuple[str, Tuple[int, float, int, float]], ProviderHealth] = {}
+
+    def get(self, provider: str, cfg: Settings) -> ProviderHealth:
+        key = (provider, _breaker_config(cfg))
+        with self._lock:
+            health = self._providers.get(key)
+            if health is None:
+                window, error_threshold, min_calls, cooldown_s = key[1]
+                health = ProviderHealth(
+                    window=window,
+                    error_threshold=error_threshold,
+                    min_calls=min_calls,
+                    cooldown_s=cooldown_s,
+                )
+                self._providers[key] = health
+            return health
+
+    def snapshot(self, cfg: Settings) -> Dict[str, Dict[str, Any]]:
+        """State of the providers ``cfg``'s breaker configuration has seen, by provider."""
+        config = _breaker_config(cfg)
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: health.snapshot() for (name, key), health in providers.items() if key == config}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+
+HEALTH = HealthRegistry()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+from contextlib import nullcontext
+from threading import Lock
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+_NO_SPAN = nullcontext()
+
+class MetricsSink:
+    """Counters, latency histograms and spans emitted by the stylist; the base class discards them.
+
+    Call sites pass metric names without a namespace and a small fixed set of labels
+    per name. Subclasses map them onto a metrics backend. ``enabled`` lets the
+    pipeline skip building per-request metric payloads when nobody is listening.
+    """
+
+    enabled = False
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        pass
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        pass
+
+    def span(self, name: str, **attrs: Any) -> ContextManager[Any]:
+        return _NO_SPAN
+
+    def exposition(self) -> Optional[Tuple[str, bytes]]:
+        """``(content_type, body)`` for a scrape endpoint, or None when the backend is push-based or absent."""
+        return None
+
+
+NULL_SINK = MetricsSink()
+
+
+class PrometheusSink(MetricsSink):
+    """Exports ``<namespace>_<name>`` counters and histograms through ``prometheus_client``."""
+
+    enabled = True
+
+    def __init__(self, namespace: str = "stylist", registry: Any = None) -> None:
+        try:
+            import prometheus_client
+        except ImportError as e:
+            raise RuntimeError("PrometheusSink requires prometheus-client: pip install 'qna-stylist[prometheus]'") from e
+        self._prom = prometheus_client
+        self.namespace = namespace
+        self.registry = registry if registry is not None else prometheus_client.REGISTRY
+        self._lock = Lock()
+        self._metrics: Dict[Tuple[str, str], Any] = {}
+
+    def _metric(self, kind: str, name: str, labels: Dict[str, str]) -> Any:
+        metric = self._metrics.get((kind, name))
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get((kind, name))
+                if metric is None:
+                    cls = self._prom.Counter if kind == "counter" else self._prom.Histogram
+                    metric = cls(name, name.replace("_", " "), sorted(labels), namespace=self.namespace, registry=self.registry)
+                    self._metrics[(kind, name)] = metric
+        return metric.labels(**labels) if labels else metric
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self._metric("counter", name, labels).inc(value)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        self._metric("histogram", name, labels).observe(seconds)
+
+    def exposition(self) -> Optional[Tuple[str, bytes]]:
+        return self._prom.CONTENT_TYPE_LATEST, self._prom.generate_latest(self.registry)
+
+
+class OpenTelemetrySink(MetricsSink):
+    """Records spans and instruments through the OpenTelemetry API (SDK/exporter configured by the app)."""
+
+    enabled = True
+
+    def __init__(self, tracer: Any = None, meter: Any = None, namespace: str = "stylist") -> None:
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError as e:
+            raise RuntimeError("OpenTelemetrySink requires opentelemetry-api: pip install 'qna-stylist[otel]'") from e
+        self.namespace = namespace
+        self.tracer = tracer or trace.get_tracer("qna_stylist")
+        self.meter = meter or metrics.get_meter("qna_stylist")
+        self._lock = Lock()
+        self._instruments: Dict[Tuple[str, str], Any] = {}
+
+    def _instrument(self, kind: str, name: str) -> Any:
+        inst = self._instruments.get((kind, name))
+        if inst is None:
+            with self._lock:
+                inst = self._instruments.get((kind, name))
+                if inst is None:
+                    full = f"{self.namespace}.{name}"
+                    if kind == "counter":
+                        inst = self.meter.create_counter(full)
+                    else:
+                        inst = self.meter.create_histogram(full, unit="s")
+                    self._instruments[(kind, name)] = inst
+        return inst
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self._instrument("counter", name).add(value, labels)
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        self._instrument("histogram", name).record(seconds, labels)
+
+    def span(self, name: str, **attrs: Any) -> ContextManager[Any]:
+        return self.tracer.start_as_current_span(name, attributes=attrs)
+
+
+_SINK: MetricsSink = NULL_SINK
+_BUILT: Dict[str, MetricsSink] = {}
+_BUILD_LOCK = Lock()
+
+def get_metrics_sink() -> MetricsSink:
+    """Process-wide sink used by the agent pool and cache backends."""
+    return _SINK
+
+def set_metrics_sink(sink: Optional[MetricsSink]) -> None:
+    global _SINK
+    _SINK = sink or NULL_SINK
+
+def build_metrics_sink(cfg: "Settings") -> MetricsSink:
+    if cfg.metrics_sink == "none":
+        return NULL_SINK
+    # Backends register instruments globally, so each kind is built once per process.
+    with _BUILD_LOCK:
+        sink = _BUILT.get(cfg.metrics_sink)
+        if sink is None:
+            if cfg.metrics_sink == "prometheus":
+                sink = PrometheusSink()
+            elif cfg.metrics_sink == "otel":
+                sink = OpenTelemetrySink()
+            else:
+                raise ValueError(f"Unsupported metrics sink '{cfg.metrics_sink}'")
+            _BUILT[cfg.metrics_sink] = sink
+        return sink
@@ -1,23 +1,374 @@
 from __future__ import annotations
+import asyncio
+import random
 import time
+from contextvars import ContextVar
 import structlog
-from tenacity import Retrying, stop_after_attempt, wait_random_exponential, retry_if_exception_type, RetryCallState
-from typing import Optional, List
-from .types import StylistTone, StylistResult
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from threading import Lock
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    stop_after_attempt,
+    wait_random_exponential,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    RetryCallState,
+)
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, List, Sequence, Tuple, TypeVar, Union
+from .types import ProviderAttempt, StylistTone, StylistResult
 from .settings import Settings
-from .safety import analyze_topic, clamp_length, strip_excess_emojis
-from .prompts import build_system_prompt, build_user_prompt
-from .agents import create_stylist_agent, create_stylist_task, run_crew
-from .cache import cache_get, cache_set, make_cache_key
+from .safety import StreamingPostProcessor, analyze_topic, analyze_topics, clamp_length, strip_excess_emojis, topic_matcher
+from .prompts import (
+    build_packed_user_prompt,
+    build_system_prompt,
+    build_user_prompt,
+    estimate_tokens,
+    parse_packed,
+    parse_tone_variants,
+)
+from .agents import (
+    AGENT_POOL,
+    create_stylist_task,
+    run_crew,
+    arun_crew,
+    run_direct,
+    arun_direct,
+    stream_completion,
+    astream_completion,
+    warmup,
+)
+from .cache import CacheBackend, build_cache_backend, make_cache_key
+from .similarity import MinHashIndex, canonical_text, similarity_index
+from .snapshot import SnapshotCache, load_snapshot
+from .singleflight import LeaderCancelled, SingleFlight
+from .health import HEALTH
+from .routing import RouteDecision, choose_route
+from .scheduler import BULK, INTERACTIVE, SCHEDULER, ProviderScheduler
+from .metrics import MetricsSink, build_metrics_sink, set_metrics_sink
 
 log = structlog.get_logger(__name__)
 
+_T = TypeVar("_T")
+
 class StylistError(RuntimeError):
     pass
 
+class DeadlineExceeded(StylistError):
+    """The request's latency budget ran out; it is never retried."""
+
+class _MalformedOutput(StylistError):
+    """A multi-tone or packed reply held no usable part; its tones or items are then styled one by one."""
+
+class _Trace:
+    """Stage timings and provider attempts of one request; cheap enough to always collect.
+
+    Hedged attempts run concurrently, so their stage times add up to more than wall time.
+    """
+
+    __slots__ = ("started", "stages", "attempts", "round", "provider", "led", "coalesced", "deadline", "priority", "route")
+
+    def __init__(
+        self,
+        started: Optional[float] = None,
+        deadline_s: Optional[float] = None,
+        priority: str = INTERACTIVE,
+        route: Optional[RouteDecision] = None,
+    ) -> None:
+        self.started = started if started is not None else time.perf_counter()
+        # Absolute perf_counter() time the request must finish by; None means unbounded.
+        self.deadline = self.started + deadline_s if deadline_s else None
+        self.stages: Dict[str, float] = {}
+        self.attempts: List[ProviderAttempt] = []
+        self.round = 0
+        self.provider: Optional[str] = None
+        self.led = False
+        self.coalesced = False
+        self.priority = priority  # place in the provider queues: INTERACTIVE or BULK
+        self.route = route  # provider and model picked for this request; None means Settings.provider
+
+    def add(self, stage: str, since: float) -> float:
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - since)
+        return now
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.perf_counter()
+
+    def check(self) -> None:
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise DeadlineExceeded("deadline exceeded")
+
+    def _backoff_fits(self, seconds: float) -> None:
+        # A retry that could only start at or after the deadline is not worth sleeping for.
+        remaining = self.remaining()
+        if remaining is not None and seconds >= remaining:
+            raise DeadlineExceeded("deadline exceeded before the next retry")
+
+    def sleep(self, seconds: float) -> None:
+        self._backoff_fits(seconds)
+        t = time.perf_counter()
+        time.sleep(seconds)
+        self.add("backoff", t)
+
+    async def asleep(self, seconds: float) -> None:
+        self._backoff_fits(seconds)
+        t = time.perf_counter()
+        await asyncio.sleep(seconds)
+        self.add("backoff", t)
+
+    def summary(self, total_s: float, primary: str) -> Dict[str, Any]:
+        timings = {f"{stage}_ms": round(seconds * 1000, 3) for stage, seconds in self.stages.items()}
+        timings["total_ms"] = round(total_s * 1000, 3)
+        return {
+            "timings": timings,
+            "attempts": list(self.attempts),
+            "provider": self.provider,
+            "retries": max(0, self.round - 1),
+            "provider_fallback": self.provider is not None and self.provider != primary,
+            "coalesced": self.coalesced,
+        }
+
+# _invoke()/_ainvoke() keep their (question, answer, tone, serious) signature; the
+# request's trace reaches them through this variable and then travels on _CallSpec.
+_TRACE: ContextVar[Optional[_Trace]] = ContextVar("stylist_trace", default=None)
+
+class _Prepared(NamedTuple):
+    reduce: bool
+    note: Optional[str]
+    used_tone: StylistTone
+    cache_key: str
+    route: RouteDecision
+
+class _CacheMatch(NamedTuple):
+    text: str
+    match: str  # "exact", "normalized" or "similar"
+    similarity: Optional[float] = None
+
+class _CallSpec(NamedTuple):
+    system_prompt: str
+    user_prompt: str
+    tone: StylistTone
+    serious: bool
+    trace: _Trace
+    tones: Tuple[StylistTone, ...] = ()  # set for multi-tone fan-out calls
+    packed: int = 0  # number of ID-tagged items in a packed call
+
+class _PackItem(NamedTuple):
+    question: str
+    answer: str
+    tone: StylistTone
+    serious: bool
+    key: str
+    route: Optional[RouteDecision] = None
+
+class _MultiCall:
+    """How one packed or multi-tone call ended: the parts it returned (by index or tone) or its error."""
+
+    __slots__ = ("parts", "tokens_saved", "error")
+
+    def __init__(self) -> None:
+        self.parts: Dict[Any, str] = {}
+        self.tokens_saved = 0
+        self.error: Optional[Exception] = None
+
+# Items are packed only with items of the same tone, serious flag and routed model.
+_PackGroup = Tuple[StylistTone, bool, Optional[str]]
+
+class _AsyncPacker:
+    """Holds aenhance() misses for up to ``pack_max_wait_ms`` so that misses sharing a
+    tone and serious flag go out as one packed call of at most ``pack_max_items``."""
+
+    def __init__(self, enhancer: "ResponseStyleEnhancer") -> None:
+        self.enhancer = enhancer
+        self._groups: Dict[_PackGroup, List[Tuple[_PackItem, _Trace, float, "asyncio.Future[str]"]]] = {}
+        self._timers: Dict[_PackGroup, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+    def submit(self, item: _PackItem, trace: _Trace) -> "asyncio.Future[str]":
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[str]" = loop.create_future()
+        group_key = (item.tone, item.serious, item.route.model_key if item.route else None)
+        group = self._groups.setdefault(group_key, [])
+        group.append((item, trace, time.perf_counter(), future))
+        if len(group) >= self.enhancer.cfg.pack_max_items:
+            self._flush(group_key)
+        elif group_key not in self._timers:
+            self._timers[group_key] = loop.call_later(self.enhancer.cfg.pack_max_wait_ms / 1000, self._flush, group_key)
+        return future
+
+    def _flush(self, group_key: _PackGroup) -> None:
+        timer = self._timers.pop(group_key, None)
+        if timer is not None:
+            timer.cancel()
+        # Callers that gave up while waiting are dropped.
+        live = [entry for entry in self._groups.pop(group_key, []) if not entry[3].done()]
+        for _, trace, submitted, _ in live:
+            trace.add("pack_wait", submitted)
+        if live:
+            task = asyncio.ensure_future(self._run(live))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _pack_trace(traces: Sequence[_Trace]) -> _Trace:
+        """One trace for the shared call: the loosest deadline of the group and its most urgent priority.
+
+        Each caller still bounds its own wait by its own deadline, so a tight budget in the
+        group fails only that caller instead of cutting the call short for everyone.
+        """
+        deadlines = [trace.deadline for trace in traces]
+        priority = INTERACTIVE if any(trace.priority == INTERACTIVE for trace in traces) else BULK
+        pack = _Trace(min(trace.started for trace in traces), priority=priority, route=traces[0].route)
+        pack.deadline = None if None in deadlines else max(deadlines)
+        return pack
+
+    async def _run(self, live: List[Tuple[_PackItem, _Trace, float, "asyncio.Future[str]"]]) -> None:
+        items = list({item.key: item for item, _, _, _ in live}.values())
+        pack = self._pack_trace([trace for _, trace, _, _ in live])
+        try:
+            out = await self.enhancer._astyle_packed(items, pack)
+        except Exception as e:
+            out = {item.key: e for item in items}
+        for item, trace, _, future in live:
+            if future.done():
+                continue
+            # Every caller waited on the same call, so each reports its stages and attempts.
+            for stage, seconds in pack.stages.items():
+                trace.stages[stage] = trace.stages.get(stage, 0.0) + seconds
+            trace.attempts.extend(pack.attempts)
+            trace.round, trace.provider, trace.led = pack.round, pack.provider, pack.led
+            result = out[item.key]
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+class _StreamRun:
+    """One enhance_stream()/aenhance_stream() call: cache lookup, the retry and fallback
+    walk, attempt bookkeeping and the final fallback. The two generators only differ
+    in how they schedule, open and read the token stream."""
+
+    def __init__(self, enhancer: "ResponseStyleEnhancer", question: str, plain_answer: str, tone: StylistTone) -> None:
+        self.enhancer = enhancer
+        self.question = question
+        self.plain_answer = plain_answer
+        self.trace = trace = _Trace()
+        self.last_error: Optional[Exception] = None
+        reduce, _, self.used_tone, self.cache_key, trace.route = enhancer._prepare(question, plain_answer, tone)
+        t = trace.add("analyze", trace.started)
+        hit = enhancer._lookup(question, plain_answer, self.used_tone, self.cache_key, model_key=trace.route.model_key)
+        t = trace.add("cache", t)
+        self.hit = hit.text if hit is not None else None
+        if hit is not None:
+            log.info("stylist.cache_hit", key=self.cache_key, match=hit.match, similarity=hit.similarity)
+            enhancer._stream_outcome(trace, "hit")
+            return
+        self.system_prompt, self.user_prompt = enhancer._prompts(question, plain_answer, self.used_tone, reduce)
+        trace.add("prompt", t)
+        enhancer._log_call(self.system_prompt, self.user_prompt)
+
+    def steps(self) -> Iterator[Union[str, float]]:
+        """Providers to try, in order; a float between rounds is the backoff to sleep first."""
+        attempts = self.enhancer.cfg.retry_attempts
+        for attempt in range(attempts):
+            self.trace.round = attempt + 1
+            for provider_choice in self.enhancer._provider_chain(self.trace.route.provider):
+                if self.enhancer._admit(provider_choice):
+                    yield provider_choice
+            if attempt + 1 < attempts:
+                log.warning("stylist.retry", try_num=attempt + 1, err=str(self.last_error))
+                yield float(self.enhancer._stream_backoff_s(attempt))
+
+    def post(self) -> StreamingPostProcessor:
+        return StreamingPostProcessor(self.enhancer.cfg.max_length_chars, self.enhancer.cfg.max_emojis)
+
+    def failed(self, provider_choice: str, post: StreamingPostProcessor, started: float, err: Exception) -> bool:
+        """Record a failed attempt; True if text already reached the caller, so the stream ends here."""
+        self.enhancer._health.get(provider_choice, self.enhancer.cfg).record_failure()
+        self.enhancer._attempt_done(self.trace, provider_choice, started, err)
+        if post.text:
+            # A restart would duplicate what was already yielded.
+            log.error("stylist.stream_interrupted", provider=provider_choice, err=str(err))
+            self.enhancer._stream_outcome(self.trace, "interrupted")
+            return True
+        self.last_error = err
+        log.warning("stylist.provider_attempt_failed", provider=provider_choice, err=str(err))
+        return False
+
+    def ended(self, provider_choice: str, post: StreamingPostProcessor, started: float) -> bool:
+        """Record a completed attempt; True if it produced text, which is then cached."""
+        health = self.enhancer._health.get(provider_choice, self.enhancer.cfg)
+        if not post.text:
+            health.record_failure()
+            self.last_error = StylistError("Empty LLM output")
+            self.enhancer._attempt_done(self.trace, provider_choice, started, self.last_error)
+            return False
+        health.record_success(time.perf_counter() - started)
+        self.enhancer._attempt_done(self.trace, provider_choice, started)
+        entry = (self.question, self.plain_answer, self.used_tone, self.cache_key, post.text)
+        self.enhancer._store([entry], self.enhancer._trace_model_key(self.trace))
+        log.info("stylist.stream_done", provider=provider_choice, chars=len(post.text), cut_off=post.done)
+        self.enhancer._stream_outcome(self.trace, "styled")
+        return True
+
+    def fallback(self) -> str:
+        log.error("stylist.fallback", reason=str(self.last_error))
+        self.enhancer._stream_outcome(self.trace, "fallback")
+        return self.plain_answer
+
+# Shared like the cache itself, so identical misses coalesce across enhancer instances.
+_FLIGHTS = SingleFlight()
+
+def _log_retry(retry_state: RetryCallState) -> None:
+    err = None
+    if retry_state.outcome:
+        try:
+            err = retry_state.outcome.exception()
+        except Exception:
+            err = retry_state.outcome
+    log.warning(
+        "stylist.retry",
+        try_num=retry_state.attempt_number,
+        err=str(err) if err else "unknown"
+    )
+
 class ResponseStyleEnhancer:
-    def __init__(self, cfg: Optional[Settings] = None) -> None:
+    def __init__(
+        self,
+        cfg: Optional[Settings] = None,
+        cache: Optional[CacheBackend] = None,
+        metrics: Optional[MetricsSink] = None,
+    ) -> None:
         self.cfg = cfg or Settings()
+        self.cache = cache or build_cache_backend(self.cfg)
+        if self.cfg.cache_snapshot_path:
+            snapshot = load_snapshot(self.cfg.cache_snapshot_path, self.cfg)
+            if snapshot is not None:
+                self.cache = SnapshotCache(snapshot, self.cache, self.cfg.cache_ttl_s)
+        self.metrics = metrics or build_metrics_sink(self.cfg)
+        if self.metrics.enabled:
+            # The agent pool and cache backends are process-wide, so they report to the process-wide sink.
+            set_metrics_sink(self.metrics)
+        self._async_limit: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        self._async_packer: Optional[Tuple[asyncio.AbstractEventLoop, _AsyncPacker]] = None
+        self._pack_stats = {"packs": 0, "items": 0, "retried": 0, "tokens_saved": 0}
+        self._pack_lock = Lock()
+        self._flights = _FLIGHTS
+        self._agents = AGENT_POOL
+        self._health = HEALTH
+        self._scheduler = SCHEDULER
+        self._default_route = RouteDecision(self.cfg.provider, self.cfg.active_model(), "default", 0)
+        # Resolved once: looking it up per request means hashing both keyword lists every time.
+        self.topics = topic_matcher(self.cfg)
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._deadline_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = Lock()
+        self._similar: Optional[MinHashIndex] = (
+            similarity_index(self.cache, self.cfg.cache_max_items) if self.cfg.cache_similar_lookup else None
+        )
         log.info(
             "stylist.init",
             provider=self.cfg.provider,
@@ -25,121 +376,873 @@ class ResponseStyleEnhancer:
             ollama_model=self.cfg.ollama_model,
             temperature=self.cfg.temperature,
             max_tokens=self.cfg.max_tokens,
+            cache_backend=type(self.cache).__name__,
         )
 
-    def _provider_chain(self) -> List[str]:
-        chain = [self.cfg.provider]
+    def _provider_chain(self, primary: Optional[str] = None) -> List[str]:
+        primary = primary or self.cfg.provider
+        chain = [primary]
         fallback = None
-        if self.cfg.provider == "openai":
+        if primary == "openai":
             fallback = "ollama"
-        elif self.cfg.provider == "ollama" and self.cfg.get_openai_api_key():
+        elif primary == "ollama" and self.cfg.get_openai_api_key():
             fallback = "openai"
         if fallback and fallback not in chain:
             chain.append(fallback)
         return chain
 
-    def _invoke(self, question: str, answer: str, tone: StylistTone, serious: bool) -> str:
-        def _log_retry(retry_state: RetryCallState) -> None:
-            err = None
-            if retry_state.outcome:
-                try:
-                    err = retry_state.outcome.exception()
-                except Exception:
-                    err = retry_state.outcome
-            log.warning(
-                "stylist.retry",
-                try_num=retry_state.attempt_number,
-                err=str(err) if err else "unknown"
-            )
-
-        retryer = Retrying(
+    def _retry_kwargs(self) -> Dict[str, Any]:
+        return dict(
             reraise=True,
             stop=stop_after_attempt(self.cfg.retry_attempts),
             wait=wait_random_exponential(
                 multiplier=self.cfg.retry_min_wait_s,
                 max=self.cfg.retry_max_wait_s
             ),
-            retry=retry_if_exception_type((StylistError, RuntimeError)),
+            # A malformed multi-part reply goes straight to the per-part path instead of repeating the whole call.
+            retry=retry_if_exception_type((StylistError, RuntimeError))
+            & retry_if_not_exception_type((DeadlineExceeded, _MalformedOutput)),
             before_sleep=_log_retry
         )
 
-        def _call_with_provider(provider_choice: str) -> str:
-            provider_override = None if provider_choice == self.cfg.provider else provider_choice
-            system_prompt = build_system_prompt(
-                tone=tone,
-                max_emojis=self.cfg.max_emojis,
-                max_length_chars=self.cfg.max_length_chars,
-                serious=serious
-            )
-            user_prompt = build_user_prompt(question, answer)
-            agent = create_stylist_agent(system_prompt, self.cfg, provider_override)
-            task = create_stylist_task(agent, user_prompt)
-
-            out = run_crew(agent, task)
-            if not isinstance(out, str) or not out.strip():
-                raise StylistError("Empty LLM output")
-            return out.strip()
-
-        def execute_call() -> str:
-            last_error: Optional[Exception] = None
-            for provider_choice in self._provider_chain():
+    def _prompts(self, question: str, answer: str, tone: StylistTone, serious: bool) -> Tuple[str, str]:
+        system_prompt = build_system_prompt(
+            tone=tone,
+            max_emojis=self.cfg.max_emojis,
+            max_length_chars=self.cfg.max_length_chars,
+            serious=serious
+        )
+        return system_prompt, build_user_prompt(question, answer)
+
+    @staticmethod
+    def _primary(trace: _Trace) -> Optional[str]:
+        return trace.route.provider if trace.route else None
+
+    def _provider_override(self, provider_choice: str) -> Optional[str]:
+        return None if provider_choice == self.cfg.provider else provider_choice
+
+    @staticmethod
+    def _task(agent: Any, spec: "_CallSpec") -> Any:
+        if spec.packed:
+            return create_stylist_task(agent, spec.user_prompt, "One <<<ITEM n>>> ... <<<END n>>> block per item.")
+        if spec.tones:
+            return create_stylist_task(agent, spec.user_prompt, "A JSON object with one rewritten answer per requested tone.")
+        return create_stylist_task(agent, spec.user_prompt)
+
+    def _call_provider(self, override: Optional[str], spec: "_CallSpec") -> str:
+        t = time.perf_counter()
+        if self.cfg.execution_mode == "direct":
+            llm = self._agents.llm(self.cfg, override)
+            t = spec.trace.add("agent", t)
+            try:
+                return run_direct(llm, spec.system_prompt, spec.user_prompt)
+            finally:
+                spec.trace.add("provider", t)
+        with self._agents.agent(spec.system_prompt, self.cfg, spec.tone, spec.serious, override) as agent:
+            task = self._task(agent, spec)
+            t = spec.trace.add("agent", t)
+            try:
+                return run_crew(agent, task)
+            finally:
+                spec.trace.add("provider", t)
+
+    async def _acall_provider(self, override: Optional[str], spec: "_CallSpec") -> str:
+        t = time.perf_counter()
+        if self.cfg.execution_mode == "direct":
+            llm = self._agents.llm(self.cfg, override)
+            t = spec.trace.add("agent", t)
+            try:
+                return await arun_direct(llm, spec.system_prompt, spec.user_prompt)
+            finally:
+                spec.trace.add("provider", t)
+        with self._agents.agent(spec.system_prompt, self.cfg, spec.tone, spec.serious, override) as agent:
+            task = self._task(agent, spec)
+            t = spec.trace.add("agent", t)
+            try:
+                return await arun_crew(agent, task)
+            finally:
+                spec.trace.add("provider", t)
+
+    def _attempt_done(self, trace: _Trace, provider_choice: str, started: float, err: Optional[Exception] = None) -> None:
+        elapsed = time.perf_counter() - started
+        trace.attempts.append({
+            "provider": provider_choice,
+            "round": trace.round,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "ok": err is None,
+            "error": None if err is None else str(err),
+        })
+        if err is None and trace.provider is None:
+            trace.provider = provider_choice
+        self.metrics.increment("provider_attempts_total", provider=provider_choice, outcome="ok" if err is None else "error")
+        self.metrics.observe("provider_seconds", elapsed, provider=provider_choice)
+
+    def _queue_args(self, system_prompt: str, user_prompt: str, trace: _Trace) -> Tuple[int, str, Optional[float]]:
+        remaining = trace.remaining()
+        tokens = estimate_tokens(system_prompt, user_prompt) + self.cfg.max_tokens
+        return tokens, trace.priority, None if remaining is None else max(0.0, remaining)
+
+    def _queued(self, provider_choice: str, trace: _Trace, since: float, admitted: bool) -> None:
+        if not admitted:
+            raise DeadlineExceeded("deadline exceeded waiting for provider capacity")
+        waited = time.perf_counter() - since
+        trace.add("provider_queue", since)
+        if waited >= 0.001:
+            log.debug("stylist.provider_queued", provider=provider_choice, priority=trace.priority, wait_ms=int(waited * 1000))
+        self.metrics.observe("provider_queue_seconds", waited, provider=provider_choice, priority=trace.priority)
+
+    def _schedule(self, provider_choice: str, system_prompt: str, user_prompt: str, trace: _Trace) -> ProviderScheduler:
+        """Wait for room under ``provider_choice``'s rate limits; the caller must release() the slot."""
+        scheduler = self._scheduler.get(provider_choice, self.cfg)
+        if scheduler.enabled:
+            t = time.perf_counter()
+            admitted = scheduler.acquire(*self._queue_args(system_prompt, user_prompt, trace))
+            self._queued(provider_choice, trace, t, admitted)
+        return scheduler
+
+    async def _aschedule(self, provider_choice: str, system_prompt: str, user_prompt: str, trace: _Trace) -> ProviderScheduler:
+        scheduler = self._scheduler.get(provider_choice, self.cfg)
+        if scheduler.enabled:
+            t = time.perf_counter()
+            admitted = await scheduler.aacquire(*self._queue_args(system_prompt, user_prompt, trace))
+            self._queued(provider_choice, trace, t, admitted)
+        return scheduler
+
+    def _bounded_call(self, override: Optional[str], spec: "_CallSpec", bounded: bool, scheduler: ProviderScheduler) -> Any:
+        remaining = spec.trace.remaining() if bounded else None
+        if remaining is None:
+            try:
+                return self._call_provider(override, spec)
+            finally:
+                scheduler.release()
+        # Sync provider calls cannot be interrupted: past the deadline the caller moves on
+        # and a call already running finishes in the background, like a hedge loser. It
+        # keeps its scheduler slot until it really ends; one still waiting for a thread
+        # is cancelled instead. Their own pool keeps such stragglers from delaying hedges.
+        future = self._deadline_executor().submit(self._call_provider, override, spec)
+        future.add_done_callback(lambda _: scheduler.release())
+        try:
+            return future.result(timeout=max(0.0, remaining))
+        except FutureTimeout:
+            future.cancel()
+            raise DeadlineExceeded("deadline exceeded during provider call") from None
+
+    def _tracked_call(self, provider_choice: str, spec: "_CallSpec", bounded: bool = True) -> str:
+        health = self._health.get(provider_choice, self.cfg)
+        scheduler = self._schedule(provider_choice, spec.system_prompt, spec.user_prompt, spec.trace)
+        t0 = time.perf_counter()
+        with self.metrics.span("stylist.provider_call", provider=provider_choice, round=spec.trace.round):
+            try:
+                out = self._check_output(self._bounded_call(self._provider_override(provider_choice), spec, bounded, scheduler))
+            except DeadlineExceeded as e:
+                # Running out of budget says nothing about the provider's health.
+                self._attempt_done(spec.trace, provider_choice, t0, e)
+                raise
+            except Exception as e:
+                health.record_failure()
+                self._attempt_done(spec.trace, provider_choice, t0, e)
+                raise
+        health.record_success(time.perf_counter() - t0)
+        self._attempt_done(spec.trace, provider_choice, t0)
+        return out
+
+    async def _atracked_call(self, provider_choice: str, spec: "_CallSpec") -> str:
+        health = self._health.get(provider_choice, self.cfg)
+        scheduler = await self._aschedule(provider_choice, spec.system_prompt, spec.user_prompt, spec.trace)
+        t0 = time.perf_counter()
+        with self.metrics.span("stylist.provider_call", provider=provider_choice, round=spec.trace.round):
+            try:
+                call = self._acall_provider(self._provider_override(provider_choice), spec)
+                remaining = spec.trace.remaining()
+                try:
+                    if remaining is not None:
+                        try:
+                            # wait_for cancels the in-flight request once the budget is gone.
+                            call = asyncio.wait_for(call, max(0.0, remaining))
+                            out = self._check_output(await call)
+                        except asyncio.TimeoutError:
+                            raise DeadlineExceeded("deadline exceeded during provider call") from None
+                    else:
+                        out = self._check_output(await call)
+                finally:
+                    scheduler.release()
+            except asyncio.CancelledError:
+                # A cancelled hedge loser says nothing about the provider's health.
+                raise
+            except DeadlineExceeded as e:
+                self._attempt_done(spec.trace, provider_choice, t0, e)
+                raise
+            except Exception as e:
+                health.record_failure()
+                self._attempt_done(spec.trace, provider_choice, t0, e)
+                raise
+        health.record_success(time.perf_counter() - t0)
+        self._attempt_done(spec.trace, provider_choice, t0)
+        return out
+
+    def _admit(self, provider_choice: str) -> bool:
+        if self._health.get(provider_choice, self.cfg).allow_request():
+            return True
+        log.info("stylist.provider_skipped", provider=provider_choice, reason="circuit_open")
+        return False
+
+    def _attempt_failed(self, provider_choice: str, err: Exception) -> None:
+        log.warning(
+            "stylist.provider_attempt_failed",
+            provider=provider_choice,
+            err=str(err),
+        )
+
+    def _log_call(self, system_prompt: str, user_prompt: str) -> None:
+        log.debug(
+            "stylist.llm_call",
+            mode=self.cfg.execution_mode,
+            prompt_tokens_est=estimate_tokens(system_prompt, user_prompt),
+            max_tokens=self.cfg.max_tokens,
+        )
+
+    @staticmethod
+    def _check_output(out: Any) -> str:
+        if not isinstance(out, str) or not out.strip():
+            raise StylistError("Empty LLM output")
+        return out.strip()
+
+    @staticmethod
+    def _chain_failed(last_error: Optional[Exception]) -> StylistError:
+        if last_error:
+            log.exception("stylist.llm_error", exc=str(last_error))
+            return StylistError(str(last_error))
+        return StylistError("All providers are unavailable (circuit open)")
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.cfg.hedge_max_workers, thread_name_prefix="stylist-hedge")
+            return self._hedge_pool
+
+    def _deadline_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._deadline_pool is None:
+                self._deadline_pool = ThreadPoolExecutor(
+                    max_workers=self.cfg.deadline_max_workers, thread_name_prefix="stylist-deadline"
+                )
+            return self._deadline_pool
+
+    def _run_chain(self, spec: "_CallSpec") -> str:
+        spec.trace.round += 1
+        chain = self._provider_chain(self._primary(spec.trace))
+        if self.cfg.hedge_enabled and len(chain) > 1:
+            return self._run_hedged(chain, spec)
+        last_error: Optional[Exception] = None
+        for provider_choice in chain:
+            spec.trace.check()
+            if not self._admit(provider_choice):
+                continue
+            try:
+                return self._tracked_call(provider_choice, spec)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                last_error = e
+                self._attempt_failed(provider_choice, e)
+        raise self._chain_failed(last_error) from last_error
+
+    def _run_hedged(self, chain: List[str], spec: "_CallSpec") -> str:
+        # The primary gets until its p95 latency; then the next provider races it and the
+        # first good answer wins. Sync losers cannot be interrupted, so they finish in the
+        # background and only feed the health stats.
+        pool = self._hedge_executor()
+        backups = list(chain[1:])
+        in_flight: Dict[Future, str] = {}
+        last_error: Optional[Exception] = None
+        delay = self._health.get(chain[0], self.cfg).hedge_delay_s(self.cfg.hedge_default_delay_s)
+        # Attempts already run on the pool, so the deadline bounds the waits below instead.
+        if self._admit(chain[0]):
+            in_flight[pool.submit(self._tracked_call, chain[0], spec, False)] = chain[0]
+        while in_flight or backups:
+            spec.trace.check()
+            if not in_flight:
+                provider_choice = backups.pop(0)
+                if self._admit(provider_choice):
+                    in_flight[pool.submit(self._tracked_call, provider_choice, spec, False)] = provider_choice
+                continue
+            remaining = spec.trace.remaining()
+            timeout = delay if backups else None
+            if remaining is not None:
+                timeout = max(0.0, remaining) if timeout is None else min(timeout, max(0.0, remaining))
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                spec.trace.check()
+                provider_choice = backups.pop(0)
+                if self._admit(provider_choice):
+                    log.info("stylist.hedge", primary=chain[0], backup=provider_choice, after_ms=int(delay * 1000))
+                    in_flight[pool.submit(self._tracked_call, provider_choice, spec, False)] = provider_choice
+                continue
+            for fut in done:
+                provider_choice = in_flight.pop(fut)
                 try:
-                    return _call_with_provider(provider_choice)
+                    return fut.result()
                 except Exception as e:
                     last_error = e
-                    log.warning(
-                        "stylist.provider_attempt_failed",
-                        provider=provider_choice,
-                        err=str(e),
-                    )
-            if last_error:
-                log.exception("stylist.llm_error", exc=str(last_error))
-                raise StylistError(str(last_error)) from last_error
-            raise StylistError("Unknown LLM failure")
-
-        return retryer(execute_call)
-
-    def enhance(self, *, question: str, plain_answer: str, tone: StylistTone = StylistTone.WITTY) -> StylistResult:
+                    self._attempt_failed(provider_choice, e)
+        raise self._chain_failed(last_error) from last_error
+
+    async def _arun_chain(self, spec: "_CallSpec") -> str:
+        spec.trace.round += 1
+        chain = self._provider_chain(self._primary(spec.trace))
+        if self.cfg.hedge_enabled and len(chain) > 1:
+            return await self._arun_hedged(chain, spec)
+        last_error: Optional[Exception] = None
+        for provider_choice in chain:
+            spec.trace.check()
+            if not self._admit(provider_choice):
+                continue
+            try:
+                return await self._atracked_call(provider_choice, spec)
+            except (asyncio.CancelledError, DeadlineExceeded):
+                raise
+            except Exception as e:
+                last_error = e
+                self._attempt_failed(provider_choice, e)
+        raise self._chain_failed(last_error) from last_error
+
+    async def _arun_hedged(self, chain: List[str], spec: "_CallSpec") -> str:
+        backups = list(chain[1:])
+        in_flight: Dict[asyncio.Task, str] = {}
+        last_error: Optional[Exception] = None
+        delay = self._health.get(chain[0], self.cfg).hedge_delay_s(self.cfg.hedge_default_delay_s)
+        if self._admit(chain[0]):
+            in_flight[asyncio.ensure_future(self._atracked_call(chain[0], spec))] = chain[0]
+        try:
+            while in_flight or backups:
+                spec.trace.check()
+                if not in_flight:
+                    provider_choice = backups.pop(0)
+                    if self._admit(provider_choice):
+                        in_flight[asyncio.ensure_future(self._atracked_call(provider_choice, spec))] = provider_choice
+                    continue
+                done, _ = await asyncio.wait(in_flight, timeout=delay if backups else None, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    provider_choice = backups.pop(0)
+                    if self._admit(provider_choice):
+                        log.info("stylist.hedge", primary=chain[0], backup=provider_choice, after_ms=int(delay * 1000))
+                        in_flight[asyncio.ensure_future(self._atracked_call(provider_choice, spec))] = provider_choice
+                    continue
+                for task in done:
+                    provider_choice = in_flight.pop(task)
+                    try:
+                        return task.result()
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        self._attempt_failed(provider_choice, e)
+        finally:
+            # Async losers are cancelled outright so they stop consuming the provider.
+            for task in in_flight:
+                task.cancel()
+        raise self._chain_failed(last_error) from last_error
+
+    def _spec(self, question: str, answer: str, tone: StylistTone, serious: bool) -> "_CallSpec":
+        trace = _TRACE.get() or _Trace()
+        t = time.perf_counter()
+        system_prompt, user_prompt = self._prompts(question, answer, tone, serious)
+        trace.add("prompt", t)
+        self._log_call(system_prompt, user_prompt)
+        return _CallSpec(system_prompt, user_prompt, tone, serious, trace)
+
+    def _invoke(self, question: str, answer: str, tone: StylistTone, serious: bool) -> str:
+        spec = self._spec(question, answer, tone, serious)
+        retryer = Retrying(sleep=spec.trace.sleep, **self._retry_kwargs())
+        return retryer(self._run_chain, spec)
+
+    async def _ainvoke(self, question: str, answer: str, tone: StylistTone, serious: bool) -> str:
+        spec = self._spec(question, answer, tone, serious)
+        retryer = AsyncRetrying(sleep=spec.trace.asleep, **self._retry_kwargs())
+        return await retryer(self._arun_chain, spec)
+
+    def _tones_spec(self, question: str, answer: str, tones: Sequence[StylistTone], serious: bool) -> "_CallSpec":
+        trace = _TRACE.get() or _Trace()
+        t = time.perf_counter()
+        system_prompt = build_system_prompt(tones, self.cfg.max_emojis, self.cfg.max_length_chars, serious)
+        user_prompt = build_user_prompt(question, answer)
+        trace.add("prompt", t)
+        self._log_call(system_prompt, user_prompt)
+        return _CallSpec(system_prompt, user_prompt, tones[0], serious, trace, tuple(tones))
+
+    @staticmethod
+    def _variants(raw: str, tones: Sequence[StylistTone]) -> Dict[StylistTone, str]:
+        variants = parse_tone_variants(raw, tones)
+        if not variants:
+            raise _MalformedOutput("No valid tone variants in LLM output")
+        return variants
+
+    def _invoke_tones(self, question: str, answer: str, tones: Sequence[StylistTone], serious: bool) -> Dict[StylistTone, str]:
+        spec = self._tones_spec(question, answer, tones, serious)
+        retryer = Retrying(sleep=spec.trace.sleep, **self._retry_kwargs())
+        return retryer(lambda: self._variants(self._run_chain(spec), tones))
+
+    async def _ainvoke_tones(
+        self, question: str, answer: str, tones: Sequence[StylistTone], serious: bool
+    ) -> Dict[StylistTone, str]:
+        spec = self._tones_spec(question, answer, tones, serious)
+
+        async def attempt() -> Dict[StylistTone, str]:
+            return self._variants(await self._arun_chain(spec), tones)
+
+        retryer = AsyncRetrying(sleep=spec.trace.asleep, **self._retry_kwargs())
+        return await retryer(attempt)
+
+    def _packed_spec(self, items: Sequence[_PackItem]) -> Tuple["_CallSpec", int]:
+        """The packed call for ``items`` and its estimated prompt-token saving over one call per item."""
+        trace = _TRACE.get() or _Trace()
+        t = time.perf_counter()
+        tone, serious = items[0].tone, items[0].serious
+        single_system = build_system_prompt(tone, self.cfg.max_emojis, self.cfg.max_length_chars, serious)
+        system_prompt = build_system_prompt(tone, self.cfg.max_emojis, self.cfg.max_length_chars, serious, packed=True)
+        user_prompt = build_packed_user_prompt([(item.question, item.answer) for item in items])
+        unpacked = sum(estimate_tokens(single_system, build_user_prompt(item.question, item.answer)) for item in items)
+        trace.add("prompt", t)
+        self._log_call(system_prompt, user_prompt)
+        spec = _CallSpec(system_prompt, user_prompt, tone, serious, trace, packed=len(items))
+        return spec, unpacked - estimate_tokens(system_prompt, user_prompt)
+
+    @staticmethod
+    def _packed_outputs(raw: str, count: int) -> Dict[int, str]:
+        outputs = parse_packed(raw, count)
+        if not outputs:
+            raise _MalformedOutput("No valid packed items in LLM output")
+        return outputs
+
+    def _pack_done(self, items: Sequence[_PackItem], received: int, tokens_saved: int, elapsed_s: float) -> None:
+        retried = len(items) - received
+        with self._pack_lock:
+            self._pack_stats["packs"] += 1
+            self._pack_stats["items"] += len(items)
+            self._pack_stats["retried"] += retried
+            self._pack_stats["tokens_saved"] += tokens_saved
+        log.info("stylist.pack", items=len(items), retried=retried, tokens_saved=tokens_saved, elapsed_ms=int(elapsed_s * 1000))
+        if self.metrics.enabled:
+            self.metrics.increment("packed_calls_total")
+            self.metrics.increment("packed_items_total", received, outcome="packed")
+            self.metrics.increment("packed_items_total", retried, outcome="retried")
+            self.metrics.increment("packed_tokens_saved_total", tokens_saved)
+            # Compare with provider_seconds, the cost of one unpacked call.
+            self.metrics.observe("packed_seconds_per_item", elapsed_s / len(items))
+
+    def packing_stats(self) -> Dict[str, int]:
+        with self._pack_lock:
+            return dict(self._pack_stats)
+
+    @staticmethod
+    @contextmanager
+    def _multi_call(trace: _Trace, malformed_event: str) -> Iterator[_MultiCall]:
+        """Run one packed or multi-tone call with ``trace`` current and record how it ended.
+
+        The body sets ``parts``; a malformed reply leaves them empty so every part is
+        styled alone, and any other error is kept in ``error`` for the caller to hand out.
+        """
+        call = _MultiCall()
+        token = _TRACE.set(trace)
+        try:
+            yield call
+        except _MalformedOutput as e:
+            log.warning(malformed_event, err=str(e))
+            call.parts, call.tokens_saved = {}, 0
+        except Exception as e:
+            call.error = e
+        finally:
+            _TRACE.reset(token)
+
+    def _packed_results(
+        self, items: Sequence[_PackItem], call: _MultiCall, trace: _Trace, store: bool, started: float
+    ) -> Dict[str, Union[str, Exception]]:
+        """Post-process (and store) the items the packed reply held; ``call.error`` fails every item."""
+        if call.error is not None:
+            return {item.key: call.error for item in items}
+        out: Dict[str, Union[str, Exception]] = {}
+        for idx, text in call.parts.items():
+            out[items[idx].key] = self._postprocess(text, trace)
+        if store:
+            stored = [(items[i].question, items[i].answer, items[i].tone, items[i].key, out[items[i].key]) for i in call.parts]
+            self._store(stored, self._trace_model_key(trace))
+        self._pack_done(items, len(call.parts), call.tokens_saved, time.perf_counter() - started)
+        return out
+
+    def _style_packed(self, items: Sequence[_PackItem], trace: _Trace, store: bool = True) -> Dict[str, Union[str, Exception]]:
+        """Style items sharing tone and serious flag in one call; items missing from the reply are styled alone."""
+        out: Dict[str, Union[str, Exception]] = {}
+        if len(items) > 1:
+            t = time.perf_counter()
+            with self._multi_call(trace, "stylist.pack_malformed") as call:
+                spec, call.tokens_saved = self._packed_spec(items)
+                retryer = Retrying(sleep=trace.sleep, **self._retry_kwargs())
+                call.parts = retryer(lambda: self._packed_outputs(self._run_chain(spec), len(items)))
+            out = self._packed_results(items, call, trace, store, t)
+        for item in items:
+            if item.key not in out:
+                try:
+                    out[item.key] = self._style(item.question, item.answer, item.tone, item.serious, item.key, store, trace)
+                except Exception as e:
+                    out[item.key] = e
+        return out
+
+    async def _astyle_packed(
+        self, items: Sequence[_PackItem], trace: _Trace, store: bool = True
+    ) -> Dict[str, Union[str, Exception]]:
+        out: Dict[str, Union[str, Exception]] = {}
+        if len(items) > 1:
+            t = time.perf_counter()
+            with self._multi_call(trace, "stylist.pack_malformed") as call:
+                spec, call.tokens_saved = self._packed_spec(items)
+
+                async def attempt() -> Dict[int, str]:
+                    return self._packed_outputs(await self._arun_chain(spec), len(items))
+
+                async with self._async_semaphore():
+                    call.parts = await AsyncRetrying(sleep=trace.asleep, **self._retry_kwargs())(attempt)
+            out = await self._off_loop(self._packed_results, items, call, trace, store, t)
+        for item in items:
+            if item.key not in out:
+                try:
+                    out[item.key] = await self._astyle(item.question, item.answer, item.tone, item.serious, item.key, store, trace)
+                except Exception as e:
+                    out[item.key] = e
+        return out
+
+    def _packer(self) -> _AsyncPacker:
+        loop = asyncio.get_running_loop()
+        if self._async_packer is None or self._async_packer[0] is not loop:
+            self._async_packer = (loop, _AsyncPacker(self))
+        return self._async_packer[1]
+
+    def warmup(self) -> None:
+        """Import CrewAI/provider SDKs and build this enhancer's LLM clients now instead of on the first cache miss."""
         t0 = time.perf_counter()
-        reduce, note = analyze_topic(question, plain_answer, self.cfg)
+        providers = list(dict.fromkeys(self._provider_chain() + [
+            rule.provider for rule in self.cfg.routing_rules if rule.provider != "openai" or self.cfg.get_openai_api_key()
+        ]))
+        warmup(self.cfg, providers)
+        log.info("stylist.warmup", providers=providers, elapsed_ms=int((time.perf_counter() - t0) * 1000))
+
+    def provider_health(self) -> Dict[str, Dict[str, Any]]:
+        return self._health.snapshot(self.cfg)
+
+    def scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Limits, in-flight and queued calls, and queue waits per priority for each rate-limited provider."""
+        return self._scheduler.snapshot(self.cfg)
+
+    def cache_key(self, question: str, plain_answer: str, tone: StylistTone) -> str:
+        """Key the styled text for this request is cached under (after safety downgrades and routing)."""
+        return self._prepare(question, plain_answer, tone).cache_key
+
+    def style_uncached(
+        self, question: str, plain_answer: str, tone: StylistTone, priority: str = BULK
+    ) -> str:
+        """Styled text for one answer, without writing it to the cache; raises when every provider fails.
+
+        For offline jobs such as ``prestyle`` that collect results themselves. Calls
+        queue at ``priority`` (bulk by default) at rate-limited providers.
+        """
+        p = self._prepare(question, plain_answer, tone)
+        trace = _Trace(priority=priority, route=p.route)
+        return self._style(question, plain_answer, p.used_tone, p.reduce, p.cache_key, store=False, trace=trace)
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to the running loop, so keep one per loop rather than per enhancer.
+        loop = asyncio.get_running_loop()
+        if self._async_limit is None or self._async_limit[0] is not loop:
+            self._async_limit = (loop, asyncio.Semaphore(max(1, self.cfg.async_max_concurrency)))
+        return self._async_limit[1]
+
+    def _prepare(
+        self,
+        question: str,
+        plain_answer: str,
+        tone: StylistTone,
+        analysis: Optional[Tuple[bool, Optional[str]]] = None,
+    ) -> _Prepared:
+        reduce, note = analysis or analyze_topic(question, plain_answer, self.cfg, self.topics)
         used_tone = StylistTone.PROFESSIONAL if reduce else tone
-        cache_key = make_cache_key(
-            question.strip(),
-            plain_answer.strip(),
-            used_tone.value,
-            f"{self.cfg.provider}:{self.cfg.active_model()}",
-        )
-        cached = cache_get(cache_key)
-        if cached:
-            log.info("stylist.cache_hit", key=cache_key)
-            elapsed = int((time.perf_counter() - t0) * 1000)
-            return {
-                "styled_text": cached,
-                "used_tone": used_tone,
-                "safety_notes": note,
-                "elapsed_ms": elapsed,
-                "cache_hit": True,
-            }
+        route = self._route(question, plain_answer, used_tone, reduce)
+        cache_key = make_cache_key(question.strip(), plain_answer.strip(), used_tone.value, route.model_key)
+        return _Prepared(reduce, note, used_tone, cache_key, route)
 
+    def _route(self, question: str, answer: str, used_tone: StylistTone, reduce: bool) -> RouteDecision:
+        if not self.cfg.routing_rules:
+            return self._default_route
+        route = choose_route(self.cfg, self._health, question, answer, used_tone, reduce)
+        log.debug("stylist.route", provider=route.provider, model=route.model, rule=route.rule, input_tokens=route.input_tokens)
+        self.metrics.increment("routes_total", provider=route.provider, rule=route.rule)
+        return route
+
+    def _model_key(self, provider: Optional[str] = None) -> str:
+        # Part of every cache key, so text styled by one model is never served as another's.
+        provider = provider or self.cfg.provider
+        return f"{provider}:{self.cfg.active_model(provider)}"
+
+    @staticmethod
+    def _trace_model_key(trace: _Trace) -> Optional[str]:
+        return trace.route.model_key if trace.route else None
+
+    def _normalized_key(
+        self, question: str, answer: str, used_tone: StylistTone, cache_key: str, model_key: Optional[str] = None
+    ) -> Optional[str]:
+        if not self.cfg.cache_normalized_lookup:
+            return None
+        key = make_cache_key(canonical_text(question), canonical_text(answer), used_tone.value, model_key or self._model_key())
+        # Already-canonical text (the common case) hashes to the exact key; no second lookup or write.
+        return None if key == cache_key else key
+
+    def _lookup_keys(
+        self, question: str, answer: str, used_tone: StylistTone, cache_key: str, model_key: Optional[str] = None
+    ) -> List[str]:
+        normalized = self._normalized_key(question, answer, used_tone, cache_key, model_key)
+        return [cache_key] if normalized is None else [cache_key, normalized]
+
+    def _lookup(
+        self,
+        question: str,
+        answer: str,
+        used_tone: StylistTone,
+        cache_key: str,
+        found: Optional[Dict[str, str]] = None,
+        model_key: Optional[str] = None,
+    ) -> Optional[_CacheMatch]:
+        """Exact key, then normalized key, then a near-duplicate answer; ``found`` holds prefetched entries.
+
+        ``model_key`` is the routed model's (default: Settings.provider's), as in ``cache_key``.
+        """
+        model_key = model_key or self._model_key()
+        keys = self._lookup_keys(question, answer, used_tone, cache_key, model_key)
+        if found is None:
+            found = self._cache_get_many(keys) if len(keys) > 1 else {cache_key: self._cache_get(cache_key)}
+        hit: Optional[_CacheMatch] = None
+        if found.get(cache_key):
+            hit = _CacheMatch(found[cache_key], "exact")
+        elif len(keys) > 1 and found.get(keys[1]):
+            hit = _CacheMatch(found[keys[1]], "normalized")
+        elif self._similar is not None:
+            similar = self._similar.lookup((used_tone.value, model_key), answer, self.cfg.cache_similarity_threshold)
+            if similar is not None:
+                text = self._cache_get(similar.key)
+                if text:
+                    hit = _CacheMatch(text, "similar", similar.similarity)
+                else:
+                    self._similar.discard(similar.key)
+        if hit is not None and self.metrics.enabled:
+            self.metrics.increment("cache_matches_total", match=hit.match)
+        return hit
+
+    def _store(self, items: Sequence[Tuple[str, str, StylistTone, str, str]], model_key: Optional[str] = None) -> None:
+        """Write (question, answer, used_tone, cache_key, text) under the exact and normalized keys and index the answers."""
+        model_key = model_key or self._model_key()
+        entries: Dict[str, str] = {}
+        for question, answer, used_tone, cache_key, text in items:
+            for key in self._lookup_keys(question, answer, used_tone, cache_key, model_key):
+                entries[key] = text
+            if self._similar is not None:
+                self._similar.add((used_tone.value, model_key), answer, cache_key)
+        if not entries:
+            return
+        try:
+            if len(entries) == 1:
+                (key, text), = entries.items()
+                self.cache.set(key, text, self.cfg.cache_ttl_s)
+            else:
+                self.cache.set_many(entries, self.cfg.cache_ttl_s)
+        except Exception as e:
+            # The styled text is still good; it just won't be reused.
+            self._cache_failed("set", e)
+
+    # Cache backends may be remote; an unreachable or misbehaving one degrades to misses, never to errors.
+    def _cache_get(self, key: str) -> Optional[str]:
         try:
-            rewritten = self._invoke(question, plain_answer, used_tone, serious=reduce)
+            return self.cache.get(key)
         except Exception as e:
-            # Fail-safe: return original text with a gentle fallback
-            log.error("stylist.fallback", reason=str(e))
-            elapsed = int((time.perf_counter() - t0)*1000)
-            return {
-                "styled_text": plain_answer,
-                "used_tone": StylistTone.PROFESSIONAL if reduce else tone,
-                "safety_notes": (note or "") + (" | Fallback to original due to error." if note else "Fallback to original due to error."),
-                "elapsed_ms": elapsed,
-                "cache_hit": False,
-            }
+            self._cache_failed("get", e)
+            return None
 
+    def _cache_get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        try:
+            return self.cache.get_many(keys)
+        except Exception as e:
+            self._cache_failed("get", e)
+            return {}
+
+    async def _off_loop(self, fn: Callable[..., _T], *args: Any) -> _T:
+        """Run a step that touches the cache inline for in-process backends, on a worker thread for ones doing I/O."""
+        if not self.cache.blocking:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    def _cache_failed(self, op: str, error: Exception) -> None:
+        log.warning("stylist.cache_error", op=op, backend=type(self.cache).__name__, error=str(error))
+        self.metrics.increment("cache_errors_total", op=op)
+
+    def _cached_result(self, question: str, answer: str, prepared: _Prepared, t0: float) -> Optional[StylistResult]:
+        hit = self._lookup(question, answer, prepared.used_tone, prepared.cache_key, model_key=prepared.route.model_key)
+        return self._hit_result(hit, prepared.cache_key, prepared.used_tone, prepared.note, t0)
+
+    @staticmethod
+    def _hit_result(
+        hit: Optional[_CacheMatch], cache_key: str, used_tone: StylistTone, note: Optional[str], t0: float
+    ) -> Optional[StylistResult]:
+        if hit is None:
+            return None
+        log.info("stylist.cache_hit", key=cache_key, match=hit.match, similarity=hit.similarity)
+        elapsed = int((time.perf_counter() - t0) * 1000)
+        result: StylistResult = {
+            "styled_text": hit.text,
+            "used_tone": used_tone,
+            "safety_notes": note,
+            "elapsed_ms": elapsed,
+            "cache_hit": True,
+            "cache_match": hit.match,
+        }
+        if hit.similarity is not None:
+            result["similarity"] = round(hit.similarity, 3)
+        return result
+
+    def _postprocess(self, rewritten: str, trace: _Trace) -> str:
         # Post-process: clamp and emoji-limit
+        t = time.perf_counter()
         rewritten = clamp_length(rewritten, self.cfg.max_length_chars)
         rewritten = strip_excess_emojis(rewritten, self.cfg.max_emojis)
-        cache_set(cache_key, rewritten, self.cfg.cache_ttl_s, self.cfg.cache_max_items)
+        trace.add("postprocess", t)
+        return rewritten
+
+    def _postprocess_and_store(
+        self, rewritten: str, question: str, answer: str, used_tone: StylistTone, cache_key: str, trace: _Trace
+    ) -> str:
+        rewritten = self._postprocess(rewritten, trace)
+        t = time.perf_counter()
+        self._store([(question, answer, used_tone, cache_key, rewritten)], self._trace_model_key(trace))
+        trace.add("cache", t)
+        return rewritten
+
+    def _style(
+        self,
+        question: str,
+        answer: str,
+        used_tone: StylistTone,
+        serious: bool,
+        cache_key: str,
+        store: bool = True,
+        trace: Optional[_Trace] = None,
+    ) -> str:
+        trace = trace or _Trace()
 
+        def run() -> str:
+            trace.led = True
+            # A leader that registers just after a previous flight landed finds its cache entry.
+            t = time.perf_counter()
+            cached = self._cache_get(cache_key)
+            trace.add("cache", t)
+            if cached:
+                return cached
+            token = _TRACE.set(trace)
+            try:
+                rewritten = self._invoke(question, answer, used_tone, serious)
+            finally:
+                _TRACE.reset(token)
+            if not store:
+                return self._postprocess(rewritten, trace)
+            return self._postprocess_and_store(rewritten, question, answer, used_tone, cache_key, trace)
+
+        t = time.perf_counter()
+        while True:
+            remaining = trace.remaining()
+            try:
+                out = self._flights.do(cache_key, run, None if remaining is None else max(0.0, remaining))
+            except FutureTimeout:
+                raise DeadlineExceeded("deadline exceeded waiting for an identical request") from None
+            except (DeadlineExceeded, LeaderCancelled):
+                if not self._take_over(trace):
+                    raise
+                continue
+            break
+        if not trace.led:
+            trace.coalesced = True
+            trace.add("coalesced_wait", t)
+        return out
+
+    async def _astyle(
+        self,
+        question: str,
+        answer: str,
+        used_tone: StylistTone,
+        serious: bool,
+        cache_key: str,
+        store: bool = True,
+        trace: Optional[_Trace] = None,
+    ) -> str:
+        trace = trace or _Trace()
+
+        async def run() -> str:
+            trace.led = True
+            t = time.perf_counter()
+            cached = await self._off_loop(self._cache_get, cache_key)
+            t = trace.add("cache", t)
+            if cached:
+                return cached
+            token = _TRACE.set(trace)
+            try:
+                async with self._async_semaphore():
+                    t = trace.add("queue", t)
+                    rewritten = await self._ainvoke(question, answer, used_tone, serious)
+            finally:
+                _TRACE.reset(token)
+            if not store:
+                return self._postprocess(rewritten, trace)
+            return await self._off_loop(self._postprocess_and_store, rewritten, question, answer, used_tone, cache_key, trace)
+
+        t = time.perf_counter()
+        while True:
+            try:
+                out = await self._flights.ado(cache_key, run)
+            except (DeadlineExceeded, LeaderCancelled):
+                if not self._take_over(trace):
+                    raise
+                continue
+            break
+        if not trace.led:
+            trace.coalesced = True
+            trace.add("coalesced_wait", t)
+        return out
+
+    @staticmethod
+    def _take_over(trace: _Trace) -> bool:
+        """Whether a waiter whose leader ran out of its own deadline, or was cancelled, should lead a new flight.
+
+        The leader's budget is not the waiter's: a waiter with time left retries instead of sharing that failure.
+        """
+        if trace.led:
+            return False
+        remaining = trace.remaining()
+        if remaining is not None and remaining <= 0:
+            return False
+        log.info("stylist.coalesced_takeover")
+        return True
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        return self._flights.stats()
+
+    def _fallback_result(self, plain_answer: str, used_tone: StylistTone, note: Optional[str], err: Exception, t0: float) -> StylistResult:
+        # Fail-safe: return original text with a gentle fallback
+        log.error("stylist.fallback", reason=str(err))
+        elapsed = int((time.perf_counter() - t0)*1000)
+        reason = "Fallback to original: deadline exceeded." if isinstance(err, DeadlineExceeded) else "Fallback to original due to error."
+        return {
+            "styled_text": plain_answer,
+            "used_tone": used_tone,
+            "safety_notes": f"{note} | {reason}" if note else reason,
+            "elapsed_ms": elapsed,
+            "cache_hit": False,
+        }
+
+    @staticmethod
+    def _styled_result(rewritten: str, used_tone: StylistTone, note: Optional[str], t0: float) -> StylistResult:
         elapsed = int((time.perf_counter() - t0)*1000)
         return {
             "styled_text": rewritten,
@@ -148,3 +1251,422 @@ class ResponseStyleEnhancer:
             "elapsed_ms": elapsed,
             "cache_hit": False,
         }
+
+    def _emit(self, trace: _Trace, outcome: str, total_s: float) -> None:
+        self.metrics.increment("requests_total", outcome=outcome)
+        self.metrics.observe("request_seconds", total_s, outcome=outcome)
+        for stage, seconds in trace.stages.items():
+            self.metrics.observe("stage_seconds", seconds, stage=stage)
+        if trace.round > 1:
+            self.metrics.increment("retries_total", trace.round - 1)
+
+    def _finish(self, result: StylistResult, trace: _Trace, outcome: str, route: Optional[RouteDecision] = None) -> StylistResult:
+        """``route`` is the item's own decision when ``trace`` is shared by several items."""
+        total_s = time.perf_counter() - trace.started
+        route = route or trace.route
+        if self.metrics.enabled:
+            self._emit(trace, outcome, total_s)
+        if self.cfg.routing_rules and route is not None:
+            result["route"] = route.info()
+        if self.cfg.result_timings:
+            primary = route.provider if route else self.cfg.provider
+            result.update(trace.summary(total_s, primary))  # type: ignore[typeddict-item]
+        return result
+
+    def _deadline_s(self, deadline_ms: Optional[float]) -> Optional[float]:
+        ms = self.cfg.deadline_ms if deadline_ms is None else deadline_ms
+        return ms / 1000 if ms and ms > 0 else None
+
+    def _failed(
+        self,
+        plain_answer: str,
+        used_tone: StylistTone,
+        note: Optional[str],
+        err: Exception,
+        trace: _Trace,
+        route: Optional[RouteDecision] = None,
+    ) -> StylistResult:
+        outcome = "deadline" if isinstance(err, DeadlineExceeded) else "fallback"
+        return self._finish(self._fallback_result(plain_answer, used_tone, note, err, trace.started), trace, outcome, route)
+
+    def enhance(
+        self,
+        *,
+        question: str,
+        plain_answer: str,
+        tone: StylistTone = StylistTone.WITTY,
+        deadline_ms: Optional[float] = None,
+        priority: str = INTERACTIVE,
+    ) -> StylistResult:
+        """Style one answer; ``deadline_ms`` (default ``Settings.deadline_ms``) bounds the whole call.
+
+        Retries, backoff and provider fallback all spend the same budget. Once it
+        runs out the original answer is returned with a "deadline exceeded" note.
+        ``priority`` (INTERACTIVE or BULK) orders the call in rate-limited provider queues.
+        """
+        trace = _Trace(deadline_s=self._deadline_s(deadline_ms), priority=priority)
+        t0 = trace.started
+        with self.metrics.span("stylist.enhance", tone=tone.value):
+            prepared = self._prepare(question, plain_answer, tone)
+            reduce, note, used_tone, cache_key, trace.route = prepared
+            t = trace.add("analyze", t0)
+            cached = self._cached_result(question, plain_answer, prepared, t0)
+            trace.add("cache", t)
+            if cached:
+                return self._finish(cached, trace, "hit")
+
+            try:
+                trace.check()
+                rewritten = self._style(question, plain_answer, used_tone, reduce, cache_key, trace=trace)
+            except Exception as e:
+                return self._failed(plain_answer, used_tone, note, e, trace)
+
+            return self._finish(self._styled_result(rewritten, used_tone, note, t0), trace, "styled")
+
+    async def aenhance(
+        self,
+        *,
+        question: str,
+        plain_answer: str,
+        tone: StylistTone = StylistTone.WITTY,
+        deadline_ms: Optional[float] = None,
+        priority: str = INTERACTIVE,
+    ) -> StylistResult:
+        trace = _Trace(deadline_s=self._deadline_s(deadline_ms), priority=priority)
+        t0 = trace.started
+        with self.metrics.span("stylist.enhance", tone=tone.value):
+            prepared = self._prepare(question, plain_answer, tone)
+            reduce, note, used_tone, cache_key, trace.route = prepared
+            t = trace.add("analyze", t0)
+            cached = await self._off_loop(self._cached_result, question, plain_answer, prepared, t0)
+            trace.add("cache", t)
+            if cached:
+                return self._finish(cached, trace, "hit")
+
+            try:
+                trace.check()
+                if self.cfg.pack_max_items > 1:
+                    item = _PackItem(question, plain_answer, used_tone, reduce, cache_key, trace.route)
+                    styling: Any = self._packer().submit(item, trace)
+                else:
+                    styling = self._astyle(question, plain_answer, used_tone, reduce, cache_key, trace=trace)
+                remaining = trace.remaining()
+                if remaining is None:
+                    rewritten = await styling
+                else:
+                    # Covers queueing for a slot or a pack too; in-flight calls are cancelled.
+                    try:
+                        rewritten = await asyncio.wait_for(styling, max(0.0, remaining))
+                    except asyncio.TimeoutError:
+                        raise DeadlineExceeded("deadline exceeded") from None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return self._failed(plain_answer, used_tone, note, e, trace)
+
+            return self._finish(self._styled_result(rewritten, used_tone, note, t0), trace, "styled")
+
+    def _fanout_prepare(
+        self, question: str, plain_answer: str, tones: Sequence[StylistTone], trace: _Trace
+    ) -> Tuple[Dict[StylistTone, _Prepared], Dict[StylistTone, StylistResult], Dict[StylistTone, _Prepared]]:
+        analysis = analyze_topic(question, plain_answer, self.cfg, self.topics)
+        prepared = {tone: self._prepare(question, plain_answer, tone, analysis) for tone in dict.fromkeys(tones)}
+        t = trace.add("analyze", trace.started)
+        hits: Dict[StylistTone, StylistResult] = {}
+        missing: Dict[StylistTone, _Prepared] = {}  # keyed by used tone; sensitive topics fold every tone into one
+        for tone, p in prepared.items():
+            cached = self._cached_result(question, plain_answer, p, trace.started)
+            if cached:
+                hits[tone] = cached
+            else:
+                missing.setdefault(p.used_tone, p)
+        trace.add("cache", t)
+        return prepared, hits, missing
+
+    @staticmethod
+    def _fanout_group(missing: Dict[StylistTone, _Prepared], trace: _Trace) -> Dict[StylistTone, _Prepared]:
+        """Missing tones routed to the same model as the first; only those can share one call, made on that route."""
+        if not missing:
+            return {}
+        trace.route = next(iter(missing.values())).route
+        model_key = trace.route.model_key
+        return {tone: p for tone, p in missing.items() if p.route.model_key == model_key}
+
+    def _fanout_store(
+        self, question: str, answer: str, group: Dict[StylistTone, _Prepared], call: _MultiCall, trace: _Trace
+    ) -> Dict[StylistTone, Union[str, Exception]]:
+        """Post-process and cache the variants the multi-tone reply held; ``call.error`` fails the whole group."""
+        if call.error is not None:
+            return dict.fromkeys(group, call.error)
+        styled: Dict[StylistTone, Union[str, Exception]] = {
+            tone: self._postprocess(text, trace) for tone, text in call.parts.items() if tone in group
+        }
+        t = time.perf_counter()
+        self._store([(question, answer, tone, group[tone].cache_key, text) for tone, text in styled.items()], self._trace_model_key(trace))
+        trace.add("cache", t)
+        log.info("stylist.fanout", requested=len(group), received=len(styled))
+        if self.metrics.enabled:
+            self.metrics.increment("fanout_variants_total", len(styled), outcome="received")
+            self.metrics.increment("fanout_variants_total", len(group) - len(styled), outcome="missing")
+        return styled
+
+    def _fanout_results(
+        self,
+        plain_answer: str,
+        prepared: Dict[StylistTone, _Prepared],
+        hits: Dict[StylistTone, StylistResult],
+        styled: Dict[StylistTone, Union[str, Exception]],
+        trace: _Trace,
+    ) -> Dict[StylistTone, StylistResult]:
+        results: Dict[StylistTone, StylistResult] = {}
+        for tone, p in prepared.items():
+            if tone in hits:
+                results[tone] = self._finish(hits[tone], trace, "hit", p.route)
+                continue
+            out = styled[p.used_tone]
+            if isinstance(out, Exception):
+                results[tone] = self._failed(plain_answer, p.used_tone, p.note, out, trace, p.route)
+            else:
+                results[tone] = self._finish(self._styled_result(out, p.used_tone, p.note, trace.started), trace, "styled", p.route)
+        return results
+
+    def enhance_tones(
+        self, *, question: str, plain_answer: str, tones: Sequence[StylistTone]
+    ) -> Dict[StylistTone, StylistResult]:
+        """Style one answer in several tones with a single LLM call that returns a JSON object keyed by tone.
+
+        Each variant is post-processed and cached under its own tone, so a later
+        enhance() in any of these tones is a cache hit. Tones the reply leaves out
+        (or a reply that is not valid JSON) are styled one by one, as are tones
+        that routing sends to a different model than the first missing tone.
+        """
+        trace = _Trace()
+        with self.metrics.span("stylist.enhance_tones", tones=len(tones)):
+            prepared, hits, missing = self._fanout_prepare(question, plain_answer, tones, trace)
+            if not prepared:
+                return {}
+            serious = next(iter(prepared.values())).reduce
+            styled: Dict[StylistTone, Union[str, Exception]] = {}
+            group = self._fanout_group(missing, trace)
+            if len(group) > 1:
+                with self._multi_call(trace, "stylist.fanout_malformed") as call:
+                    call.parts = self._invoke_tones(question, plain_answer, list(group), serious)
+                styled.update(self._fanout_store(question, plain_answer, group, call, trace))
+            for used_tone, p in missing.items():
+                if used_tone not in styled:
+                    trace.route = p.route
+                    try:
+                        styled[used_tone] = self._style(question, plain_answer, used_tone, serious, p.cache_key, trace=trace)
+                    except Exception as e:
+                        styled[used_tone] = e
+            return self._fanout_results(plain_answer, prepared, hits, styled, trace)
+
+    async def aenhance_tones(
+        self, *, question: str, plain_answer: str, tones: Sequence[StylistTone]
+    ) -> Dict[StylistTone, StylistResult]:
+        trace = _Trace()
+        with self.metrics.span("stylist.enhance_tones", tones=len(tones)):
+            prepared, hits, missing = await self._off_loop(self._fanout_prepare, question, plain_answer, tones, trace)
+            if not prepared:
+                return {}
+            serious = next(iter(prepared.values())).reduce
+            styled: Dict[StylistTone, Union[str, Exception]] = {}
+            group = self._fanout_group(missing, trace)
+            if len(group) > 1:
+                with self._multi_call(trace, "stylist.fanout_malformed") as call:
+                    t = time.perf_counter()
+                    async with self._async_semaphore():
+                        trace.add("queue", t)
+                        call.parts = await self._ainvoke_tones(question, plain_answer, list(group), serious)
+                styled.update(await self._off_loop(self._fanout_store, question, plain_answer, group, call, trace))
+            for used_tone, p in missing.items():
+                if used_tone not in styled:
+                    trace.route = p.route
+                    try:
+                        styled[used_tone] = await self._astyle(question, plain_answer, used_tone, serious, p.cache_key, trace=trace)
+                    except Exception as e:
+                        styled[used_tone] = e
+            return self._fanout_results(plain_answer, prepared, hits, styled, trace)
+
+    def enhance_many(
+        self,
+        items: Sequence[Tuple[str, str]],
+        *,
+        tone: StylistTone = StylistTone.WITTY,
+        max_workers: Optional[int] = None,
+        deadline_ms: Optional[float] = None,
+        priority: str = BULK,
+    ) -> List[StylistResult]:
+        """Style (question, plain_answer) pairs concurrently; results keep input order.
+
+        ``deadline_ms`` bounds the whole batch; items not styled in time keep their original text.
+        Batches queue behind interactive calls at rate-limited providers unless ``priority`` says otherwise.
+        """
+        t0 = time.perf_counter()
+        deadline_s = self._deadline_s(deadline_ms)
+        results: List[Optional[StylistResult]] = [None] * len(items)
+        pending: Dict[str, List[int]] = {}
+        analyses = analyze_topics(items, self.cfg, self.topics)
+        prepared = [
+            self._prepare(question, plain_answer, tone, analysis)
+            for (question, plain_answer), analysis in zip(items, analyses)
+        ]
+        analyzed = time.perf_counter()
+        hits = self._cache_get_many({
+            key
+            for (question, plain_answer), p in zip(items, prepared)
+            for key in self._lookup_keys(question, plain_answer, p.used_tone, p.cache_key, p.route.model_key)
+        })
+        looked_up = time.perf_counter()
+        # Batch stages are shared by every item, so each trace starts with the batch-wide times.
+        def batch_trace() -> _Trace:
+            trace = _Trace(t0, deadline_s, priority)
+            trace.stages.update(analyze=analyzed - t0, cache=looked_up - analyzed)
+            return trace
+
+        for idx, (reduce, note, used_tone, cache_key, route) in enumerate(prepared):
+            question, plain_answer = items[idx]
+            match = self._lookup(question, plain_answer, used_tone, cache_key, hits, route.model_key)
+            cached = self._hit_result(match, cache_key, used_tone, note, t0)
+            if cached:
+                results[idx] = self._finish(cached, batch_trace(), "hit", route)
+            else:
+                # Identical keys inside one batch share a single LLM call.
+                pending.setdefault(cache_key, []).append(idx)
+
+        if pending:
+            work: Dict[_PackGroup, List[_PackItem]] = {}
+            for cache_key, indexes in pending.items():
+                question, plain_answer = items[indexes[0]]
+                reduce, _, used_tone, _, route = prepared[indexes[0]]
+                item = _PackItem(question, plain_answer, used_tone, reduce, cache_key, route)
+                work.setdefault((used_tone, reduce, route.model_key), []).append(item)
+            # Without packing every unique miss is its own job; with it, up to pack_max_items share one call.
+            size = max(1, self.cfg.pack_max_items)
+            jobs = [group[i:i + size] for group in work.values() for i in range(0, len(group), size)]
+            workers = max(1, min(max_workers or self.cfg.batch_max_workers, len(jobs)))
+            log.info("stylist.batch", items=len(items), unique_misses=len(pending), calls=len(jobs), workers=workers)
+            styled: Dict[str, List[Tuple[str, str, StylistTone, str, str]]] = {}  # by routed model
+            traces: Dict[str, _Trace] = {}
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stylist") as pool:
+                futures = []
+                for job in jobs:
+                    trace = batch_trace()
+                    trace.route = job[0].route
+                    traces.update((item.key, trace) for item in job)
+                    futures.append((job, pool.submit(self._style_packed, job, trace, False)))
+                for job, future in futures:
+                    try:
+                        outputs = future.result()
+                    except Exception as e:
+                        outputs = {item.key: e for item in job}
+                    for item in job:
+                        rewritten = outputs[item.key]
+                        if not isinstance(rewritten, Exception):
+                            entry = (item.question, item.answer, item.tone, item.key, rewritten)
+                            styled.setdefault(item.route.model_key, []).append(entry)
+                        for idx in pending[item.key]:
+                            _, note, used_tone, _, route = prepared[idx]
+                            if isinstance(rewritten, Exception):
+                                results[idx] = self._failed(items[idx][1], used_tone, note, rewritten, traces[item.key], route)
+                            else:
+                                result = self._styled_result(rewritten, used_tone, note, t0)
+                                results[idx] = self._finish(result, traces[item.key], "styled", route)
+            # One batched write per routed model instead of a round-trip per styled item.
+            for model_key, entries in styled.items():
+                self._store(entries, model_key)
+
+        return [r for r in results if r is not None]
+
+    def _stream_backoff_s(self, attempt: int) -> float:
+        # Same shape as the tenacity policy: random wait under an exponentially growing cap.
+        return random.uniform(0, min(self.cfg.retry_max_wait_s, self.cfg.retry_min_wait_s * 2 ** attempt))
+
+    def _stream_outcome(self, trace: _Trace, outcome: str) -> None:
+        if self.metrics.enabled:
+            self._emit(trace, outcome, time.perf_counter() - trace.started)
+
+    def enhance_stream(self, *, question: str, plain_answer: str, tone: StylistTone = StylistTone.WITTY) -> Iterator[str]:
+        """Yield the styled answer in chunks as tokens arrive; post-processing is applied on the fly.
+
+        Generation stops as soon as the length limit is reached. Provider fallback and
+        retries apply until the first chunk is yielded; if every attempt fails the
+        original answer is yielded instead.
+        """
+        run = _StreamRun(self, question, plain_answer, tone)
+        if run.hit is not None:
+            yield run.hit
+            return
+        for step in run.steps():
+            if isinstance(step, float):
+                run.trace.sleep(step)
+                continue
+            provider_choice = step
+            post = run.post()
+            scheduler = self._schedule(provider_choice, run.system_prompt, run.user_prompt, run.trace)
+            started = time.perf_counter()
+            try:
+                client = self._agents.stream_client(self.cfg, self._provider_override(provider_choice))
+                tokens = stream_completion(client, self.cfg, provider_choice, run.system_prompt, run.user_prompt)
+                try:
+                    for token in tokens:
+                        piece = post.feed(token)
+                        if piece:
+                            yield piece
+                        if post.done:
+                            break
+                    piece = post.finish()
+                    if piece:
+                        yield piece
+                finally:
+                    tokens.close()
+            except Exception as e:
+                if run.failed(provider_choice, post, started, e):
+                    return
+                continue
+            finally:
+                scheduler.release()
+            if run.ended(provider_choice, post, started):
+                return
+        yield run.fallback()
+
+    async def aenhance_stream(self, *, question: str, plain_answer: str, tone: StylistTone = StylistTone.WITTY) -> AsyncIterator[str]:
+        run = await self._off_loop(_StreamRun, self, question, plain_answer, tone)
+        if run.hit is not None:
+            yield run.hit
+            return
+        for step in run.steps():
+            if isinstance(step, float):
+                await run.trace.asleep(step)
+                continue
+            provider_choice = step
+            post = run.post()
+            scheduler = await self._aschedule(provider_choice, run.system_prompt, run.user_prompt, run.trace)
+            started = time.perf_counter()
+            try:
+                client = self._agents.stream_client(self.cfg, self._provider_override(provider_choice), asynchronous=True)
+                async with self._async_semaphore():
+                    tokens = astream_completion(client, self.cfg, provider_choice, run.system_prompt, run.user_prompt)
+                    try:
+                        async for token in tokens:
+                            piece = post.feed(token)
+                            if piece:
+                                yield piece
+                            if post.done:
+                                break
+                        piece = post.finish()
+                        if piece:
+                            yield piece
+                    finally:
+                        await tokens.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if run.failed(provider_choice, post, started, e):
+                    return
+                continue
+            finally:
+                scheduler.release()
+            if await self._off_loop(run.ended, provider_choice, post, started):
+                return
+        yield run.fallback()
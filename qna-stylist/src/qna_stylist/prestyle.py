@@ -0,0 +1,156 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import structlog
+
+from .cache import MemoryCache
+from .pipeline import ResponseStyleEnhancer
+from .settings import Settings
+from .snapshot import Snapshot, snapshot_version, write_snapshot
+from .types import StylistTone
+
+log = structlog.get_logger(__name__)
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads; a rate of 0 disables it."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def read_corpus(lines: Iterable[str], default_tones: Sequence[StylistTone]) -> Iterator[Tuple[str, str, StylistTone]]:
+    """Yield (question, answer, tone) from JSONL rows of ``question``, ``answer`` (or ``plain_answer``) and ``tones``."""
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        answer = row.get("answer", row.get("plain_answer"))
+        if not isinstance(row.get("question"), str) or not isinstance(answer, str):
+            raise ValueError(f"line {lineno}: 'question' and 'answer' strings are required")
+        tones = row.get("tones") or ([row["tone"]] if row.get("tone") else None)
+        for tone in [StylistTone(t) for t in tones] if tones else default_tones:
+            yield row["question"], answer, tone
+
+
+def _read_journal(path: str, version: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """Entries of a journal written for ``version``; None when there is no usable journal."""
+    if not os.path.exists(path):
+        return None
+    done: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as fh:
+        try:
+            header = json.loads(fh.readline())
+        except ValueError:
+            return None
+        if header != version:
+            return None
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn line from an interrupted run
+            done[entry["key"]] = entry["text"]
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as fh:
+        fh.seek(-1, os.SEEK_END)
+        return fh.read(1) == b"\n"
+
+
+def prestyle(
+    records: Iterable[Tuple[str, str, StylistTone]],
+    out_path: str,
+    *,
+    cfg: Optional[Settings] = None,
+    workers: int = 8,
+    rate: float = 0.0,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """Style every (question, answer, tone) record and write a snapshot of the results to ``out_path``.
+
+    Finished entries are appended to ``<out_path>.journal`` as they complete, so an
+    interrupted run picks up where it stopped. Entries already in an existing
+    snapshot with the same version are kept and not styled again. Failed records
+    are left out; running the job again retries them. ``rate`` caps LLM calls per second,
+    and calls queue as bulk behind interactive traffic at rate-limited providers.
+    """
+    cfg = (cfg or Settings()).model_copy(update={"cache_snapshot_path": None, "cache_similar_lookup": False})
+    enhancer = ResponseStyleEnhancer(cfg=cfg, cache=MemoryCache(max_items=0))
+    version = snapshot_version(cfg)
+    journal_path = f"{out_path}.journal"
+
+    done: Dict[str, str] = {}
+    if resume and os.path.exists(out_path):
+        try:
+            existing = Snapshot(out_path)
+            if existing.version() == version:
+                done.update(existing.items())
+        except ValueError:
+            pass
+    journaled = _read_journal(journal_path, version) if resume else None
+    if journaled:
+        done.update(journaled)
+
+    todo: Dict[str, Tuple[str, str, StylistTone]] = {}
+    total = 0
+    for question, answer, tone in records:
+        total += 1
+        key = enhancer.cache_key(question, answer, tone)
+        if key not in done:
+            todo.setdefault(key, (question, answer, tone))
+
+    limiter = RateLimiter(rate)
+    journal_lock = threading.Lock()
+    failed: List[str] = []
+    log.info("stylist.prestyle_start", records=total, cached=len(done), todo=len(todo), workers=workers)
+
+    with open(journal_path, "a" if journaled is not None else "w", encoding="utf-8") as journal:
+        if journaled is None:
+            journal.write(json.dumps(version) + "\n")
+        elif journal.tell() and not _ends_with_newline(journal_path):
+            journal.write("\n")
+
+        def style(item: Tuple[str, Tuple[str, str, StylistTone]]) -> None:
+            key, (question, answer, tone) = item
+            limiter.acquire()
+            try:
+                text = enhancer.style_uncached(question, answer, tone)
+            except Exception as e:
+                log.warning("stylist.prestyle_failed", key=key, err=str(e))
+                with journal_lock:
+                    failed.append(key)
+                return
+            with journal_lock:
+                done[key] = text
+                journal.write(json.dumps({"key": key, "text": text}) + "\n")
+                journal.flush()
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prestyle") as pool:
+            list(pool.map(style, todo.items()))
+
+    written = write_snapshot(out_path, done, version)
+    if not failed:
+        os.remove(journal_path)
+    stats = {"records": total, "styled": len(todo) - len(failed), "failed": len(failed), "entries": written, **version}
+    log.info("stylist.prestyle_done", **stats)
+    return stats
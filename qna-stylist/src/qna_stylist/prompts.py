@@ -1,4 +1,7 @@
 from __future__ import annotations
+import json
+import re
+from typing import Dict, Sequence, Tuple, Union
 from .types import StylistTone
 
 BASE_GUARDRAILS = '''RULES:
@@ -20,10 +23,28 @@ TONE_DIALECTS = {
     StylistTone.PROFESSIONAL: "Neutral, concise, minimal humor, executive-ready.",
 }
 
-def build_system_prompt(tone: StylistTone, max_emojis: int, max_length_chars: int, serious: bool) -> str:
+def _tone_line(tone: StylistTone, serious: bool) -> str:
     tone_line = TONE_DIALECTS.get(tone, TONE_DIALECTS[StylistTone.WITTY])
     if serious and tone != StylistTone.PROFESSIONAL:
         tone_line += " IMPORTANT: Topic is sensitive/serious — keep empathy high, humor minimal."
+    return tone_line
+
+def build_system_prompt(
+    tone: Union[StylistTone, Sequence[StylistTone]],
+    max_emojis: int,
+    max_length_chars: int,
+    serious: bool,
+    packed: bool = False,
+) -> str:
+    """System prompt for one tone, or for several tones answered together as a JSON object keyed by tone.
+
+    ``packed`` asks for several ID-tagged answers in one reply (see ``build_packed_user_prompt``).
+    """
+    tones = [tone] if isinstance(tone, str) else list(tone)
+    if len(tones) > 1:
+        return _build_multi_tone_prompt(tones, max_emojis, max_length_chars, serious)
+    tone_line = _tone_line(tones[0], serious)
+    output = PACKED_OUTPUT if packed else "Only the final rewritten answer. No preface, no analysis."
     return f'''ROLE: Response Humor Stylist
 OBJECTIVE: Rewrite a plain chatbot answer to be engaging and human while keeping it accurate.
 
@@ -31,14 +52,75 @@ TONE: {tone_line}
 
 {BASE_GUARDRAILS.format(max_emojis=max_emojis, max_length_chars=max_length_chars)}
 
-OUTPUT: Only the final rewritten answer. No preface, no analysis.
+OUTPUT: {output}
 '''
 
-def build_user_prompt(question: str, answer: str) -> str:
+def _build_multi_tone_prompt(tones: Sequence[StylistTone], max_emojis: int, max_length_chars: int, serious: bool) -> str:
+    tone_lines = "\n".join(f"- {t.value}: {_tone_line(t, serious)}" for t in tones)
+    keys = ", ".join(f'"{t.value}"' for t in tones)
+    return f'''ROLE: Response Humor Stylist
+OBJECTIVE: Rewrite a plain chatbot answer once for each tone below, keeping every version accurate.
+
+TONES:
+{tone_lines}
+
+{BASE_GUARDRAILS.format(max_emojis=max_emojis, max_length_chars=max_length_chars)}
+Apply the RULES to each version on its own.
+
+OUTPUT: Only a JSON object with the keys {keys}; each value is the rewritten answer in that tone. No preface, no markdown fences.
+'''
+
+def parse_tone_variants(raw: str, tones: Sequence[StylistTone]) -> Dict[StylistTone, str]:
+    """Variants from a multi-tone reply; tones whose value is missing or not a non-empty string are left out."""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(raw[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    variants: Dict[StylistTone, str] = {}
+    for tone in tones:
+        text = data.get(tone.value)
+        if isinstance(text, str) and text.strip():
+            variants[tone] = text.strip()
+    return variants
+
+def _qa_block(question: str, answer: str) -> str:
     return f'''User question:
 """{question.strip()}"""
 
 Plain chatbot answer:
-"""{answer.strip()}"""
+"""{answer.strip()}"""'''
+
+def build_user_prompt(question: str, answer: str) -> str:
+    return f"{_qa_block(question, answer)}\n\nRewrite now."
+
+PACKED_OUTPUT = (
+    "Rewrite every ITEM on its own. For each one, reply with its rewritten answer only, between "
+    "<<<ITEM n>>> and <<<END n>>> using the same n. No other text."
+)
+_PACKED_RE = re.compile(r"<<<ITEM (\d+)>>>\s*(.*?)\s*<<<END \1>>>", re.DOTALL)
+
+def build_packed_user_prompt(items: Sequence[Tuple[str, str]]) -> str:
+    """Several (question, answer) pairs in one prompt, each in a section tagged with its index."""
+    sections = "\n\n".join(
+        f"<<<ITEM {i}>>>\n{_qa_block(question, answer)}\n<<<END {i}>>>"
+        for i, (question, answer) in enumerate(items)
+    )
+    return f"{sections}\n\nRewrite all {len(items)} items now."
+
+def parse_packed(raw: str, count: int) -> Dict[int, str]:
+    """Answers by item index from a packed reply; unknown, empty or repeated sections are ignored."""
+    answers: Dict[int, str] = {}
+    for match in _PACKED_RE.finditer(raw):
+        idx, text = int(match.group(1)), match.group(2).strip()
+        if idx < count and text and idx not in answers:
+            answers[idx] = text
+    return answers
 
-Rewrite now.'''
+def estimate_tokens(*texts: str) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting and logs.
+    return sum(len(t) for t in texts) // 4 + 1
@@ -0,0 +1,76 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Literal, NamedTuple, Optional
+from pydantic import BaseModel
+from .prompts import estimate_tokens
+from .types import RouteInfo, StylistTone
+
+if TYPE_CHECKING:
+    from .health import HealthRegistry
+    from .settings import Settings
+
+
+class RouteRule(BaseModel):
+    """Sends matching requests to ``provider``; every condition that is set must hold.
+
+    ``tones`` is checked against the tone after safety softening, and ``reduced_humor``
+    against whether that softening happened. The input-token bounds use the
+    estimated size of the question plus the plain answer. ``max_p95_ms`` makes the rule
+    apply only while the provider's recent p95 latency stays under it; a provider
+    with no samples yet counts as fast. A rule whose provider has an open circuit
+    breaker, or is OpenAI without an API key, is skipped.
+    """
+
+    provider: Literal["openai", "ollama"]
+    name: Optional[str] = None
+    tones: Optional[List[StylistTone]] = None
+    reduced_humor: Optional[bool] = None
+    min_input_tokens: Optional[int] = None
+    max_input_tokens: Optional[int] = None
+    max_p95_ms: Optional[float] = None
+
+    def matches(self, used_tone: StylistTone, reduced: bool, input_tokens: int) -> bool:
+        if self.tones is not None and used_tone not in self.tones:
+            return False
+        if self.reduced_humor is not None and reduced != self.reduced_humor:
+            return False
+        if self.min_input_tokens is not None and input_tokens < self.min_input_tokens:
+            return False
+        return self.max_input_tokens is None or input_tokens <= self.max_input_tokens
+
+
+class RouteDecision(NamedTuple):
+    provider: str
+    model: str
+    rule: str  # name of the matching rule, "rules[i]" for an unnamed one, or "default"
+    input_tokens: int
+
+    @property
+    def model_key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+    def info(self) -> RouteInfo:
+        return {"provider": self.provider, "model": self.model, "rule": self.rule, "input_tokens": self.input_tokens}
+
+
+def _available(rule: RouteRule, cfg: "Settings", health: "HealthRegistry") -> bool:
+    if rule.provider == "openai" and not cfg.get_openai_api_key():
+        return False
+    provider_health = health.get(rule.provider, cfg)
+    if provider_health.is_open():
+        # Past its cooldown an open provider is due a probe, so the rule may pick it again.
+        return False
+    if rule.max_p95_ms is None:
+        return True
+    p95 = provider_health.latency_percentile(95)
+    return p95 is None or p95 * 1000 <= rule.max_p95_ms
+
+
+def choose_route(
+    cfg: "Settings", health: "HealthRegistry", question: str, answer: str, used_tone: StylistTone, reduced: bool
+) -> RouteDecision:
+    """Provider and model for one request: the first rule in ``cfg.routing_rules`` that matches, else ``cfg.provider``."""
+    input_tokens = estimate_tokens(question, answer)
+    for i, rule in enumerate(cfg.routing_rules):
+        if rule.matches(used_tone, reduced, input_tokens) and _available(rule, cfg, health):
+            return RouteDecision(rule.provider, cfg.active_model(rule.provider), rule.name or f"rules[{i}]", input_tokens)
+    return RouteDecision(cfg.provider, cfg.active_model(), "default", input_tokens)
@@ -1,34 +1,223 @@
 from __future__ import annotations
 import re
-from typing import Tuple, Optional, List
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Sequence, Tuple, Optional, List
 from .settings import Settings
 
 _SENSITIVE_RE = re.compile(r"\b(suicide|self[- ]?harm|sexual\s+minors|extremis[m]|terroris[m]|emergency|harass|hate\s+crime)\b", re.I)
 
-def analyze_topic(question: str, answer: str, cfg: Settings) -> Tuple[bool, Optional[str]]:
-    """Returns (should_reduce_humor, note)"""
-    text = f"{question}\n{answer}"
-    if cfg.enable_safety_filters and (_SENSITIVE_RE.search(text) or any(k.lower() in text.lower() for k in cfg.reduce_humor_keywords)):
-        return True, "Sensitive or serious topic detected — humor softened."
+_SERIOUS_NOTE = "Sensitive or serious topic detected — humor softened."
+
+class TopicMatch(NamedTuple):
+    serious: bool
+    sensitive: List[str]
+    keywords: List[str]
+    blocklist: List[str]
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    # Fold the literals into a prefix trie so the regex engine walks shared prefixes
+    # once instead of retrying every alternative at every position.
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        ends = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            # Optional and greedy: the longest keyword at a position wins.
+            body = (f"(?:{body})?" if len(branches) == 1 else body + "?")
+        return body
+
+    return emit(trie)
+
+class TopicMatcher:
+    """All safety keyword lists compiled into one regex over lowercased text.
+
+    The text is lowercased once and scanned case-sensitively, which keeps the
+    regex engine's literal prefilter in play (``re.I`` alternations lose it).
+    Every keyword occurrence is reported, including overlapping ones, sorted
+    into sensitive / reduce-humor / blocklist hits.
+    """
+
+    def __init__(self, reduce_humor_keywords: Sequence[str], safe_topics_blocklist: Sequence[str]) -> None:
+        self._keywords = {k.lower() for k in reduce_humor_keywords if k}
+        self._blocklist = {k.lower() for k in safe_topics_blocklist if k}
+        literals = self._keywords | self._blocklist
+        alternatives = [_SENSITIVE_RE.pattern.lower()]
+        if literals:
+            alternatives.insert(0, _trie_pattern(literals))
+        self._pattern = re.compile("|".join(alternatives))
+
+    def scan(self, text: str) -> TopicMatch:
+        lowered = text.lower()
+        sensitive: List[str] = []
+        keywords: List[str] = []
+        blocklist: List[str] = []
+        m = self._pattern.search(lowered)
+        while m:
+            found = m.group()
+            if found in self._keywords and found not in keywords:
+                keywords.append(found)
+            if found in self._blocklist and found not in blocklist:
+                blocklist.append(found)
+            if _SENSITIVE_RE.fullmatch(found) and found not in sensitive:
+                sensitive.append(found)
+            # Resume one character in, so "data breach" still reports "breach".
+            m = self._pattern.search(lowered, m.start() + 1)
+        return TopicMatch(bool(sensitive or keywords or blocklist), sensitive, keywords, blocklist)
+
+@lru_cache(maxsize=32)
+def _compiled_matcher(reduce_humor_keywords: Tuple[str, ...], safe_topics_blocklist: Tuple[str, ...]) -> TopicMatcher:
+    return TopicMatcher(reduce_humor_keywords, safe_topics_blocklist)
+
+def topic_matcher(cfg: Settings) -> TopicMatcher:
+    return _compiled_matcher(tuple(cfg.reduce_humor_keywords), tuple(cfg.safe_topics_blocklist))
+
+def match_topic(question: str, answer: str, cfg: Settings, matcher: Optional[TopicMatcher] = None) -> TopicMatch:
+    if not cfg.enable_safety_filters:
+        return TopicMatch(False, [], [], [])
+    return (matcher or topic_matcher(cfg)).scan(f"{question}\n{answer}")
+
+def analyze_topic(
+    question: str, answer: str, cfg: Settings, matcher: Optional[TopicMatcher] = None
+) -> Tuple[bool, Optional[str]]:
+    """Returns (should_reduce_humor, note)
+
+    Pass ``matcher`` (from ``topic_matcher(cfg)``) on hot paths to skip the
+    per-call keyword-tuple hashing needed to look the compiled matcher up.
+    """
+    if match_topic(question, answer, cfg, matcher).serious:
+        return True, _SERIOUS_NOTE
     return False, None
 
+def analyze_topics(
+    pairs: Sequence[Tuple[str, str]], cfg: Settings, matcher: Optional[TopicMatcher] = None
+) -> List[Tuple[bool, Optional[str]]]:
+    """Batch ``analyze_topic``: the matcher is resolved once for the whole batch."""
+    if not cfg.enable_safety_filters:
+        return [(False, None)] * len(pairs)
+    matcher = matcher or topic_matcher(cfg)
+    return [
+        (True, _SERIOUS_NOTE) if matcher.scan(f"{question}\n{answer}").serious else (False, None)
+        for question, answer in pairs
+    ]
+
 def clamp_length(text: str, limit: int) -> str:
     return text if len(text) <= limit else text[:limit].rstrip() + "…"
 
+class StreamingPostProcessor:
+    """Incremental ``clamp_length`` + ``strip_excess_emojis`` for streamed output.
+
+    Feeding chunks, then calling ``finish()``, and joining the returned pieces
+    gives the same text as post-processing the stripped full output. Whitespace
+    is held back until a visible character follows it, and a trailing emoji
+    cluster is held until the next chunk shows whether it continues (ZWJ,
+    skin tone, second flag letter). ``done`` flips once the character limit is
+    hit, telling the caller to stop pulling tokens it would only truncate.
+    """
+
+    def __init__(self, limit: int, max_emoji: int) -> None:
+        self.limit = limit
+        self.max_emoji = max_emoji
+        self.done = False
+        self._started = False
+        self._pos = 0
+        self._emojis = 0
+        self._pending = ""
+        self._held = ""
+        self._out: List[str] = []
+
+    def feed(self, chunk: str) -> str:
+        if self.done or not chunk:
+            return ""
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return ""
+            self._started = True
+        visible: List[str] = []
+        for ch in chunk:
+            if ch.isspace():
+                self._pending += ch
+                self._pos += 1
+                continue
+            if self._pos >= self.limit:
+                # A visible character past the limit: clamp, dropping held whitespace like rstrip().
+                self.done = True
+                self._pending = ""
+                break
+            visible.append(self._pending)
+            visible.append(ch)
+            self._pending = ""
+            self._pos += 1
+        piece = self._limit_emojis("".join(visible), final=self.done)
+        if self.done:
+            piece += "…"
+        self._out.append(piece)
+        return piece
+
+    def finish(self) -> str:
+        """Flush anything still held back once the stream has ended."""
+        piece = self._limit_emojis("", final=True)
+        self._out.append(piece)
+        return piece
+
+    def _limit_emojis(self, visible: str, final: bool) -> str:
+        buf = self._held + visible
+        self._held = ""
+        if not buf or not _EMOJI_PROBE_RE.search(buf):
+            return buf
+        if not final:
+            # Tokenize like the substitution below so the held cluster starts on a real boundary.
+            last = None
+            for last in _EMOJI_CLUSTER_RE.finditer(buf):
+                pass
+            if last and last.end() >= len(buf.rstrip("\u200d\ufe0f")):
+                buf, self._held = buf[:last.start()], buf[last.start():]
+
+        def keep(m: "re.Match[str]") -> str:
+            self._emojis += 1
+            return m.group() if self._emojis <= self.max_emoji else ""
+
+        return _EMOJI_CLUSTER_RE.sub(keep, buf)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._out)
+
+
+# Same code point ranges as ``is_emoji``; a cluster is a flag pair or a base emoji with
+# its variation selector / skin tone / tag modifiers, optionally ZWJ-joined to more.
+_EMOJI_CHARS = "\U0001F300-\U0001FAFF\u2600-\u26FF\u2700-\u27BF"
+_REGIONAL = "[\U0001F1E6-\U0001F1FF]"
+_ELEMENT = f"[{_EMOJI_CHARS}][\uFE0F\U0001F3FB-\U0001F3FF]*[\U000E0020-\U000E007F]*"
+_CLUSTER = f"{_REGIONAL}{{1,2}}|{_ELEMENT}(?:\u200D{_ELEMENT})*"
+_EMOJI_PROBE_RE = re.compile(f"[{_EMOJI_CHARS}\U0001F1E6-\U0001F1FF]")
+_EMOJI_CLUSTER_RE = re.compile(_CLUSTER)
+
 def strip_excess_emojis(text: str, max_emoji: int) -> str:
-    # naive emoji stripper: count unicode category So and common emoji ranges
-    # keep the first N visually; replace excess with nothing.
-    chars = list(text)
+    """Keep the first ``max_emoji`` emoji clusters and drop the rest.
+
+    ZWJ sequences, skin-tone variants and flags count as one emoji and are removed
+    whole, never leaving half a glyph behind. Text without emoji is returned untouched.
+    """
+    if not _EMOJI_PROBE_RE.search(text):
+        return text
     count = 0
-    out: List[str] = []
-    for ch in chars:
-        if is_emoji(ch):
-            if count < max_emoji:
-                out.append(ch)
-            count += 1
-        else:
-            out.append(ch)
-    return "".join(out)
+
+    def keep(m: "re.Match[str]") -> str:
+        nonlocal count
+        count += 1
+        return m.group() if count <= max_emoji else ""
+
+    return _EMOJI_CLUSTER_RE.sub(keep, text)
 
 def is_emoji(ch: str) -> bool:
     cp = ord(ch)
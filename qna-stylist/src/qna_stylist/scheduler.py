@@ -0,0 +1,261 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .settings import Settings
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+_RANKS = {INTERACTIVE: 0, BULK: 1}
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units evenly over a minute and holds at most one minute's worth; 0 means unlimited."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(max(0, per_minute))
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_s(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available; 0 if they are now."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # More than a full bucket is charged as a full bucket, or it could never go.
+        short = min(amount, self.capacity) - self.level
+        return short / self.rate if short > 1e-9 else 0.0
+
+    def take(self, amount: float, now: float) -> None:
+        if self.capacity:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("tokens", "priority", "enqueued", "wake", "granted")
+
+    def __init__(self, tokens: int, priority: str, wake: Callable[[], Any]) -> None:
+        self.tokens = tokens
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.wake = wake
+        self.granted = False
+
+
+class ProviderScheduler:
+    """Admits calls to one provider within its RPM/TPM token buckets and concurrency cap.
+
+    A call that cannot start now waits in a priority queue: interactive before bulk,
+    first come first served within each. The head of the queue is never overtaken
+    by a smaller call behind it, so large prompts cannot starve. Overload then turns
+    into queueing instead of 429s and retry storms. Threads and event loops share
+    one queue, so a process holds one scheduler per provider.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 0) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.enabled = bool(rpm > 0 or tpm > 0 or max_concurrency > 0)
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._stats = {p: {"admitted": 0, "queued": 0, "timeouts": 0, "wait_s": 0.0, "max_wait_s": 0.0} for p in _RANKS}
+
+    def _ready_s_locked(self, tokens: int, now: float) -> Optional[float]:
+        """0 if a call may start now, seconds until the buckets allow it, or None while at the concurrency cap."""
+        if self.max_concurrency > 0 and self._active >= self.max_concurrency:
+            return None
+        return max(self._requests.wait_s(1, now), self._tokens.wait_s(tokens, now))
+
+    def _grant_locked(self, tokens: int, priority: str, waited_s: float, now: float) -> None:
+        self._requests.take(1, now)
+        self._tokens.take(tokens, now)
+        self._active += 1
+        stats = self._stats[priority]
+        stats["admitted"] += 1
+        stats["wait_s"] += waited_s
+        stats["max_wait_s"] = max(stats["max_wait_s"], waited_s)
+
+    def _dispatch_locked(self, caller: Optional[_Waiter] = None) -> Optional[float]:
+        """Start queued calls in order; returns when the head may go, if only the buckets hold it back."""
+        now = time.monotonic()
+        while self._queue:
+            waiter = self._queue[0][2]
+            ready = self._ready_s_locked(waiter.tokens, now)
+            if ready is None:
+                return None  # a release() dispatches again
+            if ready > 0:
+                if waiter is not caller:
+                    # The head may be sleeping without a timeout; let it poll for the refill itself.
+                    waiter.wake()
+                return ready
+            heapq.heappop(self._queue)
+            self._grant_locked(waiter.tokens, waiter.priority, now - waiter.enqueued, now)
+            waiter.granted = True
+            waiter.wake()
+        return None
+
+    def _try_now(self, tokens: int, priority: str) -> bool:
+        with self._lock:
+            if self._queue or self._ready_s_locked(tokens, time.monotonic()) != 0:
+                return False
+            self._grant_locked(tokens, priority, 0.0, time.monotonic())
+            return True
+
+    def _enqueue(self, tokens: int, priority: str, wake: Callable[[], Any]) -> _Waiter:
+        waiter = _Waiter(tokens, priority, wake)
+        with self._lock:
+            heapq.heappush(self._queue, (_RANKS[priority], next(self._seq), waiter))
+            self._stats[priority]["queued"] += 1
+        return waiter
+
+    def _poll(self, waiter: _Waiter, deadline: Optional[float]) -> Optional[float]:
+        """Dispatch, then how long ``waiter`` should sleep before polling again (None: until woken)."""
+        with self._lock:
+            hint = self._dispatch_locked(waiter)
+        if deadline is None:
+            return hint
+        left = deadline - time.monotonic()
+        return left if hint is None else min(hint, left)
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue; True if the call was admitted meanwhile and now holds a slot."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+            heapq.heapify(self._queue)
+            self._stats[waiter.priority]["timeouts"] += 1
+            self._dispatch_locked()
+            return False
+
+    def acquire(self, tokens: int, priority: str = INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """Block until a call estimated at ``tokens`` may start; False if ``timeout`` seconds pass first.
+
+        Every successful acquire must be paired with a release().
+        """
+        if not self.enabled or self._try_now(tokens, priority):
+            return True
+        event = threading.Event()
+        waiter = self._enqueue(tokens, priority, event.set)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            event.clear()
+            wait = self._poll(waiter, deadline)
+            if waiter.granted:
+                return True
+            if wait is not None and wait <= 0:
+                return self._abandon(waiter)
+            event.wait(wait)
+
+    async def aacquire(self, tokens: int, priority: str = INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        if not self.enabled or self._try_now(tokens, priority):
+            return True
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # the waiting loop has closed
+
+        waiter = self._enqueue(tokens, priority, wake)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                event.clear()
+                wait = self._poll(waiter, deadline)
+                if waiter.granted:
+                    return True
+                if wait is not None and wait <= 0:
+                    return self._abandon(waiter)
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # Cancelled while queued: give back a slot granted in the meantime.
+            if self._abandon(waiter):
+                self.release()
+            raise
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._active -= 1
+            self._dispatch_locked()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            active, queued = self._active, len(self._queue)
+            stats = {p: dict(s) for p, s in self._stats.items()}
+        out: Dict[str, Any] = {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "max_concurrency": self.max_concurrency,
+            "active": active,
+            "queued": queued,
+        }
+        for priority, s in stats.items():
+            out[priority] = {
+                "admitted": s["admitted"],
+                "queued": s["queued"],
+                "timeouts": s["timeouts"],
+                "avg_wait_ms": int(s["wait_s"] / s["admitted"] * 1000) if s["admitted"] else 0,
+                "max_wait_ms": int(s["max_wait_s"] * 1000),
+            }
+        return out
+
+
+class SchedulerRegistry:
+    """Process-wide ``ProviderScheduler`` per provider and set of limits.
+
+    Rate limits belong to the account or host, not to an enhancer, so enhancers
+    configured alike share one queue; one with other limits gets its own.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._providers: Dict[Tuple[str, Tuple[int, int, int]], ProviderScheduler] = {}
+
+    def get(self, provider: str, cfg: Settings) -> ProviderScheduler:
+        key = (provider, cfg.provider_limits(provider))
+        with self._lock:
+            scheduler = self._providers.get(key)
+            if scheduler is None:
+                rpm, tpm, max_concurrency = key[1]
+                scheduler = ProviderScheduler(rpm=rpm, tpm=tpm, max_concurrency=max_concurrency)
+                self._providers[key] = scheduler
+            return scheduler
+
+    def snapshot(self, cfg: Settings) -> Dict[str, Dict[str, Any]]:
+        """Stats of the rate-limited schedulers ``cfg`` uses, by provider."""
+        with self._lock:
+            providers = dict(self._providers)
+        out: Dict[str, Dict[str, Any]] = {}
+        for (name, limits), scheduler in providers.items():
+            if scheduler.enabled and limits == cfg.provider_limits(name):
+                out[name] = scheduler.snapshot()
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+
+SCHEDULER = SchedulerRegistry()
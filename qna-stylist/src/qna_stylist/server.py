@@ -0,0 +1,329 @@
+from __future__ import annotations
+import asyncio
+import json
+import time
+import structlog
+from collections import Counter
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .pipeline import ResponseStyleEnhancer
+from .safety import analyze_topic
+from .scheduler import INTERACTIVE
+from .settings import Settings
+from .types import StylistResult, StylistTone
+
+log = structlog.get_logger(__name__)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_MAX_BODY_BYTES = 64 * 1024
+
+
+class _Reject(Exception):
+    def __init__(self, status: int, error: str, retry_after: Optional[int] = None) -> None:
+        super().__init__(error)
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+
+
+class _Pending:
+    __slots__ = ("question", "answer", "tone", "deadline", "future", "dispatched")
+
+    def __init__(
+        self, question: str, answer: str, tone: StylistTone, deadline: float, future: "asyncio.Future[StylistResult]"
+    ) -> None:
+        self.question = question
+        self.answer = answer
+        self.tone = tone
+        self.deadline = deadline  # time.monotonic()
+        self.future = future
+        self.dispatched = False
+
+
+class _MicroBatcher:
+    """Groups requests that arrive within ``window_s`` and styles each tone group with one ``enhance_many``.
+
+    A batch shares one cache round-trip, collapses duplicate questions and occupies
+    a single service slot. Requests whose caller already gave up are dropped before dispatch.
+    """
+
+    def __init__(self, service: "StylistService", window_s: float, max_size: int) -> None:
+        self.service = service
+        self.window_s = window_s
+        self.max_size = max(1, max_size)
+        self._items: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.batches = 0
+
+    def submit(self, question: str, answer: str, tone: StylistTone, deadline: float) -> _Pending:
+        loop = asyncio.get_running_loop()
+        item = _Pending(question, answer, tone, deadline, loop.create_future())
+        self._items.append(item)
+        if len(self._items) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self.flush)
+        return item
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._items = self._items, []
+        groups: Dict[StylistTone, List[_Pending]] = {}
+        for item in items:
+            groups.setdefault(item.tone, []).append(item)
+        for tone, group in groups.items():
+            task = asyncio.ensure_future(self._run(tone, group))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, tone: StylistTone, group: List[_Pending]) -> None:
+        async with self.service._slots():
+            live = [item for item in group if not item.future.done()]
+            if not live:
+                return
+            for item in live:
+                item.dispatched = True
+            self.batches += 1
+            loop = asyncio.get_running_loop()
+            pairs = [(item.question, item.answer) for item in live]
+            # The batch stops spending on the provider once the last caller's deadline has passed.
+            budget_ms = max(1.0, (max(item.deadline for item in live) - time.monotonic()) * 1000)
+            try:
+                # Micro-batches are live requests, so they keep interactive priority at the providers.
+                styling = partial(self.service.enhancer.enhance_many, pairs, tone=tone, deadline_ms=budget_ms, priority=INTERACTIVE)
+                results = await loop.run_in_executor(None, styling)
+            except Exception as e:
+                results = [e] * len(live)
+        for item, result in zip(live, results):
+            if item.future.done():
+                continue
+            if isinstance(result, Exception):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
+
+
+class StylistService:
+    """ASGI app exposing ``enhance`` over HTTP.
+
+    ``POST /v1/enhance`` takes ``{"question", "plain_answer", "tone"?, "deadline_ms"?}``
+    and returns a ``StylistResult``. ``GET /healthz`` reports queue, cache and provider
+    state. ``GET /metrics`` serves Prometheus text when that sink is configured.
+
+    One enhancer (and so one cache, agent pool and set of HTTP clients) serves every
+    request. At most ``max_concurrency`` requests are styled at once and ``max_queue``
+    more may wait; further requests get 429. A request still waiting when its deadline
+    passes gets 503. One whose styling overruns the deadline gets the plain answer back,
+    as ``enhance`` does on failure.
+    """
+
+    def __init__(
+        self,
+        enhancer: Optional[ResponseStyleEnhancer] = None,
+        *,
+        cfg: Optional[Settings] = None,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        deadline_ms: Optional[int] = None,
+        batch_window_ms: Optional[int] = None,
+        batch_max_size: Optional[int] = None,
+        warmup: bool = False,
+    ) -> None:
+        self.enhancer = enhancer or ResponseStyleEnhancer(cfg)
+        cfg = self.enhancer.cfg
+        self.max_concurrency = max(1, max_concurrency if max_concurrency is not None else cfg.serve_max_concurrency)
+        self.max_queue = max(0, max_queue if max_queue is not None else cfg.serve_max_queue)
+        self.deadline_ms = deadline_ms if deadline_ms is not None else cfg.serve_deadline_ms
+        window_ms = batch_window_ms if batch_window_ms is not None else cfg.serve_batch_window_ms
+        self._batch_window_s = max(0, window_ms) / 1000
+        self._batch_max_size = batch_max_size if batch_max_size is not None else cfg.serve_batch_max_size
+        self.warmup = warmup
+        self._admitted = 0
+        self._draining = False
+        self._responses: Counter = Counter()
+        # Asyncio primitives bind to the running loop, so keep them per loop.
+        self._loop_state: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore, Optional[_MicroBatcher]]] = None
+
+    def _state(self) -> Tuple[asyncio.Semaphore, Optional[_MicroBatcher]]:
+        loop = asyncio.get_running_loop()
+        if self._loop_state is None or self._loop_state[0] is not loop:
+            batcher = _MicroBatcher(self, self._batch_window_s, self._batch_max_size) if self._batch_window_s else None
+            self._loop_state = (loop, asyncio.Semaphore(self.max_concurrency), batcher)
+        return self._loop_state[1], self._loop_state[2]
+
+    def _slots(self) -> asyncio.Semaphore:
+        return self._state()[0]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        t0 = time.monotonic()
+        path, method = scope["path"], scope["method"]
+        headers: List[Tuple[bytes, bytes]] = []
+        if path == "/v1/enhance" and method == "POST":
+            try:
+                status, body = 200, await self._enhance(receive, t0)
+            except _Reject as r:
+                status, body = r.status, {"error": r.error}
+                if r.retry_after is not None:
+                    headers.append((b"retry-after", str(r.retry_after).encode()))
+        elif path == "/healthz" and method == "GET":
+            status, body = 200, self.health()
+        elif path == "/metrics" and method == "GET" and (exposed := self.enhancer.metrics.exposition()) is not None:
+            await self._exposition(send, *exposed)
+            return
+        elif path in ("/v1/enhance", "/healthz"):
+            status, body = 405, {"error": "method_not_allowed"}
+        else:
+            status, body = 404, {"error": "not_found"}
+        self._responses[status] += 1
+        self.enhancer.metrics.increment("http_responses_total", status=str(status))
+        self.enhancer.metrics.observe("http_request_seconds", time.monotonic() - t0, path=path)
+        await _respond(send, status, body, headers)
+
+    async def _enhance(self, receive: Receive, t0: float) -> StylistResult:
+        question, answer, tone, deadline_s = self._parse(await _read_json(receive))
+        if self._draining:
+            raise _Reject(503, "shutting_down", retry_after=1)
+        if self._admitted >= self.max_concurrency + self.max_queue:
+            raise _Reject(429, "queue_full", retry_after=1)
+        self._admitted += 1
+        try:
+            return await self._style(question, answer, tone, t0, t0 + deadline_s)
+        finally:
+            self._admitted -= 1
+
+    def _parse(self, payload: Any) -> Tuple[str, str, StylistTone, float]:
+        if not isinstance(payload, dict):
+            raise _Reject(400, "body must be a JSON object")
+        question, answer = payload.get("question"), payload.get("plain_answer")
+        if not isinstance(question, str) or not isinstance(answer, str) or not answer.strip():
+            raise _Reject(400, "question and plain_answer must be non-empty strings")
+        try:
+            tone = StylistTone(payload.get("tone", StylistTone.WITTY.value))
+        except ValueError:
+            raise _Reject(400, f"tone must be one of {[t.value for t in StylistTone]}")
+        deadline_ms = payload.get("deadline_ms", self.deadline_ms)
+        if not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0:
+            raise _Reject(400, "deadline_ms must be a positive number")
+        return question, answer, tone, deadline_ms / 1000
+
+    async def _style(self, question: str, answer: str, tone: StylistTone, t0: float, deadline: float) -> StylistResult:
+        slots, batcher = self._state()
+        if batcher is not None:
+            item = batcher.submit(question, answer, tone, deadline)
+            try:
+                return await asyncio.wait_for(item.future, max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                if not item.dispatched:
+                    raise _Reject(503, "queue_timeout", retry_after=1)
+                return self._deadline_result(question, answer, tone, t0)
+        try:
+            await asyncio.wait_for(slots.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise _Reject(503, "queue_timeout", retry_after=1)
+        try:
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                return self._deadline_result(question, answer, tone, t0)
+            # aenhance enforces the budget itself: shorter attempts, capped backoff, cancelled calls.
+            return await self.enhancer.aenhance(question=question, plain_answer=answer, tone=tone, deadline_ms=remaining_ms)
+        finally:
+            slots.release()
+
+    def _deadline_result(self, question: str, answer: str, tone: StylistTone, t0: float) -> StylistResult:
+        log.warning("stylist.deadline_exceeded", tone=tone.value)
+        reduce, note = analyze_topic(question, answer, self.enhancer.cfg, self.enhancer.topics)
+        reason = "Fallback to original: deadline exceeded."
+        return {
+            "styled_text": answer,
+            "used_tone": StylistTone.PROFESSIONAL if reduce else tone,
+            "safety_notes": f"{note} | {reason}" if note else reason,
+            "elapsed_ms": int((time.monotonic() - t0) * 1000),
+            "cache_hit": False,
+        }
+
+    def health(self) -> Dict[str, Any]:
+        _, batcher = self._loop_state[1:] if self._loop_state else (None, None)
+        return {
+            "status": "draining" if self._draining else "ok",
+            "in_flight": self._admitted,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "batches": batcher.batches if batcher else 0,
+            "responses": {str(k): v for k, v in sorted(self._responses.items())},
+            "cache": self.enhancer.cache.stats(),
+            "coalescing": self.enhancer.coalescing_stats(),
+            "providers": self.enhancer.provider_health(),
+            "provider_queues": self.enhancer.scheduler_stats(),
+        }
+
+    async def _exposition(self, send: Send, content_type: str, data: bytes) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(data)).encode())],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.warmup:
+                    try:
+                        await asyncio.get_running_loop().run_in_executor(None, self.enhancer.warmup)
+                    except Exception as e:
+                        await send({"type": "lifespan.startup.failed", "message": str(e)})
+                        return
+                log.info("stylist.serve_ready", max_concurrency=self.max_concurrency, max_queue=self.max_queue)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._draining = True
+                if self._loop_state and self._loop_state[2]:
+                    self._loop_state[2].flush()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_json(receive: Receive) -> Any:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _Reject(400, "client_disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > _MAX_BODY_BYTES:
+            raise _Reject(413, "body_too_large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(b"".join(chunks) or b"null")
+    except ValueError:
+        raise _Reject(400, "body must be valid JSON")
+
+
+async def _respond(send: Send, status: int, body: Any, headers: List[Tuple[bytes, bytes]]) -> None:
+    data = json.dumps(body, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": data})
+
+
+def create_app(cfg: Optional[Settings] = None, **kwargs: Any) -> StylistService:
+    """App factory, e.g. ``uvicorn qna_stylist.server:create_app --factory --workers 4``."""
+    return StylistService(cfg=cfg, **kwargs)
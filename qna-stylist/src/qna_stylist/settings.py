@@ -1,7 +1,8 @@
 import os
 from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Tuple
+from .routing import RouteRule
 
 class Settings(BaseSettings):
     # LLM setup
@@ -25,6 +26,10 @@ class Settings(BaseSettings):
         default=512,
         description="Maximum generation length."
     )
+    execution_mode: Literal["crew", "direct"] = Field(
+        default="crew",
+        description="'crew' runs a CrewAI agent/task; 'direct' sends the prompts straight to the chat completion API."
+    )
     cache_ttl_s: int = Field(
         default=600,
         description="Seconds to keep cached responses."
@@ -33,10 +38,52 @@ class Settings(BaseSettings):
         default=1024,
         description="Maximum number of cache entries to retain."
     )
+    cache_max_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        description="Byte budget for the in-memory cache (keys plus stored values); 0 disables it."
+    )
+    cache_compress_min_bytes: int = Field(
+        default=0,
+        description="zlib-compress in-memory cache values at least this large; 0 disables compression."
+    )
+    cache_backend: Literal["memory", "sqlite", "remote"] = Field(
+        default="memory",
+        description="Cache backend: in-process LRU, host-wide SQLite file, or remote KV service."
+    )
+    cache_sqlite_path: str = Field(
+        default=".stylist_cache.sqlite3",
+        description="Database file for the sqlite cache backend; share it across workers on one host."
+    )
+    cache_remote_url: str = Field(
+        default="http://127.0.0.1:6390",
+        description="Base URL of the KV service used by the remote cache backend."
+    )
+    cache_snapshot_path: Optional[str] = Field(
+        default=None,
+        description="Snapshot written by 'qna-stylist prestyle'; consulted on cache misses when its version matches."
+    )
+    cache_normalized_lookup: bool = Field(
+        default=True,
+        description="On an exact miss, retry under a key built from NFKC-normalized, whitespace-collapsed text."
+    )
+    cache_similar_lookup: bool = Field(
+        default=False,
+        description="Reuse the styled text of a near-duplicate plain answer (same tone and model, identical facts)."
+    )
+    cache_similarity_threshold: float = Field(
+        default=0.85,
+        ge=0.0,
+        le=1.0,
+        description="Minimum Jaccard similarity of word bigrams for a near-duplicate answer to be reused."
+    )
     openai_api_key: Optional[str] = Field(
         default=None,
         description="Optional override for OPENAI_API_KEY environment variable."
     )
+    openai_base_url: Optional[str] = Field(
+        default=None,
+        description="Override for the OpenAI API base URL (proxies, gateways, local stand-ins)."
+    )
     ollama_base_url: str = Field(
         default="http://localhost:11434/v1",
         description="Base URL for the local Ollama HTTP endpoint."
@@ -60,6 +107,129 @@ class Settings(BaseSettings):
     retry_min_wait_s: float = 0.6
     retry_max_wait_s: float = 2.4
 
+    deadline_ms: int = Field(
+        default=0,
+        description="Default latency budget for enhance()/aenhance()/enhance_many() across retries and fallback; 0 = unbounded."
+    )
+    deadline_max_workers: int = Field(
+        default=32,
+        description="Threads running deadline-bounded sync provider calls, kept apart from the hedge pool."
+    )
+
+    # Provider health
+    breaker_window: int = Field(
+        default=50,
+        description="Recent calls per provider used for latency percentiles and error rate."
+    )
+    breaker_error_threshold: float = Field(
+        default=0.5,
+        description="Error rate over the window that opens a provider's circuit breaker."
+    )
+    breaker_min_calls: int = Field(
+        default=5,
+        description="Calls needed in the window before the breaker may open."
+    )
+    breaker_cooldown_s: float = Field(
+        default=30.0,
+        description="Seconds an open breaker waits before letting a half-open probe through."
+    )
+    hedge_enabled: bool = Field(
+        default=False,
+        description="Race the fallback provider once the primary exceeds its p95 latency."
+    )
+    hedge_default_delay_s: float = Field(
+        default=2.0,
+        description="Hedge delay used until the primary has enough latency samples for a p95."
+    )
+    hedge_max_workers: int = Field(
+        default=32,
+        description="Threads available to hedged sync calls."
+    )
+
+    # Routing
+    routing_rules: List[RouteRule] = Field(
+        default_factory=list,
+        description="Ordered rules picking each request's provider (JSON list in the env); the first match wins, no match uses provider."
+    )
+
+    # Provider rate limits (0 = unlimited); calls over a limit queue, interactive ahead of bulk
+    openai_rpm: int = Field(
+        default=0,
+        description="Requests per minute allowed to the OpenAI provider."
+    )
+    openai_tpm: int = Field(
+        default=0,
+        description="Tokens per minute allowed to the OpenAI provider (prompt estimate plus max_tokens per call)."
+    )
+    openai_max_concurrency: int = Field(
+        default=0,
+        description="Maximum in-flight OpenAI calls per process."
+    )
+    ollama_rpm: int = Field(
+        default=0,
+        description="Requests per minute allowed to the Ollama provider."
+    )
+    ollama_tpm: int = Field(
+        default=0,
+        description="Tokens per minute allowed to the Ollama provider."
+    )
+    ollama_max_concurrency: int = Field(
+        default=0,
+        description="Maximum in-flight Ollama generations per process; a local instance copes with only a few."
+    )
+
+    # Concurrency
+    async_max_concurrency: int = Field(
+        default=64,
+        description="Maximum in-flight LLM calls per event loop for aenhance()."
+    )
+    batch_max_workers: int = Field(
+        default=8,
+        description="Default thread pool size used by enhance_many()."
+    )
+
+    # Packed mode
+    pack_max_items: int = Field(
+        default=1,
+        description="Misses sharing a tone and serious flag styled together in one prompt; 1 disables packing."
+    )
+    pack_max_wait_ms: int = Field(
+        default=20,
+        description="How long aenhance() holds a miss for more items to pack with it."
+    )
+
+    # HTTP service (qna-stylist serve)
+    serve_max_concurrency: int = Field(
+        default=32,
+        description="Requests (or micro-batches) styled at once by the service."
+    )
+    serve_max_queue: int = Field(
+        default=256,
+        description="Requests allowed to wait for a slot; beyond that the service answers 429."
+    )
+    serve_deadline_ms: int = Field(
+        default=10000,
+        description="Default per-request deadline; requests can lower or raise it with deadline_ms."
+    )
+    serve_batch_window_ms: int = Field(
+        default=0,
+        description="Micro-batching window; 0 styles every request on its own."
+    )
+    serve_batch_max_size: int = Field(
+        default=16,
+        description="A micro-batch is dispatched early once it holds this many requests."
+    )
+
+    # Observability
+    result_timings: bool = Field(
+        default=False,
+        description="Attach per-stage timings and provider attempts to every StylistResult."
+    )
+    metrics_sink: Literal["none", "prometheus", "otel"] = Field(
+        default="none",
+        description="Where counters, latency histograms and spans are exported."
+    )
+
     class Config:
         env_prefix = "STYLIST_"
         env_file = ".env"
@@ -71,3 +241,9 @@ class Settings(BaseSettings):
     def active_model(self, provider_override: Optional[str] = None) -> str:
         provider = provider_override or self.provider
         return self.openai_model if provider == "openai" else self.ollama_model
+
+    def provider_limits(self, provider: str) -> Tuple[int, int, int]:
+        """(rpm, tpm, max_concurrency) for ``provider``."""
+        if provider == "openai":
+            return self.openai_rpm, self.openai_tpm, self.openai_max_concurrency
+        return self.ollama_rpm, self.ollama_tpm, self.ollama_max_concurrency
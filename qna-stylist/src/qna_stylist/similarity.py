@@ -0,0 +1,160 @@
+from __future__ import annotations
+import random
+import re
+import unicodedata
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, FrozenSet, Hashable, List, NamedTuple, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .cache import CacheBackend
+
+_WS_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"\w+")
+# Things a rewrite must never change: links, emails, numbers (incl. times, dates, versions, percentages).
+_FACT_RE = re.compile(r"https?://[^\s)>\]]+|[\w.+-]+@[\w-]+(?:\.[\w-]+)+|\d+(?:[.,:/-]\d+)*%?")
+_PRIME = (1 << 61) - 1
+
+
+def canonical_text(text: str) -> str:
+    """NFKC-normalized text with runs of whitespace collapsed; the normalized cache key is built from this."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def answer_facts(text: str) -> FrozenSet[str]:
+    return frozenset(m.rstrip(".,") for m in _FACT_RE.findall(unicodedata.normalize("NFKC", text).casefold()))
+
+
+def _shingles(tokens: List[str]) -> FrozenSet[str]:
+    if len(tokens) < 2:
+        return frozenset(tokens)
+    return frozenset(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+class SimilarMatch(NamedTuple):
+    key: str
+    similarity: float
+
+
+class _Entry(NamedTuple):
+    partition: Hashable
+    shingles: FrozenSet[str]
+    facts: FrozenSet[str]
+    buckets: Tuple[Hashable, ...]
+
+
+class MinHashIndex:
+    """Near-duplicate lookup over plain answers, mapping them to the cache keys of their styled text.
+
+    Answers are reduced to case-folded word bigrams and MinHash signatures. The
+    signatures are split into LSH bands, so a lookup only compares against answers
+    that share a band. Candidates are then verified with the exact Jaccard
+    similarity, and they must contain the same facts (numbers, links, emails). So
+    "5 minutes" never reuses the text styled for "10 minutes". Entries live in
+    ``partition`` (tone plus model), and the oldest are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 1024, num_perm: int = 64, bands: int = 16, min_tokens: int = 6, seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.max_entries = max_entries
+        self.min_tokens = min_tokens
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._rows = num_perm // bands
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Hashable, Set[str]] = {}
+        self._lookups = 0
+        self._matches = 0
+
+    def _features(self, text: str) -> Optional[Tuple[FrozenSet[str], Tuple[int, ...]]]:
+        tokens = _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+        if len(tokens) < self.min_tokens:
+            return None
+        shingles = _shingles(tokens)
+        hashes = [hash(s) & _PRIME for s in shingles]
+        signature = tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms)
+        return shingles, signature
+
+    def _band_keys(self, partition: Hashable, signature: Tuple[int, ...]) -> Tuple[Hashable, ...]:
+        rows = self._rows
+        return tuple((partition, i, signature[i * rows:(i + 1) * rows]) for i in range(len(signature) // rows))
+
+    def add(self, partition: Hashable, text: str, key: str) -> None:
+        if self.max_entries <= 0:
+            return
+        features = self._features(text)
+        if features is None:
+            return
+        shingles, signature = features
+        entry = _Entry(partition, shingles, answer_facts(text), self._band_keys(partition, signature))
+        with self._lock:
+            self._discard_locked(key)
+            self._entries[key] = entry
+            for bucket in entry.buckets:
+                self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard_locked(next(iter(self._entries)))
+
+    def lookup(self, partition: Hashable, text: str, threshold: float) -> Optional[SimilarMatch]:
+        features = self._features(text)
+        with self._lock:
+            self._lookups += 1
+        if features is None:
+            return None
+        shingles, signature = features
+        facts = answer_facts(text)
+        best: Optional[SimilarMatch] = None
+        with self._lock:
+            candidates: Set[str] = set()
+            for bucket in self._band_keys(partition, signature):
+                candidates.update(self._buckets.get(bucket, ()))
+            for key in candidates:
+                entry = self._entries[key]
+                if entry.facts != facts:
+                    continue
+                similarity = len(shingles & entry.shingles) / len(shingles | entry.shingles)
+                if similarity >= threshold and (best is None or similarity > best.similarity):
+                    best = SimilarMatch(key, similarity)
+            if best is not None:
+                self._entries.move_to_end(best.key)
+                self._matches += 1
+        return best
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._discard_locked(key)
+
+    def _discard_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket in entry.buckets:
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "lookups": self._lookups, "matches": self._matches}
+
+
+_INDEXES: "weakref.WeakKeyDictionary[CacheBackend, MinHashIndex]" = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = Lock()
+
+def similarity_index(cache: "CacheBackend", max_entries: int) -> MinHashIndex:
+    """The index for answers stored in ``cache``; enhancers sharing a backend share its index."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(cache)
+        if index is None:
+            index = _INDEXES[cache] = MinHashIndex(max_entries=max_entries)
+        return index
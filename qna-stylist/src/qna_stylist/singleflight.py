@@ -0,0 +1,79 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import Future
+from threading import Lock
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class LeaderCancelled(RuntimeError):
+    """Raised to waiters when the caller running their flight was cancelled before it finished."""
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution.
+
+    Sync and async callers share one registry: whoever registers a key first runs
+    the work, everyone else blocks (or awaits) on its result or its exception.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[str, Future] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                self._coalesced += 1
+                return fut, False
+            fut = Future()
+            self._calls[key] = fut
+            self._leaders += 1
+            return fut, True
+
+    def _settle(self, key: str, fut: Future, result: object = None, err: BaseException | None = None) -> None:
+        # Unregister first, so a waiter that retries after a failure starts a new flight.
+        with self._lock:
+            if self._calls.get(key) is fut:
+                del self._calls[key]
+        if err is not None:
+            # Waiters should see a regular error, not the leader's cancellation.
+            fut.set_exception(err if isinstance(err, Exception) else LeaderCancelled("single-flight leader cancelled"))
+        else:
+            fut.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """Run ``fn`` or wait for the flight already running it; waiters give up after ``timeout`` (TimeoutError)."""
+        fut, leader = self._join(key)
+        if not leader:
+            return fut.result(timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, fut, err=e)
+            raise
+        self._settle(key, fut, result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        fut, leader = self._join(key)
+        if not leader:
+            # Shield so a cancelled waiter does not cancel the shared future.
+            return await asyncio.shield(asyncio.wrap_future(fut))
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._settle(key, fut, err=e)
+            raise
+        self._settle(key, fut, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,195 @@
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+import structlog
+
+from .cache import CacheBackend
+from .prompts import build_system_prompt, build_user_prompt
+from .types import StylistTone
+
+if TYPE_CHECKING:
+    from .settings import Settings
+
+log = structlog.get_logger(__name__)
+
+# Layout: magic | u32 header length | JSON header | index | values.
+# The index has one fixed-width record per entry, sorted by key: 32-byte sha256
+# digest (the raw make_cache_key), u64 value offset, u32 value length. Values are
+# zlib-compressed UTF-8, so a lookup is a binary search over the mapped index plus
+# one decompress; nothing is decoded until asked for.
+_MAGIC = b"QNASNAP1"
+_RECORD = struct.Struct("<32sQI")
+_LENGTH = struct.Struct("<I")
+
+
+def prompt_template_hash(cfg: "Settings") -> str:
+    """Hash of every system prompt variant plus the user prompt template for these settings."""
+    digest = hashlib.sha256()
+    for tone in StylistTone:
+        for serious in (False, True):
+            digest.update(build_system_prompt(tone, cfg.max_emojis, cfg.max_length_chars, serious).encode("utf-8"))
+    digest.update(build_user_prompt("{question}", "{answer}").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def snapshot_version(cfg: "Settings") -> Dict[str, str]:
+    return {"provider": cfg.provider, "model": cfg.active_model(), "prompt_hash": prompt_template_hash(cfg)}
+
+
+def write_snapshot(path: str, entries: Mapping[str, str], version: Mapping[str, str]) -> int:
+    """Write ``entries`` (cache key -> styled text) atomically; readers of the old file keep their mapping."""
+    records = sorted((bytes.fromhex(key), zlib.compress(text.encode("utf-8"), 6)) for key, text in entries.items())
+    header = json.dumps({**version, "count": len(records)}, sort_keys=True).encode("utf-8")
+    data_start = len(_MAGIC) + _LENGTH.size + len(header) + _RECORD.size * len(records)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as fh:
+        fh.write(_MAGIC + _LENGTH.pack(len(header)) + header)
+        offset = data_start
+        for digest, payload in records:
+            fh.write(_RECORD.pack(digest, offset, len(payload)))
+            offset += len(payload)
+        for _, payload in records:
+            fh.write(payload)
+    os.replace(tmp, path)
+    return len(records)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        start = len(_MAGIC) + _LENGTH.size
+        if size < start or self._map[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a stylist snapshot")
+        # Sizes are checked against the file before anything is unpacked, so a
+        # truncated or corrupt file is rejected here instead of failing lookups.
+        (header_len,) = _LENGTH.unpack_from(self._map, len(_MAGIC))
+        if start + header_len > size:
+            raise ValueError(f"{path} is truncated (header)")
+        header = json.loads(self._map[start:start + header_len])
+        count = header.get("count") if isinstance(header, dict) else None
+        if not isinstance(count, int) or count < 0:
+            raise ValueError(f"{path} has no valid entry count")
+        self.header: Dict[str, Any] = header
+        self._index = start + header_len
+        if self._index + count * _RECORD.size > size:
+            raise ValueError(f"{path} is truncated (index)")
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def version(self) -> Dict[str, str]:
+        return {k: self.header.get(k) for k in ("provider", "model", "prompt_hash")}
+
+    def _record(self, i: int) -> Tuple[bytes, int, int]:
+        return _RECORD.unpack_from(self._map, self._index + i * _RECORD.size)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            digest = bytes.fromhex(key)
+        except ValueError:
+            return None
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found, offset, length = self._record(mid)
+            if found == digest:
+                return zlib.decompress(self._map[offset:offset + length]).decode("utf-8")
+            if found < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for i in range(self._count):
+            digest, offset, length = self._record(i)
+            yield digest.hex(), zlib.decompress(self._map[offset:offset + length]).decode("utf-8")
+
+
+class SnapshotCache(CacheBackend):
+    """Read-through layer: misses in ``backend`` fall back to the snapshot and are promoted into it."""
+
+    def __init__(self, snapshot: Snapshot, backend: CacheBackend, ttl_s: int) -> None:
+        self.snapshot = snapshot
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self.snapshot_hits = 0
+
+    @property
+    def blocking(self) -> bool:  # type: ignore[override]
+        # Snapshot reads are mapped memory; only the backend can wait on I/O.
+        return self.backend.blocking
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.backend.get(key)
+        if value is None:
+            value = self._promote(key)
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        found = self.backend.get_many(keys)
+        for key in keys:
+            if key not in found:
+                value = self._promote(key)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def _promote(self, key: str) -> Optional[str]:
+        value = self.snapshot.get(key)
+        if value is not None:
+            self.snapshot_hits += 1
+            self.backend.set(key, value, self.ttl_s)
+        return value
+
+    def set(self, key: str, value: str, ttl_s: int) -> None:
+        self.backend.set(key, value, ttl_s)
+
+    def set_many(self, items: Mapping[str, str], ttl_s: int) -> None:
+        self.backend.set_many(items, ttl_s)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.backend.stats(), "snapshot_hits": self.snapshot_hits}
+
+
+_OPEN: Dict[Tuple[str, int], Snapshot] = {}
+_OPEN_LOCK = Lock()
+
+def load_snapshot(path: str, cfg: "Settings") -> Optional[Snapshot]:
+    """The snapshot at ``path`` if it matches the provider, model and prompts of ``cfg``; mapped once per file version."""
+    try:
+        with _OPEN_LOCK:
+            key = (os.path.realpath(path), os.stat(path).st_mtime_ns)
+            snapshot = _OPEN.get(key)
+            if snapshot is None:
+                # Forget older versions of this file; enhancers still holding one keep
+                # its mapping until they let go, then the mmap is closed with it.
+                for stale in [k for k in _OPEN if k[0] == key[0]]:
+                    del _OPEN[stale]
+                snapshot = _OPEN[key] = Snapshot(path)
+    except (OSError, ValueError, struct.error) as e:
+        log.warning("stylist.snapshot_unavailable", path=path, err=str(e))
+        return None
+    expected = snapshot_version(cfg)
+    if snapshot.version() != expected:
+        log.warning("stylist.snapshot_stale", path=path, snapshot=snapshot.version(), expected=expected)
+        return None
+    log.info("stylist.snapshot_loaded", path=path, entries=len(snapshot))
+    return snapshot
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional, TypedDict
+from typing import Dict, List, Optional, TypedDict
 
 class StylistTone(str, Enum):
     FRIENDLY = "friendly"
@@ -9,9 +9,36 @@ class StylistTone(str, Enum):
     HIGH_ENERGY = "high_energy"
     PROFESSIONAL = "professional"  # low-humor, crisp
 
-class StylistResult(TypedDict):
+class ProviderAttempt(TypedDict):
+    provider: str
+    round: int  # retry round, starting at 1
+    elapsed_ms: float
+    ok: bool
+    error: Optional[str]
+
+class RouteInfo(TypedDict):
+    provider: str
+    model: str
+    rule: str  # routing rule that matched, or "default"
+    input_tokens: int  # estimated question + answer tokens the rules saw
+
+class _StylistResultBase(TypedDict):
     styled_text: str
     used_tone: StylistTone
     safety_notes: Optional[str]
     elapsed_ms: int
     cache_hit: bool
+
+class StylistResult(_StylistResultBase, total=False):
+    # Present on cache hits: "exact", "normalized" or "similar"; similar hits also carry the similarity.
+    cache_match: str
+    similarity: float
+    # Present when Settings.routing_rules is set: where the request was routed and why.
+    route: RouteInfo
+    # Present when Settings.result_timings is on.
+    timings: Dict[str, float]  # "<stage>_ms" -> milliseconds spent in that stage, plus "total_ms"
+    attempts: List[ProviderAttempt]
+    provider: Optional[str]  # provider that produced the text, None for cache hits and fallbacks
+    retries: int
+    provider_fallback: bool  # text came from a provider other than Settings.provider
+    coalesced: bool  # shared an identical in-flight request's LLM call
@@ -0,0 +1,245 @@
+"""Local stand-in for the OpenAI and Ollama HTTP APIs used by the tests and benchmarks.
+
+Serves ``POST /v1/chat/completions`` (JSON or SSE streaming; the API OpenAI, the
+OpenAI SDK and CrewAI's Ollama adapter speak) plus Ollama's native ``/api/chat``
+and ``/api/generate``. Latency is drawn from a configurable distribution, a
+fraction of requests fail with HTTP 500, and usage counters let benchmarks
+report request and token volume.
+
+``benchmarks/fake_llm.py`` wraps this module in a command-line server.
+"""
+from __future__ import annotations
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+_ANSWER_RE = re.compile(r'Plain chatbot answer:\s*"""(.*?)"""', re.S)
+_ITEM_RE = re.compile(r"<<<ITEM (\d+)>>>(.*?)<<<END \1>>>", re.DOTALL)
+
+
+@dataclass
+class LatencyModel:
+    """Time to the full answer. ``lognormal`` (median + sigma), ``uniform`` (median +/- spread) or ``fixed``."""
+
+    kind: str = "lognormal"
+    median_ms: float = 200.0
+    sigma: float = 0.4
+    spread_ms: float = 50.0
+
+    def sample_s(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.median_ms
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.median_ms - self.spread_ms, self.median_ms + self.spread_ms)
+        else:
+            ms = self.median_ms * math.exp(rng.gauss(0.0, self.sigma))
+        return max(0.0, ms) / 1000
+
+
+@dataclass
+class FakeLLMStats:
+    requests: int = 0
+    errors: int = 0
+    streams: int = 0
+    streams_aborted: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas: int) -> None:
+        with self._lock:
+            for name, value in deltas.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "streams": self.streams,
+                "streams_aborted": self.streams_aborted,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def styled_reply(messages: List[Dict[str, Any]]) -> str:
+    """Deterministic 'rewrite' of the plain answer found in the user prompt (per item for packed prompts)."""
+    user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    user = user if isinstance(user, str) else json.dumps(user)
+    sections = _ITEM_RE.findall(user)
+    if sections:
+        return "\n".join(f"<<<ITEM {i}>>>\n{_rewrite(body)}\n<<<END {i}>>>" for i, body in sections)
+    return _rewrite(user)
+
+
+def _rewrite(prompt: str) -> str:
+    found = _ANSWER_RE.search(prompt)
+    answer = found.group(1).strip() if found else "Here is your answer."
+    return f"Good news ✨ {answer} You've got this!"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 drops connection bursts and adds SYN-retry delays.
+    request_queue_size = 1024
+
+
+class FakeLLMServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyModel] = None,
+        error_rate: float = 0.0,
+        stream_chunks: int = 16,
+        reply=styled_reply,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.stream_chunks = stream_chunks
+        self.reply = reply
+        self.stats = FakeLLMStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server._handle(self, body)
+
+        self._server = _Server((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._rng_lock:
+            return self.latency.sample_s(self._rng), self._rng.random() < self.error_rate
+
+    def _handle(self, handler: Any, body: Dict[str, Any]) -> None:
+        path = handler.path.split("?")[0]
+        if path not in ("/v1/chat/completions", "/api/chat", "/api/generate"):
+            handler._send_json(404, {"error": {"message": f"unknown path {path}"}})
+            return
+        messages = body.get("messages") or [{"role": "user", "content": body.get("prompt", "")}]
+        prompt_tokens = sum(_tokens(str(m.get("content") or "")) for m in messages)
+        delay_s, fail = self._draw()
+        self.stats.add(requests=1, prompt_tokens=prompt_tokens)
+        if fail:
+            time.sleep(delay_s / 4)
+            self.stats.add(errors=1)
+            handler._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+        text = self.reply(messages)
+        if body.get("stream"):
+            self._stream(handler, path, body, text, delay_s)
+            return
+        time.sleep(delay_s)
+        self.stats.add(completion_tokens=_tokens(text))
+        if path == "/api/generate":
+            handler._send_json(200, {"model": body.get("model"), "response": text, "done": True})
+        elif path == "/api/chat":
+            handler._send_json(200, {"model": body.get("model"), "message": {"role": "assistant", "content": text}, "done": True})
+        else:
+            handler._send_json(200, _completion(body, text, prompt_tokens))
+
+    def _stream(self, handler: Any, path: str, body: Dict[str, Any], text: str, delay_s: float) -> None:
+        # First token after ~1/4 of the latency, the rest spread over the remainder.
+        pieces = _split(text, self.stream_chunks)
+        gap = (delay_s * 0.75) / max(1, len(pieces))
+        openai_style = path == "/v1/chat/completions"
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream" if openai_style else "application/x-ndjson")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        self.stats.add(streams=1)
+        time.sleep(delay_s / 4)
+        sent = 0
+        try:
+            for piece in pieces:
+                if openai_style:
+                    chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "model": body.get("model"),
+                             "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                    handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                else:
+                    chunk = {"model": body.get("model"), "message": {"role": "assistant", "content": piece}, "done": False}
+                    handler.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+                handler.wfile.flush()
+                sent += 1
+                time.sleep(gap)
+            handler.wfile.write(b"data: [DONE]\n\n" if openai_style else b'{"done": true}\n')
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.stats.add(streams_aborted=1)
+        finally:
+            self.stats.add(completion_tokens=_tokens("".join(pieces[:sent])))
+            handler.close_connection = True
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def _completion(body: Dict[str, Any], text: str, prompt_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _tokens(text),
+            "total_tokens": prompt_tokens + _tokens(text),
+        },
+    }
+
+
+def _split(text: str, chunks: int) -> List[str]:
+    words = re.findall(r"\S+\s*", text)
+    size = max(1, math.ceil(len(words) / max(1, chunks)))
+    return ["".join(words[i:i + size]) for i in range(0, len(words), size)]
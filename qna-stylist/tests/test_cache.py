@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from qna_stylist import ResponseStyleEnhancer, StylistTone
+from qna_stylist.cache import KVServer, MemoryCache, RemoteKVCache, SQLiteCache, build_cache_backend, cache_get, cache_set
+from qna_stylist.settings import Settings
+
+
+def test_memory_cache_expires_and_evicts_lru():
+    cache = MemoryCache(max_items=2)
+    cache.set("a", "1", ttl_s=60)
+    cache.set("b", "2", ttl_s=60)
+    assert cache.get("a") == "1"
+    cache.set("c", "3", ttl_s=60)
+
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "c"]) == {"a": "1", "c": "3"}
+
+
+def test_memory_cache_byte_budget_compression_and_stats():
+    cache = MemoryCache(max_items=100, max_bytes=600, compress_min_bytes=64)
+    long_text = "Submit the receipt within 30 days. " * 20
+    cache.set("long", long_text, ttl_s=60)
+    assert cache.get("long") == long_text
+    assert cache.stats()["bytes"] < len(long_text)
+
+    for i in range(10):
+        cache.set(f"k{i}", "x" * 60, ttl_s=60)
+    cache.set("brief", "soon gone", ttl_s=1)
+    time.sleep(1.05)
+    cache.set("trigger", "y", ttl_s=60)
+    assert cache.get("brief") is None
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 600
+    assert stats["evictions"] > 0
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_sqlite_cache_persists_across_instances_and_respects_ttl(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = SQLiteCache(path)
+    writer.set_many({"k1": "v1", "k2": "v2"}, ttl_s=60)
+    writer.set("short", "gone", ttl_s=1)
+
+    reader = SQLiteCache(path)
+    assert reader.get_many(["k1", "k2", "missing"]) == {"k1": "v1", "k2": "v2"}
+    time.sleep(1.05)
+    assert reader.get("short") is None
+
+
+def test_enhancer_uses_remote_kv_backend(monkeypatch):
+    calls = {"count": 0}
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls["count"] += 1
+        return "Styled!"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+
+    with KVServer() as server:
+        cfg = Settings(provider="openai", openai_api_key="test-key", cache_backend="remote", cache_remote_url=server.url)
+        first = ResponseStyleEnhancer(cfg=cfg).enhance(question="Q?", plain_answer="A.", tone=StylistTone.WITTY)
+        # A second enhancer stands in for another worker process sharing the service.
+        second = ResponseStyleEnhancer(cfg=cfg).enhance(question="Q?", plain_answer="A.", tone=StylistTone.WITTY)
+        batch = RemoteKVCache(server.url).get_many(["nope"])
+
+    assert calls["count"] == 1
+    assert first["cache_hit"] is False and second["cache_hit"] is True
+    assert batch == {}
+
+
+def test_normalized_and_similar_lookups_report_match_type(monkeypatch):
+    calls = []
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls.append(answer)
+        return f"Styled: {answer}"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    cfg = Settings(provider="openai", openai_api_key="test-key", cache_similar_lookup=True, cache_similarity_threshold=0.7)
+    enhancer = ResponseStyleEnhancer(cfg=cfg, cache=MemoryCache())
+    answer = "Open Settings, choose Billing and press Cancel plan. Refunds take 5 days."
+
+    first = enhancer.enhance(question="How do I cancel?", plain_answer=answer, tone=StylistTone.FRIENDLY)
+    spaced = enhancer.enhance(question="How do I  cancel?", plain_answer=answer.replace(" ", "  "), tone=StylistTone.FRIENDLY)
+    similar = enhancer.enhance(question="How do I cancel?", plain_answer=answer.lower() + " Thanks!", tone=StylistTone.FRIENDLY)
+    other_facts = enhancer.enhance(question="How do I cancel?", plain_answer=answer.replace("5", "10"), tone=StylistTone.FRIENDLY)
+    other_tone = enhancer.enhance(question="How do I cancel?", plain_answer=answer + " Thanks!", tone=StylistTone.FUNNY)
+
+    assert first["cache_hit"] is False and "cache_match" not in first
+    assert spaced["cache_match"] == "normalized" and spaced["styled_text"] == first["styled_text"]
+    assert similar["cache_match"] == "similar" and 0.7 <= similar["similarity"] < 1
+    assert similar["styled_text"] == first["styled_text"]
+    assert other_facts["cache_hit"] is False and other_tone["cache_hit"] is False
+    assert len(calls) == 3
+
+
+def test_unreachable_cache_backend_degrades_to_misses(monkeypatch):
+    calls = {"count": 0}
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls["count"] += 1
+        return "Styled!"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    with KVServer() as server:
+        url = server.url  # nothing listens here once the server has stopped
+    cfg = Settings(provider="openai", openai_api_key="test-key", cache_backend="remote", cache_remote_url=url)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    first = enhancer.enhance(question="Q?", plain_answer="A.", tone=StylistTone.WITTY)
+    second = enhancer.enhance(question="Q?", plain_answer="A.", tone=StylistTone.WITTY)
+    batch = enhancer.enhance_many([("Q2?", "B."), ("Q3?", "C.")])
+
+    assert first["styled_text"] == second["styled_text"] == "Styled!"
+    assert first["safety_notes"] is None and second["cache_hit"] is False
+    assert [r["styled_text"] for r in batch] == ["Styled!", "Styled!"]
+    assert calls["count"] == 4
+
+
+def test_memory_backends_share_a_store_per_limits_without_resizing_the_default():
+    default = build_cache_backend(Settings())
+    small = build_cache_backend(Settings(cache_max_items=2))
+    assert build_cache_backend(Settings()) is default
+    assert build_cache_backend(Settings(cache_max_items=2)) is small and small is not default
+    assert default.max_items == 1024 and small.max_items == 2
+
+
+def test_async_paths_keep_blocking_backends_off_the_event_loop(monkeypatch):
+    class RecordingCache(MemoryCache):
+        blocking = True
+
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+        def set(self, key, value, ttl_s):
+            self.threads.add(threading.get_ident())
+            super().set(key, value, ttl_s)
+
+    async def fake_ainvoke(self, question, answer, tone, serious):
+        return "Styled!"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_ainvoke", fake_ainvoke)
+    cache = RecordingCache()
+    enhancer = ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="test-key"), cache=cache)
+
+    async def main():
+        first = await enhancer.aenhance(question="Q?", plain_answer="A.")
+        second = await enhancer.aenhance(question="Q?", plain_answer="A.")
+        return first, second, threading.get_ident()
+
+    first, second, loop_thread = asyncio.run(main())
+    assert first["cache_hit"] is False and second["cache_hit"] is True
+    assert cache.threads and loop_thread not in cache.threads
+
+
+def test_legacy_cache_set_does_not_resize_the_shared_store():
+    cache_set("legacy", "value", ttl_s=60, max_items=1)
+    assert cache_get("legacy") == "value"
+    assert build_cache_backend(Settings()).max_items == 1024
@@ -0,0 +1,94 @@
+import time
+from qna_stylist import ResponseStyleEnhancer, StylistTone
+from qna_stylist.cache import cache_clear
+from qna_stylist.health import HEALTH, ProviderHealth
+from qna_stylist.routing import choose_route
+from qna_stylist.settings import Settings
+
+
+def setup_function(_function):
+    cache_clear()
+    HEALTH.clear()
+
+
+def test_breaker_opens_probes_once_and_closes():
+    health = ProviderHealth(window=10, error_threshold=0.5, min_calls=4, cooldown_s=0.05)
+    for _ in range(4):
+        assert health.allow_request()
+        health.record_failure()
+    assert health.state == "open"
+    assert health.is_open() and not health.allow_request()
+
+    time.sleep(0.06)
+    assert not health.is_open() and health.state == "open"  # read-only: the probe slot is still free
+    assert health.allow_request()
+    assert health.is_open() and not health.allow_request()  # only one half-open probe at a time
+    health.record_success(0.1)
+    assert health.state == "closed"
+    assert health.allow_request()
+
+
+def test_tripped_primary_is_skipped(monkeypatch):
+    cfg = Settings(provider="openai", openai_api_key="test-key", breaker_min_calls=2, retry_attempts=1)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    calls = []
+
+    def fake_call(self, override, spec):
+        provider = override or self.cfg.provider
+        calls.append(provider)
+        if provider == "openai":
+            raise RuntimeError("rate limited")
+        return "From ollama"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", fake_call)
+    for i in range(4):
+        result = enhancer.enhance(question=f"Q{i}?", plain_answer="A.", tone=StylistTone.WITTY)
+        assert result["styled_text"] == "From ollama"
+
+    assert calls == ["openai", "ollama", "openai", "ollama", "ollama", "ollama"]
+    assert enhancer.provider_health()["openai"]["state"] == "open"
+
+
+def test_hedged_request_takes_faster_fallback(monkeypatch):
+    cfg = Settings(provider="openai", openai_api_key="test-key", hedge_enabled=True, hedge_default_delay_s=0.05)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    def fake_call(self, override, spec):
+        if (override or self.cfg.provider) == "openai":
+            time.sleep(0.5)
+            return "From openai"
+        time.sleep(0.02)
+        return "From ollama"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", fake_call)
+    t0 = time.perf_counter()
+    result = enhancer.enhance(question="Q?", plain_answer="A.", tone=StylistTone.WITTY)
+
+    assert result["styled_text"] == "From ollama"
+    assert time.perf_counter() - t0 < 0.3
+
+
+def test_registry_honours_each_breaker_configuration():
+    default = Settings(provider="openai", openai_api_key="test-key")
+    strict = Settings(provider="openai", openai_api_key="test-key", breaker_min_calls=1, breaker_cooldown_s=0.01)
+    HEALTH.get("openai", default).record_failure()
+
+    health = HEALTH.get("openai", strict)
+    assert health.min_calls == 1 and health.cooldown_s == 0.01
+    health.record_failure()
+    assert ResponseStyleEnhancer(cfg=strict).provider_health()["openai"]["state"] == "open"
+    assert ResponseStyleEnhancer(cfg=default).provider_health()["openai"]["state"] == "closed"
+
+
+def test_routing_returns_to_a_tripped_provider_after_its_cooldown():
+    rules = [{"name": "local", "provider": "ollama"}]
+    cfg = Settings(provider="openai", openai_api_key="test-key", routing_rules=rules, breaker_min_calls=1, breaker_cooldown_s=0.05)
+    HEALTH.get("ollama", cfg).record_failure()
+
+    def rule():
+        return choose_route(cfg, HEALTH, "How do I reset?", "Click reset.", StylistTone.FRIENDLY, False).rule
+
+    assert rule() == "default"
+    time.sleep(0.06)
+    assert rule() == "local"
+    assert HEALTH.get("ollama", cfg).allow_request()  # routing left the probe for the call itself
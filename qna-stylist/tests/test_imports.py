@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+
+# Generous ceilings: a regression that pulls CrewAI back in costs several seconds and >100 MiB.
+IMPORT_BUDGET_S = 2.0
+RSS_BUDGET_MIB = 120
+
+_PROBE = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import qna_stylist
+imported_s = time.perf_counter() - t0
+from qna_stylist.settings import Settings
+enhancer = qna_stylist.ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="test-key"))
+key = enhancer._prepare("How do I reset?", "Click reset.", qna_stylist.StylistTone.WITTY).cache_key
+enhancer.cache.set(key, "Styled!", 60)
+result = enhancer.enhance(question="How do I reset?", plain_answer="Click reset.")
+print(json.dumps({
+    "import_s": imported_s,
+    "cache_hit": result["cache_hit"],
+    "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [m for m in ("crewai", "litellm", "openai") if m in sys.modules],
+}))
+"""
+
+
+def test_import_and_cache_hit_do_not_load_llm_stacks():
+    out = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True).stdout
+    probe = json.loads(out.strip().splitlines()[-1])
+
+    assert probe["cache_hit"] is True
+    assert probe["loaded"] == []
+    assert probe["import_s"] < IMPORT_BUDGET_S
+    assert probe["rss_mib"] < RSS_BUDGET_MIB
+
+
+def test_package_import_time_stays_small():
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import qna_stylist"], capture_output=True, text=True, check=True
+    ).stderr
+    modules = {line.rsplit("|", 1)[-1].strip() for line in err.splitlines() if line.startswith("import time:")}
+
+    assert "qna_stylist" in modules
+    assert not {"crewai", "litellm", "openai"} & modules
@@ -0,0 +1,95 @@
+from collections import Counter
+from contextlib import contextmanager
+from qna_stylist import ResponseStyleEnhancer, StylistTone
+from qna_stylist import agents, metrics, pipeline
+from qna_stylist.cache import cache_clear
+from qna_stylist.health import HEALTH
+from qna_stylist.settings import Settings
+
+
+class RecordingSink(metrics.MetricsSink):
+    enabled = True
+
+    def __init__(self):
+        self.counters = Counter()
+        self.observed = []
+        self.spans = []
+
+    def increment(self, name, value=1.0, **labels):
+        self.counters[(name, tuple(sorted(labels.items())))] += value
+
+    def observe(self, name, seconds, **labels):
+        self.observed.append((name, labels, seconds))
+
+    @contextmanager
+    def span(self, name, **attrs):
+        self.spans.append(name)
+        yield
+
+
+def setup_function(_function):
+    cache_clear()
+    HEALTH.clear()
+    agents.AGENT_POOL.clear()
+    metrics.set_metrics_sink(None)
+
+
+def teardown_function(_function):
+    metrics.set_metrics_sink(None)
+
+
+def test_result_timings_break_down_stages_and_attempts(monkeypatch):
+    cfg = Settings(
+        provider="openai",
+        openai_api_key="test-key",
+        execution_mode="direct",
+        result_timings=True,
+        retry_min_wait_s=0.01,
+        retry_max_wait_s=0.01,
+    )
+    sink = RecordingSink()
+    enhancer = ResponseStyleEnhancer(cfg=cfg, metrics=sink)
+    calls = []
+
+    def fake_run_direct(llm, system_prompt, user_prompt):
+        calls.append(type(llm).__name__)
+        if len(calls) < 3:
+            raise RuntimeError("overloaded")
+        return "Styled ✨"
+
+    monkeypatch.setattr(pipeline, "run_direct", fake_run_direct)
+    result = enhancer.enhance(question="How do I reset?", plain_answer="Click reset.", tone=StylistTone.WITTY)
+
+    assert result["styled_text"] == "Styled ✨"
+    assert result["provider"] == "openai"
+    assert result["retries"] == 1
+    assert result["provider_fallback"] is False
+    assert [(a["provider"], a["round"], a["ok"]) for a in result["attempts"]] == [
+        ("openai", 1, False), ("ollama", 1, False), ("openai", 2, True),
+    ]
+    timings = result["timings"]
+    for stage in ("analyze_ms", "cache_ms", "prompt_ms", "agent_ms", "provider_ms", "backoff_ms", "postprocess_ms"):
+        assert timings[stage] >= 0
+    assert timings["total_ms"] >= sum(v for k, v in timings.items() if k != "total_ms") * 0.99
+
+    hit = enhancer.enhance(question="How do I reset?", plain_answer="Click reset.", tone=StylistTone.WITTY)
+    assert hit["cache_hit"] is True and hit["attempts"] == [] and hit["provider"] is None
+
+    assert sink.counters[("requests_total", (("outcome", "styled"),))] == 1
+    assert sink.counters[("requests_total", (("outcome", "hit"),))] == 1
+    assert sink.counters[("provider_attempts_total", (("outcome", "error"), ("provider", "openai")))] == 1
+    assert sink.counters[("retries_total", ())] == 1
+    assert sink.counters[("agent_pool_builds_total", (("kind", "llm"), ("provider", "openai")))] == 1
+    assert sink.counters[("cache_events_total", (("backend", "memory"), ("event", "hit")))] >= 1
+    assert sink.spans.count("stylist.provider_call") == 3
+    assert {labels["stage"] for name, labels, _ in sink.observed if name == "stage_seconds"} >= {"provider", "backoff"}
+
+
+def test_timings_are_opt_in_and_null_sink_is_default(monkeypatch):
+    enhancer = ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="test-key"))
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", lambda self, q, a, tone, serious: "Styled!")
+
+    result = enhancer.enhance(question="Q?", plain_answer="A.", tone=StylistTone.WITTY)
+
+    assert enhancer.metrics is metrics.NULL_SINK
+    assert set(result) == {"styled_text", "used_tone", "safety_notes", "elapsed_ms", "cache_hit"}
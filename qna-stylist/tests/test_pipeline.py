@@ -1,12 +1,18 @@
+import asyncio
 import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+import tenacity
 from qna_stylist import ResponseStyleEnhancer, StylistTone
 from qna_stylist.settings import Settings
 from qna_stylist.cache import cache_clear
-from qna_stylist import agents
+from qna_stylist import agents, pipeline
+from fake_llm_server import FakeLLMServer, LatencyModel
 
 
 def setup_function(_function):
     cache_clear()
+    agents.AGENT_POOL.clear()
 
 
 def test_cache_hit_skips_llm(monkeypatch):
@@ -61,3 +67,558 @@ def test_build_llm_applies_generation_params(monkeypatch):
     assert captured["temperature"] == 0.42
     assert captured["max_tokens"] == 321
     assert captured["top_p"] == 1.0
+
+
+def test_aenhance_caches_and_bounds_concurrency(monkeypatch):
+    cfg = Settings(provider="openai", openai_api_key="test-key", async_max_concurrency=2)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    state = {"active": 0, "peak": 0, "count": 0}
+
+    async def fake_ainvoke(self, question, answer, tone, serious):
+        state["count"] += 1
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.02)
+        state["active"] -= 1
+        return f"Styled {question}"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_ainvoke", fake_ainvoke)
+
+    async def run():
+        first = await asyncio.gather(*[
+            enhancer.aenhance(question=f"Q{i}?", plain_answer="A.", tone=StylistTone.WITTY)
+            for i in range(6)
+        ])
+        again = await enhancer.aenhance(question="Q0?", plain_answer="A.", tone=StylistTone.WITTY)
+        return first, again
+
+    first, again = asyncio.run(run())
+
+    assert [r["styled_text"] for r in first] == [f"Styled Q{i}?" for i in range(6)]
+    assert state["peak"] == 2
+    assert state["count"] == 6
+    assert again["cache_hit"] is True
+
+
+def test_enhance_many_parallel_dedupes_and_isolates_failures(monkeypatch):
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    calls = []
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls.append(question)
+        time.sleep(0.1)
+        if question == "Broken?":
+            raise RuntimeError("provider down")
+        return f"Styled {question}"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    items = [("A?", "a."), ("B?", "b."), ("A?", "a."), ("Broken?", "original."), ("C?", "c.")]
+
+    t0 = time.perf_counter()
+    results = enhancer.enhance_many(items, tone=StylistTone.FUNNY, max_workers=4)
+    elapsed = time.perf_counter() - t0
+
+    assert sorted(calls) == ["A?", "B?", "Broken?", "C?"]
+    assert elapsed < 0.3
+    assert [r["styled_text"] for r in results] == ["Styled A?", "Styled B?", "Styled A?", "original.", "Styled C?"]
+    assert "Fallback" in results[3]["safety_notes"]
+    assert enhancer.enhance_many([("B?", "b.")], tone=StylistTone.FUNNY)[0]["cache_hit"] is True
+
+
+def test_concurrent_identical_enhances_coalesce(monkeypatch):
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    calls = {"count": 0}
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls["count"] += 1
+        time.sleep(0.1)
+        return "Styled!"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    before = enhancer.coalescing_stats()["coalesced"]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(
+            lambda _: enhancer.enhance(question="Hot?", plain_answer="Yes.", tone=StylistTone.WITTY),
+            range(5),
+        ))
+
+    assert calls["count"] == 1
+    assert all(r["styled_text"] == "Styled!" for r in results)
+    assert enhancer.coalescing_stats()["coalesced"] - before == 4
+
+
+def test_coalesced_waiters_share_leader_error(monkeypatch):
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    calls = {"count": 0}
+
+    async def failing_ainvoke(self, question, answer, tone, serious):
+        calls["count"] += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_ainvoke", failing_ainvoke)
+
+    async def run():
+        return await asyncio.gather(*[
+            enhancer.aenhance(question="Hot?", plain_answer="Yes.", tone=StylistTone.WITTY)
+            for _ in range(3)
+        ])
+
+    results = asyncio.run(run())
+
+    assert calls["count"] == 1
+    assert all(r["styled_text"] == "Yes." for r in results)
+    assert all("Fallback" in r["safety_notes"] for r in results)
+
+
+def test_coalesced_waiter_takes_over_when_leader_runs_out_of_time(monkeypatch):
+    calls = {"count": 0}
+
+    async def slow_ainvoke(self, question, answer, tone, serious):
+        calls["count"] += 1
+        await asyncio.sleep(0.15)
+        return "Styled!"
+
+    def slow_invoke(self, question, answer, tone, serious):
+        calls["count"] += 1
+        time.sleep(0.15)
+        pipeline._TRACE.get().check()  # as the retry loop would before its next attempt
+        return "Styled!"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_ainvoke", slow_ainvoke)
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", slow_invoke)
+    enhancer = ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="test-key"))
+
+    async def run():
+        leader = asyncio.ensure_future(enhancer.aenhance(question="Hot?", plain_answer="Yes.", deadline_ms=50))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(leader, enhancer.aenhance(question="Hot?", plain_answer="Yes."))
+
+    leader, waiter = asyncio.run(run())
+    assert "deadline exceeded" in leader["safety_notes"]
+    assert waiter["styled_text"] == "Styled!" and calls["count"] == 2
+
+    # The same holds for sync callers coalescing on a leader with a tighter budget.
+    calls["count"] = 0
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(enhancer.enhance, question="Sync?", plain_answer="Yes.", deadline_ms=50)
+        time.sleep(0.01)
+        waiter = pool.submit(enhancer.enhance, question="Sync?", plain_answer="Yes.", deadline_ms=1000)
+        leader, waiter = leader.result(), waiter.result()
+    assert "deadline exceeded" in leader["safety_notes"]
+    assert waiter["styled_text"] == "Styled!" and calls["count"] == 2
+
+
+def test_agent_pool_reuses_clients_until_settings_change(monkeypatch):
+    built = []
+
+    class DummyLLM:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+    monkeypatch.setattr(agents, "OpenAIChat", DummyLLM)
+    monkeypatch.setattr(agents, "_new_agent", lambda system_prompt, llm: object())
+    pool = agents.AgentPool()
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+
+    with pool.agent("prompt", cfg, StylistTone.WITTY, False) as first:
+        pass
+    with pool.agent("prompt", cfg, StylistTone.WITTY, False) as second:
+        with pool.agent("prompt", cfg, StylistTone.WITTY, False) as concurrent:
+            pass
+
+    assert first is second
+    assert concurrent is not second
+    assert len(built) == 1
+
+    cfg.temperature = 0.1
+    with pool.agent("prompt", cfg, StylistTone.WITTY, False) as rebuilt:
+        pass
+
+    assert rebuilt is not first
+    assert len(built) == 2
+    assert pool.stats()["agents_reused"] == 1
+
+
+def test_direct_mode_sends_prompts_without_crew(monkeypatch):
+    seen = []
+
+    class DummyLLM:
+        def __init__(self, **kwargs):
+            pass
+
+        def call(self, messages):
+            seen.append(messages)
+            return "  Styled directly!  "
+
+    def no_crew(agent, task):
+        raise AssertionError("crew path used in direct mode")
+
+    monkeypatch.setattr(agents, "OpenAIChat", DummyLLM)
+    monkeypatch.setattr(pipeline, "run_crew", no_crew)
+    cfg = Settings(provider="openai", openai_api_key="test-key", execution_mode="direct")
+
+    result = ResponseStyleEnhancer(cfg=cfg).enhance(
+        question="How do I reset?",
+        plain_answer="Follow the reset steps.",
+        tone=StylistTone.FRIENDLY,
+    )
+
+    assert result["styled_text"] == "Styled directly!"
+    assert [m["role"] for m in seen[0]] == ["system", "user"]
+    assert "Follow the reset steps." in seen[0][1]["content"]
+
+
+class _FakeStream:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for token in self.tokens:
+            self.consumed += 1
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=token))])
+
+    def close(self):
+        self.closed = True
+
+
+def test_enhance_stream_cuts_off_at_limit_and_caches(monkeypatch):
+    stream = _FakeStream(["  Hey 😀", "😀😀", " there, ", "reset ", "via settings ", "and more ", "tokens"] * 3)
+    client = types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=lambda **params: stream))
+    )
+    monkeypatch.setattr(agents, "build_stream_client", lambda cfg, override=None, asynchronous=False: client)
+    cfg = Settings(provider="openai", openai_api_key="test-key", max_length_chars=30, max_emojis=2)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    chunks = list(enhancer.enhance_stream(question="Reset?", plain_answer="Use settings.", tone=StylistTone.WITTY))
+    text = "".join(chunks)
+
+    assert len(chunks) > 1
+    assert text == "Hey 😀😀 there, reset via setti…"
+    assert stream.closed and stream.consumed < len(stream.tokens)
+    again = list(enhancer.enhance_stream(question="Reset?", plain_answer="Use settings.", tone=StylistTone.WITTY))
+    assert again == [text]
+
+
+class _AsyncFakeStream(_FakeStream):
+    async def __aiter__(self):
+        for chunk in _FakeStream.__iter__(self):
+            await asyncio.sleep(0)
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def test_aenhance_stream_cuts_off_closes_early_and_caches(monkeypatch):
+    tokens = ["  Hey 😀", "😀😀", " there, ", "reset ", "via settings ", "and more ", "tokens"] * 3
+    streams = []
+
+    async def create(**params):
+        streams.append(_AsyncFakeStream(tokens))
+        return streams[-1]
+
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    monkeypatch.setattr(agents, "build_stream_client", lambda cfg, override=None, asynchronous=False: client)
+    cfg = Settings(provider="openai", openai_api_key="test-key", max_length_chars=30, max_emojis=2)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    async def collect(question):
+        return [chunk async for chunk in enhancer.aenhance_stream(question=question, plain_answer="Use settings.")]
+
+    async def abandon(question):
+        # The caller stops after the first chunk; the provider stream must be closed, and nothing cached.
+        chunks = enhancer.aenhance_stream(question=question, plain_answer="Use settings.")
+        first = await chunks.__anext__()
+        await chunks.aclose()
+        return first
+
+    chunks = asyncio.run(collect("Reset?"))
+    text = "".join(chunks)
+    assert len(chunks) > 1
+    assert text == "Hey 😀😀 there, reset via setti…"
+    assert streams[0].closed and streams[0].consumed < len(tokens)
+    assert asyncio.run(collect("Reset?")) == [text] and len(streams) == 1
+
+    assert text.startswith(asyncio.run(abandon("Other?")))
+    assert streams[1].closed and streams[1].consumed < len(tokens)
+    assert len(asyncio.run(collect("Other?"))) > 1 and len(streams) == 3
+
+
+def test_direct_mode_against_fake_servers_falls_back_to_ollama():
+    fast = LatencyModel("fixed", median_ms=1)
+    with FakeLLMServer(latency=fast, error_rate=1.0) as openai, FakeLLMServer(latency=fast) as ollama:
+        cfg = Settings(
+            provider="openai",
+            openai_api_key="test-key",
+            openai_base_url=f"{openai.url}/v1",
+            ollama_base_url=f"{ollama.url}/v1",
+            execution_mode="direct",
+            retry_attempts=1,
+        )
+        result = ResponseStyleEnhancer(cfg=cfg).enhance(
+            question="How do I reset?",
+            plain_answer="Click reset.",
+            tone=StylistTone.FRIENDLY,
+        )
+
+        assert result["styled_text"] == "Good news ✨ Click reset. You've got this!"
+        assert openai.stats.errors >= 1
+        assert ollama.stats.requests == 1
+
+
+def test_enhance_tones_styles_variants_in_one_call_and_caches_each(monkeypatch):
+    seen = []
+
+    class DummyLLM:
+        def __init__(self, **kwargs):
+            pass
+
+        def call(self, messages):
+            seen.append(messages[0]["content"])
+            if "JSON object" in messages[0]["content"]:
+                # genz left out: it gets styled on its own.
+                return '```json\n{"friendly": "Hey! Open settings 😊😊😊😊😊", "witty": "Settings. Obviously.", "genz": ""}\n```'
+            return "open settings fr"
+
+    monkeypatch.setattr(agents, "OpenAIChat", DummyLLM)
+    cfg = Settings(provider="openai", openai_api_key="test-key", execution_mode="direct", max_emojis=1)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    tones = [StylistTone.FRIENDLY, StylistTone.WITTY, StylistTone.GENZ]
+
+    results = enhancer.enhance_tones(question="How do I reset?", plain_answer="Open settings.", tones=tones)
+    switched = enhancer.enhance(question="How do I reset?", plain_answer="Open settings.", tone=StylistTone.WITTY)
+
+    assert len(seen) == 2 and '"friendly", "witty", "genz"' in seen[0]
+    assert results[StylistTone.FRIENDLY]["styled_text"] == "Hey! Open settings 😊"
+    assert results[StylistTone.WITTY]["styled_text"] == "Settings. Obviously."
+    assert results[StylistTone.GENZ]["styled_text"] == "open settings fr"
+    assert switched["cache_hit"] is True and switched["styled_text"] == "Settings. Obviously."
+
+
+def test_packed_mode_shares_one_call_and_retries_missing_items(monkeypatch):
+    prompts = []
+
+    malformed = {"on": False}
+
+    def reply(messages):
+        prompts.append(messages[1]["content"])
+        if "<<<ITEM 0>>>" not in messages[1]["content"]:
+            return "Styled alone"
+        if malformed["on"]:
+            return "Sorry, I can only style one answer at a time."
+        # Item 1 is left out, so it alone gets a follow-up call.
+        return "<<<ITEM 0>>>\nStyled A\n<<<END 0>>>\n<<<ITEM 2>>>\nStyled C\n<<<END 2>>>"
+
+    class DummyLLM:
+        def __init__(self, **kwargs):
+            pass
+
+        def call(self, messages):
+            return reply(messages)
+
+        async def acall(self, messages):
+            return reply(messages)
+
+    monkeypatch.setattr(agents, "OpenAIChat", DummyLLM)
+    cfg = Settings(provider="openai", openai_api_key="test-key", execution_mode="direct", pack_max_items=4, pack_max_wait_ms=50)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    items = [("Q1?", "A."), ("Q2?", "B."), ("Q3?", "C.")]
+
+    results = enhancer.enhance_many(items, tone=StylistTone.FRIENDLY)
+
+    assert [r["styled_text"] for r in results] == ["Styled A", "Styled alone", "Styled C"]
+    assert len(prompts) == 2 and "Q2?" in prompts[1]
+    stats = enhancer.packing_stats()
+    assert stats["packs"] == 1 and stats["items"] == 3 and stats["retried"] == 1 and stats["tokens_saved"] > 0
+
+    async def main():
+        return await asyncio.gather(*(
+            enhancer.aenhance(question=q, plain_answer=a, tone=StylistTone.WITTY) for q, a in items
+        ))
+
+    prompts.clear()
+    async_results = asyncio.run(main())
+
+    assert [r["styled_text"] for r in async_results] == ["Styled A", "Styled alone", "Styled C"]
+    assert len(prompts) == 2 and enhancer.packing_stats()["packs"] == 2
+
+    # An unparseable packed reply is not retried; every item is styled alone straight away.
+    malformed["on"] = True
+    prompts.clear()
+    fallback = enhancer.enhance_many(items, tone=StylistTone.FUNNY)
+    assert [r["styled_text"] for r in fallback] == ["Styled alone"] * 3
+    assert len(prompts) == 4
+
+
+def test_deadline_bounds_attempts_backoff_and_cancels_async_calls(monkeypatch):
+    cancelled = []
+
+    def slow_call(self, override, spec):
+        time.sleep(0.5)
+        return "too late"
+
+    async def slow_acall(self, override, spec):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(override)
+            raise
+        return "too late"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", slow_call)
+    monkeypatch.setattr(ResponseStyleEnhancer, "_acall_provider", slow_acall)
+    cfg = Settings(provider="openai", openai_api_key="test-key", deadline_ms=150)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    t0 = time.perf_counter()
+    result = enhancer.enhance(question="Q1?", plain_answer="Plain.", tone=StylistTone.FRIENDLY)
+    sync_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    aresult = asyncio.run(enhancer.aenhance(question="Q2?", plain_answer="Plain.", deadline_ms=100))
+    async_s = time.perf_counter() - t0
+
+    assert result["styled_text"] == "Plain." and result["safety_notes"] == "Fallback to original: deadline exceeded."
+    assert sync_s < 0.4
+    assert aresult["styled_text"] == "Plain." and "deadline exceeded" in aresult["safety_notes"]
+    assert async_s < 0.4 and cancelled == [None]
+
+    def failing_call(self, override, spec):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", failing_call)
+    # Backoff is drawn at random from [0, 5 s]; pin the draw to its top so the test is deterministic.
+    monkeypatch.setattr(tenacity.wait.random, "uniform", lambda low, high: high)
+    slow_backoff = Settings(provider="openai", openai_api_key="test-key", retry_min_wait_s=5, retry_max_wait_s=5)
+    t0 = time.perf_counter()
+    failed = ResponseStyleEnhancer(cfg=slow_backoff).enhance(question="Q3?", plain_answer="Plain.", deadline_ms=300)
+
+    # The first backoff (5 s) cannot fit in the budget, so there is no sleep at all.
+    assert time.perf_counter() - t0 < 0.25
+    assert failed["safety_notes"] == "Fallback to original: deadline exceeded."
+
+
+def test_deadline_cancels_sync_calls_still_waiting_for_a_thread(monkeypatch):
+    started = []
+
+    def slow_call(self, override, spec):
+        started.append(spec.user_prompt)
+        time.sleep(0.2)
+        return "too late"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", slow_call)
+    cfg = Settings(provider="openai", openai_api_key="test-key", retry_attempts=1, deadline_max_workers=1)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(
+            lambda q: enhancer.enhance(question=q, plain_answer="Plain.", deadline_ms=80), ["Q1?", "Q2?"]
+        ))
+    time.sleep(0.3)
+
+    assert all(r["safety_notes"] == "Fallback to original: deadline exceeded." for r in results)
+    # The second call never got the pool's only thread before its deadline, so it never ran.
+    assert len(started) == 1
+
+
+def test_packed_callers_keep_their_own_deadlines(monkeypatch):
+    async def slow_packed_acall(self, override, spec):
+        await asyncio.sleep(0.2)
+        return "<<<ITEM 0>>>\nStyled A\n<<<END 0>>>\n<<<ITEM 1>>>\nStyled B\n<<<END 1>>>"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_acall_provider", slow_packed_acall)
+    cfg = Settings(provider="openai", openai_api_key="test-key", pack_max_items=2, pack_max_wait_ms=50)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    async def main():
+        # The tight caller is first in the pack; its budget must not cut the call short for the other.
+        return await asyncio.gather(
+            enhancer.aenhance(question="Q1?", plain_answer="A.", deadline_ms=100),
+            enhancer.aenhance(question="Q2?", plain_answer="B."),
+        )
+
+    tight, loose = asyncio.run(main())
+    assert tight["styled_text"] == "A." and "deadline exceeded" in tight["safety_notes"]
+    assert loose["styled_text"] == "Styled B" and loose["cache_hit"] is False
+
+
+def test_routing_rules_pick_provider_per_request_and_keep_cache_keys_model_aware(monkeypatch):
+    from qna_stylist.health import HEALTH
+
+    HEALTH.clear()
+
+    def fake_call(self, override, spec):
+        return f"{override or self.cfg.provider} styled"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", fake_call)
+    rules = [
+        {"name": "short-professional", "provider": "ollama", "tones": ["professional"], "max_input_tokens": 40, "max_p95_ms": 300},
+        {"provider": "ollama", "reduced_humor": True},
+    ]
+    cfg = Settings(provider="openai", openai_api_key="test-key", routing_rules=rules, result_timings=True)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+    short = ("How do I reset?", "Click reset.")
+    long = ("How do I reset?", "Open settings, pick the device, and hold the reset button for ten seconds. " * 4)
+
+    local = enhancer.enhance(question=short[0], plain_answer=short[1], tone=StylistTone.PROFESSIONAL)
+    remote = enhancer.enhance(question=long[0], plain_answer=long[1], tone=StylistTone.PROFESSIONAL)
+    serious = enhancer.enhance(question="Was there a security incident?", plain_answer="Yes. " + long[1], tone=StylistTone.FUNNY)
+
+    assert local["styled_text"] == "ollama styled" and local["provider_fallback"] is False
+    assert local["route"] == {"provider": "ollama", "model": "phi3:medium", "rule": "short-professional", "input_tokens": 7}
+    assert remote["styled_text"] == "openai styled" and remote["route"]["rule"] == "default"
+    assert serious["route"]["rule"] == "rules[1]" and serious["used_tone"] == StylistTone.PROFESSIONAL
+
+    # The ollama text is cached under an ollama key: an enhancer without rules does not reuse it.
+    plain = ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="test-key"))
+    unrouted = plain.enhance(question=short[0], plain_answer=short[1], tone=StylistTone.PROFESSIONAL)
+    assert unrouted["cache_hit"] is False and unrouted["styled_text"] == "openai styled" and "route" not in unrouted
+
+    # A slow local provider drops out of the latency-bounded rule; the short answer then
+    # goes to OpenAI and finds the text the unrouted enhancer cached.
+    for _ in range(10):
+        HEALTH.get("ollama", cfg).record_success(0.5)
+    batch = enhancer.enhance_many([("Q2?", "Click it."), short], tone=StylistTone.PROFESSIONAL)
+    assert [r["route"]["rule"] for r in batch] == ["default", "default"]
+    assert batch[0]["styled_text"] == "openai styled" and batch[1]["cache_hit"] is True
+    HEALTH.clear()
+
+
+def test_crew_task_carries_the_prompt_and_ollama_gets_its_base_url(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(agents, "Task", lambda **kwargs: captured.setdefault("task", kwargs), raising=False)
+    monkeypatch.setattr(agents, "LLM", lambda **kwargs: captured.setdefault("llm", kwargs), raising=False)
+
+    # Task has no input field, so the prompt must be part of the description.
+    task = agents.create_stylist_task(object(), 'Plain chatbot answer: """Click reset."""')
+    assert task["description"].endswith('Plain chatbot answer: """Click reset."""')
+    assert "input" not in task
+
+    # Newer CrewAI reads base_url for Ollama; older releases read api_base.
+    llm = agents.build_llm(Settings(provider="ollama", ollama_base_url="http://ollama:11434/v1/"))
+    assert llm["api_base"] == "http://ollama:11434"
+    assert llm["base_url"] == "http://ollama:11434/v1"
+
+
+def test_style_uncached_leaves_the_cache_alone(monkeypatch):
+    priorities = []
+
+    def fake_invoke(self, question, answer, tone, serious):
+        priorities.append(pipeline._TRACE.get().priority)
+        return "Styled 😀😀😀😀"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    enhancer = ResponseStyleEnhancer(cfg=Settings(provider="openai", openai_api_key="test-key", max_emojis=1))
+
+    assert enhancer.style_uncached("How do I reset?", "Click reset.", StylistTone.FRIENDLY) == "Styled 😀"
+    assert priorities == ["bulk"]
+    assert enhancer.cache.get(enhancer.cache_key("How do I reset?", "Click reset.", StylistTone.FRIENDLY)) is None
+    result = enhancer.enhance(question="How do I reset?", plain_answer="Click reset.", tone=StylistTone.FRIENDLY)
+    assert result["cache_hit"] is False and priorities == ["bulk", "interactive"]
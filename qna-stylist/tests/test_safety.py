@@ -0,0 +1,70 @@
+from qna_stylist import safety
+from qna_stylist.safety import (
+    StreamingPostProcessor,
+    analyze_topic,
+    analyze_topics,
+    clamp_length,
+    match_topic,
+    strip_excess_emojis,
+    topic_matcher,
+)
+from qna_stylist.settings import Settings
+
+
+def test_match_topic_reports_keywords_in_one_pass():
+    cfg = Settings(
+        reduce_humor_keywords=["breach", "Data Breach", "outage"] + [f"term {i}" for i in range(2000)],
+        safe_topics_blocklist=["hate crime"],
+    )
+
+    match = match_topic("Was there a DATA BREACH?", "No outage; report any hate crime.", cfg)
+
+    assert match.serious
+    assert match.keywords == ["data breach", "breach", "outage"]
+    assert match.blocklist == ["hate crime"]
+    assert match.sensitive == ["hate crime"]
+    assert not match_topic("How do I reset?", "Use settings.", cfg).serious
+
+
+def test_analyze_topics_matches_single_calls():
+    cfg = Settings()
+    pairs = [
+        ("How do I reset?", "Use settings."),
+        ("What about the earthquake?", "Offices are closed."),
+        ("Self-harm resources?", "Call the helpline."),
+    ]
+
+    assert analyze_topics(pairs, cfg) == [analyze_topic(q, a, cfg) for q, a in pairs]
+    assert [reduce for reduce, _ in analyze_topics(pairs, cfg)] == [False, True, True]
+    assert analyze_topics(pairs, Settings(enable_safety_filters=False)) == [(False, None)] * 3
+
+
+def test_prebuilt_matcher_skips_the_lookup(monkeypatch):
+    cfg = Settings()
+    matcher = topic_matcher(cfg)
+
+    def lookup(_cfg):
+        raise AssertionError("matcher looked up again")
+
+    monkeypatch.setattr(safety, "topic_matcher", lookup)
+    assert analyze_topic("Earthquake?", "Stay safe.", cfg, matcher)[0]
+    assert analyze_topics([("Earthquake?", "Stay safe.")], cfg, matcher) == [analyze_topic("Earthquake?", "Stay safe.", cfg, matcher)]
+
+
+def test_strip_excess_emojis_counts_clusters_once():
+    text = "Ship it 👩‍💻, thumbs 👍🏽, flag 🇺🇸, love ❤️!"
+
+    assert strip_excess_emojis(text, 2) == "Ship it 👩‍💻, thumbs 👍🏽, flag , love !"
+    assert strip_excess_emojis(text, 4) == text
+    assert strip_excess_emojis("No emoji here.", 0) == "No emoji here."
+
+
+def test_streaming_post_processor_matches_batch_across_split_clusters():
+    text = "  Hi 👨‍👩‍👧 fam 🇨🇦🇺🇸 and 👍🏽👍🏽 plus a long tail of words   "
+    chunks = ["  Hi 👨", "‍👩", "‍👧 fam 🇨", "🇦🇺", "🇸 and 👍", "🏽👍🏽 plus a long tail of words   "]
+    post = StreamingPostProcessor(limit=40, max_emoji=3)
+
+    streamed = "".join(post.feed(chunk) for chunk in chunks) + post.finish()
+
+    assert streamed == strip_excess_emojis(clamp_length(text.strip(), 40), 3)
+    assert post.done
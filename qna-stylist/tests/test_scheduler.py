@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from qna_stylist import ResponseStyleEnhancer
+from qna_stylist.cache import cache_clear
+from qna_stylist.scheduler import BULK, INTERACTIVE, SCHEDULER, ProviderScheduler
+from qna_stylist.settings import Settings
+
+
+def setup_function(_function):
+    cache_clear()
+    SCHEDULER.clear()
+
+
+def test_buckets_cap_and_queue_interactive_ahead_of_bulk():
+    scheduler = ProviderScheduler(rpm=600, tpm=1200, max_concurrency=1)
+    assert scheduler.acquire(100)
+    order = []
+
+    def waiter(name, priority):
+        assert scheduler.acquire(100, priority)
+        order.append(name)
+        scheduler.release()
+
+    bulk = threading.Thread(target=waiter, args=("bulk", BULK))
+    bulk.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=waiter, args=("interactive", INTERACTIVE))
+    interactive.start()
+    time.sleep(0.02)
+    assert scheduler.snapshot()["queued"] == 2
+    scheduler.release()
+    bulk.join(1)
+    interactive.join(1)
+    assert order == ["interactive", "bulk"]
+
+    # 1200 TPM holds 1200 tokens; 300 are used, and a 2000-token call is charged as a full bucket,
+    # so it waits ~15 s for the refill and gives up at its timeout instead.
+    t0 = time.perf_counter()
+    assert not scheduler.acquire(2000, timeout=0.05)
+    assert 0.04 < time.perf_counter() - t0 < 0.5
+    stats = scheduler.snapshot()
+    assert stats["active"] == 0 and stats["queued"] == 0
+    assert stats[INTERACTIVE]["timeouts"] == 1 and stats[BULK]["admitted"] == 1
+    assert stats[BULK]["max_wait_ms"] >= 30
+
+
+def test_pipeline_respects_concurrency_cap_and_reports_queue_wait(monkeypatch):
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_call(self, override, spec):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.03)
+        with lock:
+            active["now"] -= 1
+        return f"Styled {spec.user_prompt[-12:]}"
+
+    async def fake_acall(self, override, spec):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_call_provider", fake_call)
+    monkeypatch.setattr(ResponseStyleEnhancer, "_acall_provider", fake_acall)
+    cfg = Settings(provider="openai", openai_api_key="test-key", openai_max_concurrency=2, result_timings=True)
+    enhancer = ResponseStyleEnhancer(cfg=cfg)
+
+    results = enhancer.enhance_many([(f"Q{i}?", f"Answer number {i}.") for i in range(8)], max_workers=8)
+
+    assert active["peak"] == 2
+    assert all(not r["cache_hit"] and r["styled_text"].startswith("Styled") for r in results)
+    assert max(r["timings"].get("provider_queue_ms", 0) for r in results) > 20
+    stats = enhancer.scheduler_stats()["openai"]
+    assert stats[BULK]["admitted"] == 8 and stats[BULK]["queued"] >= 6 and stats["active"] == 0
+
+    async def cancelled_while_queued():
+        # Both slots are taken; a queued async caller that gives up leaves nothing behind.
+        scheduler = SCHEDULER.get("openai", cfg)
+        assert scheduler.acquire(1) and scheduler.acquire(1)
+        result = await enhancer.aenhance(question="Q?", plain_answer="Plain answer.", deadline_ms=50)
+        scheduler.release()
+        scheduler.release()
+        return result
+
+    result = asyncio.run(cancelled_while_queued())
+    assert result["safety_notes"] == "Fallback to original: deadline exceeded."
+    stats = enhancer.scheduler_stats()["openai"]
+    assert stats["active"] == 0 and stats["queued"] == 0 and stats[INTERACTIVE]["timeouts"] == 1
+
+
+def test_registry_keeps_a_scheduler_per_set_of_limits():
+    unlimited = Settings(provider="openai", openai_api_key="test-key")
+    limited = Settings(provider="openai", openai_api_key="test-key", openai_rpm=1, openai_max_concurrency=1)
+    assert not SCHEDULER.get("openai", unlimited).enabled
+
+    scheduler = SCHEDULER.get("openai", limited)
+    assert scheduler.enabled and scheduler is SCHEDULER.get("openai", limited.model_copy())
+    assert scheduler.acquire(1)
+    assert not scheduler.acquire(1, timeout=0.01)
+    scheduler.release()
+    assert ResponseStyleEnhancer(cfg=limited).scheduler_stats()["openai"]["max_concurrency"] == 1
+    assert ResponseStyleEnhancer(cfg=unlimited).scheduler_stats() == {}
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+from qna_stylist import ResponseStyleEnhancer, metrics
+from qna_stylist.cache import cache_clear
+from qna_stylist.server import StylistService
+from qna_stylist.settings import Settings
+
+
+def setup_function(_function):
+    cache_clear()
+
+
+async def call(app, method, path, body=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": method, "path": path, "headers": []}, receive, send)
+    headers = dict(sent[0]["headers"])
+    return sent[0]["status"], json.loads(sent[1]["body"]), headers
+
+
+def make_service(monkeypatch, delay_s=0.0, **kwargs):
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+    calls = []
+
+    async def fake_ainvoke(self, question, answer, tone, serious):
+        calls.append(question)
+        await asyncio.sleep(delay_s)
+        return f"Styled {question}"
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls.append(question)
+        time.sleep(delay_s)
+        return f"Styled {question}"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_ainvoke", fake_ainvoke)
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    return StylistService(ResponseStyleEnhancer(cfg=cfg), **kwargs), calls
+
+
+def test_enhance_endpoint_validates_and_styles(monkeypatch):
+    app, _ = make_service(monkeypatch)
+
+    async def main():
+        ok = await call(app, "POST", "/v1/enhance", {"question": "Q1?", "plain_answer": "A.", "tone": "friendly"})
+        bad_tone = await call(app, "POST", "/v1/enhance", {"question": "Q?", "plain_answer": "A.", "tone": "sarcastic"})
+        missing = await call(app, "POST", "/v1/enhance", {"question": "Q?"})
+        health = await call(app, "GET", "/healthz")
+        return ok, bad_tone, missing, health
+
+    ok, bad_tone, missing, health = asyncio.run(main())
+
+    assert ok[0] == 200 and ok[1]["styled_text"] == "Styled Q1?" and ok[1]["used_tone"] == "friendly"
+    assert bad_tone[0] == 400 and missing[0] == 400
+    assert health[0] == 200 and health[1]["responses"] == {"200": 1, "400": 2}
+
+
+def test_backpressure_and_deadlines(monkeypatch):
+    app, _ = make_service(monkeypatch, delay_s=0.2, max_concurrency=1, max_queue=1)
+
+    async def main():
+        busy = asyncio.ensure_future(call(app, "POST", "/v1/enhance", {"question": "Q1?", "plain_answer": "A."}))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(
+            call(app, "POST", "/v1/enhance", {"question": "Q2?", "plain_answer": "A.", "deadline_ms": 50})
+        )
+        await asyncio.sleep(0.01)
+        rejected = await call(app, "POST", "/v1/enhance", {"question": "Q3?", "plain_answer": "A."})
+        results = await asyncio.gather(busy, queued)
+        overrun = await call(app, "POST", "/v1/enhance", {"question": "Q4?", "plain_answer": "Plain.", "deadline_ms": 50})
+        return results, rejected, overrun
+
+    (busy, queued), rejected, overrun = asyncio.run(main())
+
+    assert busy[0] == 200
+    assert rejected[0] == 429 and rejected[2][b"retry-after"] == b"1"
+    assert queued[0] == 503 and queued[1]["error"] == "queue_timeout"
+    assert overrun[0] == 200
+    assert overrun[1]["styled_text"] == "Plain."
+    assert "deadline exceeded" in overrun[1]["safety_notes"]
+
+
+def test_micro_batching_groups_concurrent_requests(monkeypatch):
+    app, calls = make_service(monkeypatch, batch_window_ms=30, batch_max_size=8)
+    batches = []
+    original = ResponseStyleEnhancer.enhance_many
+
+    def recording_enhance_many(self, items, **kwargs):
+        batches.append(len(items))
+        return original(self, items, **kwargs)
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "enhance_many", recording_enhance_many)
+
+    async def main():
+        questions = ["Q1?", "Q2?", "Q1?", "Q3?"]
+        return await asyncio.gather(*(
+            call(app, "POST", "/v1/enhance", {"question": q, "plain_answer": "A."}) for q in questions
+        ))
+
+    responses = asyncio.run(main())
+
+    assert [r[1]["styled_text"] for r in responses] == ["Styled Q1?", "Styled Q2?", "Styled Q1?", "Styled Q3?"]
+    assert batches == [4]
+    assert sorted(calls) == ["Q1?", "Q2?", "Q3?"]
+
+
+def test_metrics_endpoint_serves_the_sink_exposition():
+    class ScrapeSink(metrics.MetricsSink):
+        def exposition(self):
+            return "text/plain; version=0.0.4", b"stylist_requests_total 3.0\n"
+
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    app = StylistService(ResponseStyleEnhancer(cfg=cfg, metrics=ScrapeSink()))
+    asyncio.run(app({"type": "http", "method": "GET", "path": "/metrics", "headers": []}, receive, send))
+    assert sent[0]["status"] == 200 and dict(sent[0]["headers"])[b"content-type"] == b"text/plain; version=0.0.4"
+    assert sent[1]["body"] == b"stylist_requests_total 3.0\n"
+
+    # Sinks with nothing to scrape (the default) leave /metrics unrouted.
+    status, body, _ = asyncio.run(call(StylistService(ResponseStyleEnhancer(cfg=cfg)), "GET", "/metrics"))
+    assert status == 404 and body == {"error": "not_found"}
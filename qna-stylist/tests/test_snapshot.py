@@ -0,0 +1,68 @@
+import json
+import os
+from qna_stylist import ResponseStyleEnhancer, StylistTone, snapshot
+from qna_stylist.cache import MemoryCache
+from qna_stylist.cli import main
+from qna_stylist.settings import Settings
+from qna_stylist.snapshot import Snapshot, snapshot_version, write_snapshot
+
+
+def test_prestyle_resumes_and_enhancer_loads_snapshot(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_invoke(self, question, answer, tone, serious):
+        calls.append((question, tone.value))
+        if question == "Flaky?" and len(calls) < 4:
+            raise RuntimeError("provider down")
+        return f"{tone.value}: {answer}"
+
+    monkeypatch.setattr(ResponseStyleEnhancer, "_invoke", fake_invoke)
+    monkeypatch.setenv("STYLIST_OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("STYLIST_RETRY_ATTEMPTS", "1")
+    corpus = tmp_path / "faq.jsonl"
+    corpus.write_text("\n".join(json.dumps(row) for row in [
+        {"question": "Reset?", "answer": "Open settings.", "tones": ["friendly", "funny"]},
+        {"question": "Flaky?", "plain_answer": "Try again."},
+    ]))
+    out = str(tmp_path / "faq.snap")
+
+    assert main(["prestyle", str(corpus), "-o", out, "--workers", "1"]) == 1
+    assert len(Snapshot(out)) == 2 and (tmp_path / "faq.snap.journal").exists()
+    assert main(["prestyle", str(corpus), "-o", out]) == 0
+    assert sorted(calls) == [("Flaky?", "witty"), ("Flaky?", "witty"), ("Reset?", "friendly"), ("Reset?", "funny")]
+    assert not (tmp_path / "faq.snap.journal").exists()
+
+    cfg = Settings(provider="openai", openai_api_key="test-key", cache_snapshot_path=out)
+    enhancer = ResponseStyleEnhancer(cfg=cfg, cache=MemoryCache())
+    hit = enhancer.enhance(question="Reset?", plain_answer="Open settings.", tone=StylistTone.FUNNY)
+    assert hit["cache_hit"] is True and hit["styled_text"] == "funny: Open settings."
+    assert enhancer.cache.snapshot_hits == 1
+    assert enhancer.cache.stats()["snapshot_hits"] == 1 and enhancer.cache.stats()["items"] == 1
+
+    stale = Settings(provider="openai", openai_api_key="test-key", cache_snapshot_path=out, max_emojis=0)
+    assert isinstance(ResponseStyleEnhancer(cfg=stale, cache=MemoryCache()).cache, MemoryCache)
+
+
+def test_corrupt_snapshots_are_ignored_and_old_versions_released(tmp_path):
+    cfg = Settings(provider="openai", openai_api_key="test-key")
+    path = tmp_path / "faq.snap"
+    write_snapshot(str(path), {"ab" * 32: "styled"}, snapshot_version(cfg))
+    good = path.read_bytes()
+    header_len = int.from_bytes(good[8:12], "little")
+    corrupt = [
+        good[:10],  # cut inside the header length
+        good[:20],  # cut inside the header
+        good[:12 + header_len + 8],  # cut inside the index
+        good[:12] + good[12:12 + header_len].replace(b'"count"', b'"cou_t"') + good[12 + header_len:],
+    ]
+    for i, data in enumerate(corrupt):
+        path.write_bytes(data)
+        os.utime(path, ns=(i, i))
+        enhancer = ResponseStyleEnhancer(cfg=cfg.model_copy(update={"cache_snapshot_path": str(path)}), cache=MemoryCache())
+        assert isinstance(enhancer.cache, MemoryCache)
+
+    for i in range(3):
+        write_snapshot(str(path), {"ab" * 32: f"styled {i}"}, snapshot_version(cfg))
+        os.utime(path, ns=(100 + i, 100 + i))
+        assert snapshot.load_snapshot(str(path), cfg).get("ab" * 32) == f"styled {i}"
+    assert len([key for key in snapshot._OPEN if key[0] == os.path.realpath(path)]) == 1